@@ -0,0 +1,141 @@
+"""
+Regroupement des articles quasi identiques publiés par plusieurs flux
+(une même dépêche chez Le Monde, franceinfo, France 24, RFI...).
+
+Chaque article est réduit à une signature MinHash sur les paires de mots
+consécutifs de son titre et de son extrait (texte en minuscules, sans
+accents). La signature est calculée en une passe (one permutation hashing :
+chaque paire n'est hachée qu'une fois, par hash() en C, puis rangée dans un
+des NUM_HASHES compartiments dont on garde le minimum), puis découpée en
+bandes : deux articles qui partagent une bande tombent dans le même seau
+LSH. Seuls ces candidats sont comparés, et chacun uniquement au premier
+article de son seau : le coût reste linéaire en nombre d'articles, sans
+comparaison deux à deux.
+"""
+
+import re
+import unicodedata
+from array import array
+from collections import defaultdict
+
+NUM_HASHES = 32
+BANDS = 8                 # 8 bandes de 4 : seuil de collision ~ (1/8) ** (1/4) ≈ 0,6
+ROWS = NUM_HASHES // BANDS
+THRESHOLD = 0.5           # similarité de Jaccard estimée minimale pour regrouper
+MIN_SHINGLES = 6          # en dessous, le texte est trop court pour être comparé
+
+WORD_RE = re.compile(r'\w+')
+
+def normalize_text(text):
+    """Minuscules, accents retirés (décomposition NFKD puis ASCII), mots séparés par une espace"""
+    folded = unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(WORD_RE.findall(folded))
+
+def signature(text):
+    """
+    Signature MinHash (array de NUM_HASHES entiers 64 bits, ~320 octets)
+    d'un texte normalisé ; None s'il est trop court.
+
+    hash() est salé par processus : les signatures se comparent entre elles
+    dans un même processus mais ne doivent pas être conservées.
+    """
+    words = text.split()
+    values = sorted(set(map(hash, zip(words, words[1:]))), reverse=True)
+    if len(values) < MIN_SHINGLES:
+        return None
+    # Valeurs décroissantes : la dernière écrite dans chaque compartiment est son minimum
+    minima = dict(zip([value % NUM_HASHES for value in values], values))
+    if len(minima) == NUM_HASHES:
+        return array('q', (minima[slot] for slot in range(NUM_HASHES)))
+    # Densification : un compartiment vide reprend la valeur du suivant non
+    # vide (circulairement), mêlée à la distance pour rester distincte
+    bins = [0] * NUM_HASHES
+    donor = None
+    for position in range(2 * NUM_HASHES - 1, -1, -1):
+        slot = position % NUM_HASHES
+        if slot in minima:
+            donor = slot
+            bins[slot] = minima[slot]
+        elif position < NUM_HASHES:
+            bins[slot] = hash((minima[donor], (donor - slot) % NUM_HASHES))
+    return array('q', bins)
+
+def similarity(first, second):
+    """Similarité de Jaccard estimée entre deux signatures"""
+    return sum(a == b for a, b in zip(first, second)) / NUM_HASHES
+
+def article_text(article):
+    return normalize_text(f"{article.get('title', '')} {article.get('excerpt', '')}")
+
+class _DisjointSet:
+    """Union-find sur les indices des articles"""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            # La plus petite position reste la racine : ordre d'entrée conservé
+            self.parent[max(first, second)] = min(first, second)
+
+def article_signature(article):
+    """Signature d'un article (titre + extrait)"""
+    return signature(article_text(article))
+
+def cluster_articles(articles, threshold=THRESHOLD, signatures=None):
+    """
+    Regroupe les articles quasi identiques.
+
+    `signatures` (alignées sur `articles`) évitent de les recalculer si
+    l'appelant les a gardées. Retourne une liste de groupes (listes
+    d'indices dans `articles`), dans l'ordre de leur premier article. Un
+    article sans doublon forme un groupe à lui seul.
+    """
+    if signatures is None:
+        signatures = [article_signature(article) for article in articles]
+    clusters = _DisjointSet(len(articles))
+    for band in range(BANDS):
+        start = band * ROWS
+        heads = {}
+        for position, bins in enumerate(signatures):
+            if bins is None:
+                continue
+            key = bins[start:start + ROWS].tobytes()
+            head = heads.setdefault(key, position)
+            if head != position and similarity(signatures[head], bins) >= threshold:
+                clusters.union(head, position)
+
+    groups = defaultdict(list)
+    for position in range(len(articles)):
+        groups[clusters.find(position)].append(position)
+    return list(groups.values())
+
+def deduplicate_articles(articles, threshold=THRESHOLD, signatures=None):
+    """
+    Un représentant par groupe d'articles quasi identiques, à la place du
+    premier article du groupe. Le représentant est le premier article du
+    groupe qui a une image ; les autres sont listés dans `alsoCoveredBy`
+    ({source, title, link}).
+    """
+    deduplicated = []
+    for group in cluster_articles(articles, threshold, signatures):
+        members = [articles[position] for position in group]
+        representative = next((article for article in members if article.get("imageUrl")), members[0])
+        if len(members) > 1:
+            representative = {
+                **representative,
+                "alsoCoveredBy": [
+                    {"source": article["source"], "title": article["title"], "link": article["link"]}
+                    for article in members if article is not representative
+                ],
+            }
+        deduplicated.append(representative)
+    return deduplicated
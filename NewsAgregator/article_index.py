@@ -0,0 +1,230 @@
+"""
+Index plein texte des articles agrégés par le service (titres et extraits).
+
+Les textes sont découpés en Python : minuscules, accents retirés
+(normalize_text de article_dedup), mots vides français et anglais écartés.
+Les termes ainsi obtenus sont rangés dans une table FTS5 de SQLite, qui tient
+les listes de postings sur disque, se met à jour article par article au fil
+des rafraîchissements et classe les résultats par BM25 (le titre pèse plus
+que l'extrait). Les articles sortis de la fenêtre de isArticleRecent()
+(7 jours) sont évincés ; l'index survit aux redémarrages du service.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from article_dedup import normalize_text
+from catalog_core import SCRIPT_DIR
+
+INDEX_FILE = SCRIPT_DIR / "articles.db"
+RECENT_DAYS = 7          # même fenêtre que isArticleRecent()
+EVICT_EVERY = 600        # secondes entre deux évictions lors des ajouts
+TITLE_WEIGHT = 3.0       # poids BM25 du titre, l'extrait pesant 1
+MAX_CANDIDATES = 2000    # correspondances les plus récentes classées par requête
+MIN_TERM_LENGTH = 2
+
+# Formes sans accents, comme les textes une fois normalisés
+STOPWORDS = frozenset("""
+    au aux avec ce ces cet cette dans de des du elle elles en et eux il ils je la le les leur leurs
+    lui ma mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son
+    sur ta te tes toi ton tu un une vos votre vous est sont ete etre avait avoir ont fait plus
+    comme tout tous toute toutes apres avant aussi alors donc ni car si sans sous entre vers chez
+    deja encore tres selon contre depuis pendant lors ceci cela ca dont ici quand quel quelle
+    the of and to in is for on with at by from an are was be as it this that or
+""".split())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id        INTEGER PRIMARY KEY,
+    link      TEXT NOT NULL UNIQUE,
+    title     TEXT NOT NULL,
+    excerpt   TEXT NOT NULL DEFAULT '',
+    date      TEXT NOT NULL,
+    published REAL NOT NULL,       -- date en secondes epoch, pour l'éviction
+    image_url TEXT,
+    feed_url  TEXT NOT NULL,
+    source    TEXT NOT NULL,
+    category  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_published ON articles(published);
+
+-- Termes déjà normalisés en Python : unicode61 ne fait plus que découper
+-- sur les espaces. rowid = articles.id
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title,
+    excerpt,
+    tokenize='unicode61'
+);
+"""
+
+def terms(text):
+    """Termes indexés d'un texte : sans accents, sans mots vides ni lettres isolées"""
+    return [
+        word for word in normalize_text(text).split()
+        if len(word) >= MIN_TERM_LENGTH and word not in STOPWORDS
+    ]
+
+def match_query(text):
+    """
+    Requête FTS5 : tous les termes sont requis, le dernier en préfixe (à
+    partir de 3 lettres) pour suivre la saisie ("elections presid" →
+    "elections" "presid"*).
+    None si la requête ne contient que des mots vides.
+    """
+    words = terms(text)
+    if not words:
+        return None
+    quoted = [f'"{word}"' for word in words]
+    if len(words[-1]) >= 3:
+        quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def _timestamp(date):
+    try:
+        parsed = datetime.fromisoformat(date)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+class ArticleIndex:
+    """Index BM25 persistant des articles récents, alimenté flux par flux"""
+
+    def __init__(self, db_file=INDEX_FILE, recent_days=RECENT_DAYS):
+        self.recent_days = recent_days
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_file, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._last_eviction = 0.0
+
+    def _cutoff(self):
+        return (datetime.now(timezone.utc) - timedelta(days=self.recent_days)).timestamp()
+
+    def add_articles(self, feed_url, articles, source=None, category=None):
+        """
+        Indexe les articles d'un flux qui ne le sont pas encore (clé : le
+        lien) ; retourne le nombre d'articles ajoutés. Les articles trop
+        anciens sont ignorés.
+        """
+        cutoff = self._cutoff()
+        added = 0
+        with self._lock:
+            known = set()
+            links = [article["link"] for article in articles]
+            for start in range(0, len(links), 500):
+                chunk = links[start:start + 500]
+                known.update(row[0] for row in self._db.execute(
+                    f"SELECT link FROM articles WHERE link IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            with self._db:
+                for article in articles:
+                    link = article["link"]
+                    published = _timestamp(article.get("date"))
+                    if link in known or published is None or published < cutoff:
+                        continue
+                    known.add(link)
+                    cursor = self._db.execute(
+                        """
+                        INSERT INTO articles(link, title, excerpt, date, published, image_url,
+                                             feed_url, source, category)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (link, article["title"], article.get("excerpt") or '', article["date"], published,
+                         article.get("imageUrl"), feed_url, source or article.get("source") or feed_url,
+                         category or article.get("category") or 'general'),
+                    )
+                    self._db.execute(
+                        "INSERT INTO articles_fts(rowid, title, excerpt) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, ' '.join(terms(article["title"])),
+                         ' '.join(terms(article.get("excerpt") or ''))),
+                    )
+                    added += 1
+            if time.monotonic() - self._last_eviction > EVICT_EVERY:
+                self._evict(cutoff)
+        return added
+
+    def _evict(self, cutoff):
+        with self._db:
+            self._db.execute(
+                "DELETE FROM articles_fts WHERE rowid IN (SELECT id FROM articles WHERE published < ?)",
+                (cutoff,),
+            )
+            evicted = self._db.execute("DELETE FROM articles WHERE published < ?", (cutoff,)).rowcount
+        self._last_eviction = time.monotonic()
+        return evicted
+
+    def evict(self):
+        """Retire les articles sortis de la fenêtre ; retourne leur nombre"""
+        with self._lock:
+            return self._evict(self._cutoff())
+
+    def search(self, query, limit=20, category=None):
+        """
+        Articles récents correspondant à `query`, du plus pertinent au moins
+        pertinent (BM25), au format de parseArticle() avec leur `score`.
+
+        Seules les MAX_CANDIDATES correspondances les plus récentes (rowid
+        croissant avec l'indexation) de la fenêtre et de la catégorie sont
+        classées : un mot très courant ne force pas à noter toute la semaine
+        d'articles, et la latence reste bornée. Les statistiques BM25 (IDF)
+        portent toujours sur tout l'index.
+        """
+        match = match_query(query)
+        if match is None:
+            return []
+        clauses, params = ["a.published >= ?"], [self._cutoff()]
+        if category:
+            clauses.append("a.category = ?")
+            params.append(category)
+        with self._lock:
+            rows = self._db.execute(
+                f"""
+                SELECT a.*, c.score
+                FROM (
+                    -- Filtres avant la limite : une catégorie peu active garde ses correspondances
+                    SELECT articles_fts.rowid AS id, bm25(articles_fts, {TITLE_WEIGHT}, 1.0) AS score
+                    FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid
+                    WHERE articles_fts MATCH ? AND {' AND '.join(clauses)}
+                    ORDER BY articles_fts.rowid DESC LIMIT ?
+                ) c JOIN articles a ON a.id = c.id
+                ORDER BY c.score
+                LIMIT ?
+                """,
+                (match, *params, MAX_CANDIDATES, limit),
+            ).fetchall()
+        # bm25() est négatif : plus il est bas, plus l'article est pertinent
+        return [
+            {
+                "title": row["title"],
+                "link": row["link"],
+                "excerpt": row["excerpt"],
+                "date": row["date"],
+                "source": row["source"],
+                "category": row["category"],
+                "imageUrl": row["image_url"],
+                "score": round(-row["score"], 3),
+            }
+            for row in rows
+        ]
+
+    def stats(self):
+        with self._lock:
+            articles, feeds = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT feed_url) FROM articles"
+            ).fetchone()
+        return {"articles": articles, "feeds": feeds}
+
+    def optimize(self):
+        """Fusionne les segments FTS5 (à lancer de temps en temps, par exemple à l'arrêt)"""
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO articles_fts(articles_fts) VALUES ('optimize')")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
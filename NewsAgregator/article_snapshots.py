@@ -0,0 +1,201 @@
+"""
+Instantanés statiques des articles récents, un fichier par catégorie.
+
+Le client n'a plus à télécharger des centaines de flux par des proxys pour
+filtrer (isArticleRecent(), 7 jours) puis trier allArticles : il lit
+snapshots/<catégorie>.json, déjà trié du plus récent au plus ancien, depuis
+n'importe quel hébergement statique (variantes .gz / .br précompressées).
+
+Les articles sont rangés dans des seaux horaires (buckets/<catégorie>/
+2026-10-18T09.json, triés). Une exécution ne fusionne que les articles
+nouveaux dans les seaux de leur heure et supprime les seaux sortis de la
+fenêtre : l'instantané est l'assemblage, octet à octet, des seaux du plus
+récent au plus ancien, sans retri global ni réanalyse des seaux inchangés.
+
+Un article (clé : son lien) n'apparaît qu'une fois dans la fenêtre :
+buckets/<catégorie>/links.json garde le seau de chaque lien. Un article dont
+la date change passe dans le seau de sa nouvelle heure ; un article sans
+date de publication (`seenAt`, voir feed_server.stamp_undated) reste dans
+celui de sa première observation, avec cette date.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from catalog_core import SCRIPT_DIR, atomic_write, file_key
+from catalog_shards import compress_variants, write_bytes
+
+SNAPSHOTS_DIR = SCRIPT_DIR / "snapshots"
+BUCKETS_DIR_NAME = "buckets"
+STATE_NAME = "state.json"        # articles par seau, pour assembler sans relire
+LINKS_NAME = "links.json"        # par catégorie : lien → seau, pour dédupliquer sur la fenêtre
+MANIFEST_NAME = "manifest.json"
+WINDOW_HOURS = 7 * 24            # même fenêtre que isArticleRecent()
+MAX_ARTICLES = 1000              # par instantané, au seau près
+
+def encode(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def hour_key(date):
+    """Seau d'une date ISO 8601 UTC (celles de parse_feed) : 2026-10-18T09"""
+    return date[:13]
+
+def newest_first(articles):
+    return sorted(articles, key=lambda article: (article["date"], article["link"]), reverse=True)
+
+def merge_bucket(path, articles, removed=()):
+    """
+    Fusionne des articles dans un seau (clé : le lien, la version la plus
+    récente l'emporte, mais un article sans date garde celle de sa première
+    observation) et en retire les liens `removed` ; retourne (contenu trié,
+    nombre d'articles) ou None si le seau est inchangé.
+    """
+    try:
+        existing = json.loads(path.read_bytes())
+    except FileNotFoundError:
+        existing = []
+    merged = {article["link"]: article for article in existing}
+    before = dict(merged)
+    for link in removed:
+        merged.pop(link, None)
+    for article in articles:
+        old = merged.get(article["link"])
+        if old is not None and "seenAt" in article:
+            article = {**article, "date": old["date"], "seenAt": old.get("seenAt", old["date"])}
+        merged[article["link"]] = article
+    if merged == before:
+        return None
+    return newest_first(merged.values()), len(merged)
+
+def assemble(header, bucket_files):
+    """
+    Instantané = en-tête JSON + concaténation des seaux (listes JSON déjà
+    triées, du plus récent au plus ancien), sans les décoder.
+    """
+    bodies = [body for body in (path.read_bytes()[1:-1] for path in bucket_files) if body]
+    return header[:-1] + b',"articles":[' + b','.join(bodies) + b']}'
+
+def read_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+def update_snapshots(articles_by_category, catalog, out_dir=SNAPSHOTS_DIR, now=None,
+                     max_articles=MAX_ARTICLES):
+    """
+    Fusionne les articles récupérés ({catégorie: [articles]}) dans les seaux,
+    expire les seaux trop anciens et réécrit les instantanés des catégories
+    touchées. Retourne (manifeste, catégories réécrites).
+    """
+    out_dir = Path(out_dir)
+    buckets_dir = out_dir / BUCKETS_DIR_NAME
+    buckets_dir.mkdir(parents=True, exist_ok=True)
+    now = now or datetime.now(timezone.utc)
+    oldest = hour_key((now - timedelta(hours=WINDOW_HOURS)).isoformat())
+    state = read_json(buckets_dir / STATE_NAME, {})
+    manifest = read_json(out_dir / MANIFEST_NAME, {"categories": {}})
+
+    touched = set()
+    for category_key, articles in articles_by_category.items():
+        category_dir = buckets_dir / file_key(category_key)
+        links_path = category_dir / LINKS_NAME
+        # Seaux encore dans la fenêtre : un lien d'un seau expiré est nouveau
+        links = {link: hour for link, hour in read_json(links_path, {}).items() if hour >= oldest}
+        by_hour, removed = {}, {}
+        # Un lien repris par plusieurs flux de la catégorie : la dernière version
+        for article in {article["link"]: article for article in articles}.values():
+            known = links.get(article["link"])
+            # Sans date de publication : seau de la première observation
+            hour = known if known and "seenAt" in article else hour_key(article["date"])
+            if hour < oldest:
+                continue
+            if known and known != hour:
+                removed.setdefault(known, set()).add(article["link"])
+            links[article["link"]] = hour
+            by_hour.setdefault(hour, []).append(article)
+        counts = state.setdefault(category_key, {})
+        changed = False
+        for hour in by_hour.keys() | removed.keys():
+            path = category_dir / f"{hour}.json"
+            merged = merge_bucket(path, by_hour.get(hour, ()), removed.get(hour, ()))
+            if merged is None:
+                continue
+            changed = True
+            if merged[1]:
+                path.parent.mkdir(exist_ok=True)
+                write_bytes(path, encode(merged[0]))
+                counts[hour] = merged[1]
+            else:
+                path.unlink(missing_ok=True)
+                counts.pop(hour, None)
+        if changed:
+            touched.add(category_key)
+            with atomic_write(links_path) as f:
+                json.dump(links, f, ensure_ascii=False, separators=(',', ':'))
+
+    # Expiration : un seau sorti de la fenêtre est supprimé en entier
+    for category_key, counts in state.items():
+        for hour in [hour for hour in counts if hour < oldest]:
+            (buckets_dir / file_key(category_key) / f"{hour}.json").unlink(missing_ok=True)
+            del counts[hour]
+            touched.add(category_key)
+
+    if manifest.get("max_articles") != max_articles:
+        touched.update(state)
+    rewritten = []
+    for category_key in sorted(touched | (state.keys() - manifest["categories"].keys())):
+        counts = state[category_key]
+        selected, total = [], 0
+        for hour in sorted(counts, reverse=True):
+            if total >= max_articles:
+                break
+            selected.append(hour)
+            total += counts[hour]
+        category = catalog["categories"].get(category_key, {})
+        header = encode({
+            "key": category_key,
+            "name": category.get("name", category_key),
+            "generated_at": now.isoformat(timespec='seconds'),
+            "window_hours": WINDOW_HOURS,
+        })
+        payload = assemble(header, [buckets_dir / file_key(category_key) / f"{hour}.json" for hour in selected])
+        # Une catégorie « manifest » n'écrase pas le manifeste
+        file_name = f"{file_key(category_key, reserved={Path(MANIFEST_NAME).stem})}.json"
+        write_bytes(out_dir / file_name, payload)
+        entry = {
+            "name": category.get("name", category_key),
+            "file": file_name,
+            "count": total,
+            "newest": selected[0] if selected else None,
+            "bytes": len(payload),
+        }
+        for suffix, compressed in compress_variants(payload).items():
+            write_bytes(out_dir / (file_name + suffix), compressed)
+            entry[f"{suffix[1:]}_bytes"] = len(compressed)
+        manifest["categories"][category_key] = entry
+        rewritten.append(category_key)
+
+    manifest["generated_at"] = now.isoformat(timespec='seconds')
+    manifest["max_articles"] = max_articles
+    # Les seaux d'abord, le manifeste en dernier : il ne pointe que vers des fichiers complets
+    with atomic_write(buckets_dir / STATE_NAME) as f:
+        json.dump(state, f)
+    with atomic_write(out_dir / MANIFEST_NAME) as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest, rewritten
+
+def collect_articles(aggregator, categories=None):
+    """Articles de toutes les sources du catalogue, par catégorie ({catégorie: [articles]})"""
+    sources = [
+        source
+        for category_key in aggregator.catalog["categories"]
+        if not categories or category_key in categories
+        for source in aggregator.category_sources(category_key)
+    ]
+    articles_by_category = {}
+    for source, articles in zip(sources, aggregator.executor.map(aggregator.feed_articles, sources)):
+        articles_by_category.setdefault(source["category"], []).extend(articles)
+    return articles_by_category
@@ -0,0 +1,202 @@
+"""
+Format compact des articles envoyés aux clients par le service d'agrégation.
+
+En JSON ordinaire, chaque article répète les noms de ses clés, sa source et
+sa catégorie, et sa date en ISO 8601 (32 caractères). Ici :
+- un article est une ligne positionnelle [title, link, excerpt, date,
+  source, category, imageUrl] dans l'ordre de FIELDS ;
+- source et catégorie sont des indices dans une table de chaînes, chaque
+  chaîne n'étant envoyée qu'une fois ;
+- la date est en secondes depuis l'époque (UTC).
+
+Un 8e élément facultatif porte `alsoCoveredBy` ([[source, title, link]],
+source en indice, ou null), un 9e les autres champs (le `score` de la
+recherche).
+
+Trois enveloppes :
+- "compact" : un document JSON {v, fields, strings, articles} ;
+- "ndjson" : un enregistrement JSON par ligne, produit au fil de l'eau ;
+- "msgpack" : les mêmes enregistrements en MessagePack, à la suite (module
+  msgpack facultatif).
+
+Flux d'enregistrements (ndjson, msgpack) :
+
+    {"v": 1, "fields": [...]}          en-tête
+    {"group": "culture", "count": 42}  début d'un groupe (une catégorie)
+    {"s": ["Le Monde", "culture"]}     chaînes ajoutées à la table (indices suivants)
+    ["Titre", "https://...", ...]      un article
+    {"end": 42}                        fin du flux (nombre d'articles)
+
+Les chaînes nouvelles précèdent toujours le premier article qui s'en sert :
+un client affiche la première catégorie dès qu'elle est arrivée.
+"""
+
+import json
+from datetime import datetime, timezone
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+VERSION = 1
+FIELDS = ("title", "link", "excerpt", "date", "source", "category", "imageUrl")
+INDEXED = {"source", "category"}  # champs remplacés par un indice dans la table
+FORMATS = ("json", "compact", "ndjson", "msgpack")
+CONTENT_TYPES = {
+    "compact": "application/json; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "msgpack": "application/x-msgpack",
+}
+
+def to_epoch(date):
+    """Date ISO 8601 (celles de parse_feed) → secondes depuis l'époque"""
+    return int(datetime.fromisoformat(date).timestamp())
+
+def from_epoch(seconds):
+    """Secondes depuis l'époque → date ISO 8601 UTC, comme parse_feed"""
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+class StringTable:
+    """Table des chaînes répétées ; les chaînes nouvelles sont mises de côté jusqu'à leur envoi"""
+
+    def __init__(self):
+        self.indices = {}
+        self.pending = []
+
+    def __call__(self, value):
+        if value is None:
+            return None
+        index = self.indices.get(value)
+        if index is None:
+            index = self.indices[value] = len(self.indices)
+            self.pending.append(value)
+        return index
+
+    def flush(self):
+        pending, self.pending = self.pending, []
+        return pending
+
+def article_row(article, strings):
+    """Ligne positionnelle d'un article"""
+    row = [
+        article.get("title", ''),
+        article.get("link", ''),
+        article.get("excerpt", ''),
+        to_epoch(article["date"]) if article.get("date") else None,
+        strings(article.get("source")),
+        strings(article.get("category")),
+        article.get("imageUrl", ''),
+    ]
+    also = article.get("alsoCoveredBy")
+    extra = {key: value for key, value in article.items() if key not in FIELDS and key != "alsoCoveredBy"}
+    if also or extra:
+        row.append([[strings(other["source"]), other["title"], other["link"]] for other in also] if also else None)
+    if extra:
+        row.append(extra)
+    return row
+
+def encode_compact(articles):
+    """Document JSON compact {v, fields, strings, articles}"""
+    strings = StringTable()
+    rows = [article_row(article, strings) for article in articles]
+    return {"v": VERSION, "fields": list(FIELDS), "strings": strings.flush(), "articles": rows}
+
+def iter_records(groups):
+    """
+    Enregistrements du flux pour des groupes (clé, articles) ; les articles
+    d'un groupe peuvent être produits paresseusement (liste ou fonction).
+    """
+    strings = StringTable()
+    total = 0
+    yield {"v": VERSION, "fields": list(FIELDS)}
+    for key, articles in groups:
+        if callable(articles):
+            articles = articles()
+        yield {"group": key, "count": len(articles)}
+        for article in articles:
+            row = article_row(article, strings)
+            new = strings.flush()
+            if new:
+                yield {"s": new}
+            yield row
+        total += len(articles)
+    yield {"end": total}
+
+def require_msgpack():
+    if msgpack is None:
+        raise ImportError("Le format msgpack nécessite le module msgpack (pip install msgpack)")
+
+def record_encoder(fmt):
+    """Enregistrement → bytes pour le format de flux `fmt` (ndjson ou msgpack)"""
+    if fmt == "ndjson":
+        # Un seul encodeur : json.dumps() avec options en recrée un à chaque appel
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        return lambda record: (encoder.encode(record) + '\n').encode('utf-8')
+    if fmt == "msgpack":
+        require_msgpack()
+        return msgpack.Packer(use_bin_type=True).pack
+    raise ValueError(f"Format de flux inconnu : {fmt}")
+
+def iter_stream(groups, fmt="ndjson"):
+    """
+    Flux encodé, un morceau (bytes) par groupe : chaque morceau peut être
+    envoyé aussitôt, avant que le groupe suivant ne soit calculé.
+    """
+    encode = record_encoder(fmt)
+    pending = []
+    for record in iter_records(groups):
+        if pending and isinstance(record, dict) and "group" in record:
+            yield b''.join(pending)
+            pending.clear()
+        pending.append(encode(record))
+    yield b''.join(pending)
+
+def decode_row(row, strings):
+    """Article (dict de parseArticle()) depuis une ligne positionnelle"""
+    article = dict(zip(FIELDS, row))
+    if article["date"] is not None:
+        article["date"] = from_epoch(article["date"])
+    for field in INDEXED:
+        if article[field] is not None:
+            article[field] = strings[article[field]]
+    if len(row) > 7 and row[7]:
+        article["alsoCoveredBy"] = [
+            {"source": strings[source], "title": title, "link": link} for source, title, link in row[7]
+        ]
+    if len(row) > 8:
+        article.update(row[8])
+    return article
+
+def decode_compact(document):
+    """Articles depuis un document compact"""
+    strings = document["strings"]
+    return [decode_row(row, strings) for row in document["articles"]]
+
+def iter_decode(records):
+    """(groupe, article) depuis des enregistrements de flux déjà désérialisés"""
+    strings = []
+    group = None
+    for record in records:
+        if isinstance(record, list):
+            yield group, decode_row(record, strings)
+        elif "s" in record:
+            strings.extend(record["s"])
+        elif "group" in record:
+            group = record["group"]
+        elif "v" in record and record["v"] != VERSION:
+            raise ValueError(f"Version de format inconnue : {record['v']}")
+
+def decode_ndjson(lines):
+    """(groupe, article) depuis des lignes NDJSON"""
+    return iter_decode(json.loads(line) for line in lines if line.strip())
+
+def decode_msgpack(data):
+    """(groupe, article) depuis un flux MessagePack (bytes ou fichier binaire)"""
+    require_msgpack()
+    if isinstance(data, (bytes, bytearray)):
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(data)
+    else:
+        unpacker = msgpack.Unpacker(data, raw=False)
+    return iter_decode(unpacker)
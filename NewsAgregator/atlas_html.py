@@ -0,0 +1,172 @@
+"""
+Extraction des flux depuis des pages HTML sauvegardées de l'Atlas
+(https://atlasflux.saynete.net/), par exemple un miroir wget complet.
+
+Chaque page donne une catégorie (titre de la page, sans « Flux RSS » en
+tête, rattaché à une catégorie existante comme un dossier OPML) et ses
+sources : un lien dont l'adresse ressemble à un flux, nommé par son texte
+ou, si ce texte est générique ("RSS", "Flux"...), par le dernier texte lu
+avant lui (le nom du site qui précède l'icône RSS). Les pages sont
+réparties sur un pool de processus ; les résultats sont produits dans
+l'ordre des fichiers pour alimenter ingest_batch() au fil de l'eau.
+"""
+
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+ATLAS_URL = "https://atlasflux.saynete.net/"
+ATLAS_HOST = urlsplit(ATLAS_URL).hostname
+
+FEED_URL_RE = re.compile(
+    r'(rss|atom|feed|\.xml\b|\.rdf\b|podcast|videos\.xml|/backend|format=xml)', re.IGNORECASE
+)
+GENERIC_LINK_TEXT = {'', 'rss', 'flux', 'flux rss', 'feed', 'atom', 'xml', 's\'abonner', 'abonnement', 'lien'}
+TITLE_SEPARATORS_RE = re.compile(r'\s+[-|–—:]\s+')
+# « Flux RSS cuisine », « Les flux RSS de l'actualité » : le thème seul
+TITLE_PREFIX_RE = re.compile(
+    r"^(?:les\s+)?(?:flux(?:\s+(?:rss|atom))?|rss|atom)\b\s*(?:(?:de|des|du)\s+|d['’]\s*)?", re.IGNORECASE
+)
+SPACES_RE = re.compile(r'\s+')
+SLUG_RE = re.compile(r'[^a-z0-9]+')
+SKIPPED_TAGS = {'script', 'style', 'noscript'}
+
+def slugify(text):
+    """Clé de catégorie : minuscules sans accents, mots séparés par _"""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return SLUG_RE.sub('_', ascii_text.lower()).strip('_')
+
+def is_feed_url(url, parts=None):
+    """Une adresse http(s) qui ressemble à un flux RSS/Atom"""
+    parts = parts or urlsplit(url)
+    return parts.scheme in ('http', 'https') and bool(parts.hostname) and (
+        FEED_URL_RE.search(parts.path + '?' + parts.query) is not None
+        or parts.hostname.startswith('feeds.')
+    )
+
+class AtlasPageParser(HTMLParser):
+    """Relève le titre de la page et les liens vers des flux, avec leur nom"""
+
+    def __init__(self, base_url=ATLAS_URL):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.title = ''
+        self.heading = ''
+        self.sources = []
+        self._capture = None      # 'title', 'h1' ou None
+        self._skip = 0
+        self._href = None
+        self._link_text = []
+        self._last_text = ''
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip += 1
+        elif tag == 'base':
+            self.base_url = dict(attrs).get('href') or self.base_url
+        elif tag == 'title' and not self.title:
+            self._capture = 'title'
+        elif tag == 'h1' and not self.heading:
+            self._capture = 'h1'
+        elif tag == 'a':
+            self._href = dict(attrs).get('href')
+            self._link_text = []
+        elif tag == 'img' and self._href is not None:
+            # Icône seule : son texte alternatif sert de texte de lien
+            self._link_text.append(dict(attrs).get('alt') or '')
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == self._capture:
+            self._capture = None
+        elif tag == 'a' and self._href is not None:
+            self._close_link()
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        text = SPACES_RE.sub(' ', data).strip()
+        if not text:
+            return
+        if self._capture == 'title':
+            self.title += text
+        elif self._capture == 'h1':
+            self.heading = (self.heading + ' ' + text).strip()
+        if self._href is not None:
+            self._link_text.append(text)
+        elif text.lower() not in GENERIC_LINK_TEXT:
+            self._last_text = text
+
+    def _close_link(self):
+        href = self._href.strip()
+        url = href if href.startswith(('http://', 'https://')) else urljoin(self.base_url, href)
+        text = ' '.join(part for part in self._link_text if part).strip()
+        self._href = None
+        parts = urlsplit(url)
+        is_feed = is_feed_url(url, parts)
+        if text and text.lower() not in GENERIC_LINK_TEXT and not is_feed:
+            # Lien vers le site : son texte nommera l'icône RSS qui suit
+            self._last_text = text
+            return
+        if not is_feed or parts.hostname == ATLAS_HOST:
+            return  # navigation interne à l'Atlas
+        name = text if text.lower() not in GENERIC_LINK_TEXT and text != url else self._last_text
+        if name:
+            self.sources.append({"name": name, "url": url})
+
+    def category_name(self):
+        """Nom de catégorie : premier <h1>, sinon <title> sans le nom du site ni « Flux RSS »"""
+        name = (self.heading or TITLE_SEPARATORS_RE.split(self.title)[0]).strip()
+        theme = TITLE_PREFIX_RE.sub('', name)
+        if not slugify(theme):
+            return name
+        return theme[0].upper() + theme[1:] if theme != name else name
+
+def decode_page(raw):
+    """Décode une page sauvegardée : UTF-8, sinon Windows-1252 (vieux miroirs)"""
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('cp1252', errors='replace')
+
+def extract_page(path, default_category=None, default_name=None, base_url=ATLAS_URL, lookup=None):
+    """
+    Analyse une page (exécuté dans un processus du pool).
+    Retourne (category_key, category_name, sources) ; `lookup` (voir
+    catalog_opml.category_lookup) rattache le titre à une catégorie existante.
+    """
+    path = Path(path)
+    parser = AtlasPageParser(base_url)
+    parser.feed(decode_page(path.read_bytes()))
+    parser.close()
+    page_name = parser.category_name()
+    category_name = default_name or page_name or path.stem.replace('_', ' ').capitalize()
+    slug = slugify(page_name)
+    category_key = default_category or (lookup or {}).get(slug, slug) or path.stem
+    return category_key, category_name, parser.sources
+
+def iter_html_batches(paths, default_category=None, default_name=None, workers=None, data=None):
+    """
+    Produit (category_key, category_name, sources) pour chaque page HTML,
+    dans l'ordre des fichiers, en répartissant l'analyse sur `workers`
+    processus (par défaut un par cœur). `data` (catalogue chargé) sert à
+    rattacher les pages aux catégories existantes, comme pour l'OPML.
+    """
+    from catalog_opml import category_lookup
+    paths = list(paths)
+    lookup = category_lookup(data) if data is not None else None
+    extract = partial(extract_page, default_category=default_category, default_name=default_name, lookup=lookup)
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        yield from map(extract, paths)
+        return
+    # Des paquets de pages : moins d'allers-retours entre processus
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(extract, paths, chunksize=chunksize)
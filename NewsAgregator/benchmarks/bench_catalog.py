@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai du pipeline du catalogue sur des catalogues synthétiques.
+
+Les catalogues (10k, 100k, 1M sources par défaut) reproduisent la
+répartition par hôte du nôtre : ~12 % YouTube, ~7 % radiofrance-podcast.net,
+bsky.app, FeedBurner, quelques gros titres de presse puis une longue traîne
+d'hôtes. Environ 3 % des URLs sont des variantes d'une autre (http/https,
+/ final, ?format=xml) pour exercer la déduplication.
+
+Étapes mesurées : parse (parse_rss_sources sur une page de toutes les
+sources), dedup (UrlIndex.from_catalog), ingest (ingest_batch de 10 %
+de nouvelles sources et 10 % de doublons, lecture et écriture comprises),
+serialize (save_catalog) et load (load_catalog). Chaque taille tourne dans un
+processus séparé pour que le pic de mémoire résidente lui soit propre.
+Tout est local : aucun accès réseau.
+
+    python benchmarks/bench_catalog.py [--tailles 10000 100000 1000000] [--json res.json] [--comparer ancien.json]
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import resource
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from catalog_core import UrlIndex, load_catalog, save_catalog  # noqa: E402
+from extract_rss_from_pages import ingest_batch, parse_rss_sources  # noqa: E402
+
+CATEGORIES = (
+    'presse_standard', 'presse_region', 'alternatif', 'culture', 'technologie',
+    'politique', 'spiritualite', 'cuisine', 'gastronomie', 'humour', 'arts',
+    'feminin', 'people',
+)
+# Parts observées dans rss-sources-complete.json ; le reste va à la longue traîne
+HEAVY_HOSTS = (
+    ('www.youtube.com', 0.125), ('radiofrance-podcast.net', 0.073), ('bsky.app', 0.052),
+    ('www.lemonde.fr', 0.038), ('feeds.feedburner.com', 0.024), ('www.rfi.fr', 0.023),
+    ('www.franceinfo.fr', 0.022), ('www.francebleu.fr', 0.018),
+)
+TAIL_HOSTS_RATIO = 0.5   # hôtes candidats ; ~2 000 hôtes distincts pour 10k sources
+VARIANT_RATIO = 0.03
+
+def random_token(rng, length, alphabet=string.ascii_letters + string.digits):
+    return ''.join(rng.choices(alphabet, k=length))
+
+def synthetic_url(rng, host, serial):
+    """URL plausible pour un hôte donné, unique grâce à `serial`"""
+    if host == 'www.youtube.com':
+        return f"https://www.youtube.com/feeds/videos.xml?channel_id=UC{random_token(rng, 14)}{serial:08d}"
+    if host == 'radiofrance-podcast.net':
+        return f"https://radiofrance-podcast.net/podcast09/rss_{serial:08d}.xml"
+    if host == 'bsky.app':
+        return f"https://bsky.app/profile/{random_token(rng, 8).lower()}{serial}.bsky.social/rss"
+    if host == 'feeds.feedburner.com':
+        return f"https://feeds.feedburner.com/{random_token(rng, 10)}{serial}"
+    return f"https://{host}/{random_token(rng, 6, string.ascii_lowercase)}-{serial}/feed/"
+
+def variant(url):
+    """Même flux écrit autrement : normalize_url() doit les confondre"""
+    if url.startswith('https://feeds.feedburner.com/'):
+        return url + '?format=xml'
+    if url.endswith('/'):
+        return url.rstrip('/').replace('https://', 'http://', 1)
+    return url.replace('https://', 'http://', 1)
+
+class SourceGenerator:
+    """Sources synthétiques déterministes avec la répartition par hôte du catalogue"""
+
+    def __init__(self, size, seed=42):
+        self.rng = random.Random(seed)
+        tail = [f"www.{random_token(self.rng, 9, string.ascii_lowercase)}.fr"
+                for _ in range(max(1, int(size * TAIL_HOSTS_RATIO)))]
+        heavy_share = sum(share for _, share in HEAVY_HOSTS)
+        # Longue traîne en loi de Zipf : quelques hôtes moyens, beaucoup d'hôtes à un flux
+        harmonic = sum(1 / rank for rank in range(1, len(tail) + 1))
+        self.hosts = [host for host, _ in HEAVY_HOSTS] + tail
+        self.weights = list(itertools.accumulate(
+            [share for _, share in HEAVY_HOSTS]
+            + [(1 - heavy_share) / (rank * harmonic) for rank in range(1, len(tail) + 1)]
+        ))
+        self.serial = 0
+        self.emitted = []
+
+    def __call__(self, count):
+        """Produit `count` sources, dont ~3 % de variantes d'URLs déjà émises"""
+        rng = self.rng
+        hosts = rng.choices(self.hosts, cum_weights=self.weights, k=count)
+        sources = []
+        for host in hosts:
+            if self.emitted and rng.random() < VARIANT_RATIO:
+                url = variant(rng.choice(self.emitted))
+            else:
+                self.serial += 1
+                url = synthetic_url(rng, host, self.serial)
+                self.emitted.append(url)
+            sources.append({"name": f"Flux {self.serial}", "url": url})
+        return sources
+
+def synthetic_catalog(sources):
+    """Répartit les sources dans les catégories du catalogue réel"""
+    categories = {key: {"name": key.replace('_', ' ').title(), "description": f"Sources {key}", "sources": []}
+                  for key in CATEGORIES}
+    for position, source in enumerate(sources):
+        categories[CATEGORIES[position % len(CATEGORIES)]]["sources"].append(source)
+    return {"metadata": {"description": "catalogue synthétique"}, "categories": categories}
+
+def page_text(sources):
+    """Page au format de l'Atlas : une ligne de nom puis une ligne d'URL"""
+    return '\n'.join(f"{source['name']}\n{source['url']}" for source in sources) + '\n'
+
+def peak_rss_mb():
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def timed(stages, name, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    stages[name] = {"seconds": round(time.perf_counter() - start, 4), "peak_rss_mb": peak_rss_mb()}
+    return result
+
+def run_size(size, seed):
+    """Mesure toutes les étapes pour une taille ; exécuté dans un processus dédié"""
+    generate = SourceGenerator(size, seed)
+    sources = generate(size)
+    data = synthetic_catalog(sources)
+    incoming = generate(size // 10) + [dict(source) for source in random.Random(seed).sample(sources, size // 10)]
+    text = page_text(sources)
+    stages = {"baseline": {"seconds": 0.0, "peak_rss_mb": peak_rss_mb()}}
+
+    parsed = timed(stages, "parse", parse_rss_sources, text)
+    del text
+    url_index = timed(stages, "dedup", UrlIndex.from_catalog, data)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_file = Path(tmp) / "catalog.json"
+        timed(stages, "serialize", save_catalog, data, catalog_file)
+        catalog_bytes = catalog_file.stat().st_size
+        timed(stages, "load", load_catalog, catalog_file)
+
+        batches = [
+            (key, key, incoming[position::len(CATEGORIES)])
+            for position, key in enumerate(CATEGORIES)
+        ]
+        results, _ = timed(stages, "ingest", ingest_batch, batches, catalog_file)
+
+    return {
+        "size": size,
+        "parsed": len(parsed),
+        "unique_urls": len(url_index),
+        "hosts": len({source["url"].split('/')[2] for source in sources}),
+        "ingested": sum(added for _, _, added in results),
+        "catalog_bytes": catalog_bytes,
+        "stages": stages,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_comparison(results, previous_file):
+    """Rapport entre les temps actuels et ceux d'un fichier de résultats antérieur"""
+    previous = {entry["size"]: entry for entry in json.loads(previous_file.read_text(encoding='utf-8'))["results"]}
+    print(f"\nComparaison avec {previous_file} (ratio > 1 : plus lent qu'avant)")
+    for entry in results:
+        old = previous.get(entry["size"])
+        if old is None:
+            continue
+        ratios = []
+        for stage, measure in entry["stages"].items():
+            old_seconds = old["stages"].get(stage, {}).get("seconds")
+            if old_seconds:
+                ratios.append(f"{stage} ×{measure['seconds'] / old_seconds:.2f}")
+        print(f"  {entry['size']:>9,} : {', '.join(ratios)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="nombres de sources des catalogues synthétiques")
+    parser.add_argument("--graine", type=int, default=42, help="graine du générateur")
+    parser.add_argument("--json", type=Path, help="enregistrer les résultats dans ce fichier")
+    parser.add_argument("--comparer", type=Path, help="résultats antérieurs à comparer")
+    parser.add_argument("--taille-unique", type=int, help=argparse.SUPPRESS)  # processus fils
+    args = parser.parse_args()
+
+    if args.taille_unique:
+        print(json.dumps(run_size(args.taille_unique, args.graine)))
+        return
+
+    results = []
+    stage_names = ("parse", "dedup", "ingest", "serialize", "load")
+    print(f"{'sources':>10}{'hôtes':>9}" + ''.join(f"{name + ' s':>12}" for name in stage_names) + f"{'pic Mo':>9}")
+    for size in args.tailles:
+        # Un processus par taille : le pic de RSS n'hérite pas des tailles précédentes
+        child = subprocess.run(
+            [sys.executable, __file__, "--taille-unique", str(size), "--graine", str(args.graine)],
+            capture_output=True, text=True, check=True,
+        )
+        entry = json.loads(child.stdout)
+        results.append(entry)
+        stages = entry["stages"]
+        peak = max(stage["peak_rss_mb"] for stage in stages.values())
+        print(f"{size:>10,}{entry['hosts']:>9,}"
+              + ''.join(f"{stages[name]['seconds']:>12.3f}" for name in stage_names) + f"{peak:>9.1f}")
+
+    if args.json:
+        report = {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.graine,
+            "results": results,
+        }
+        args.json.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    if args.comparer:
+        print_comparison(results, args.comparer)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai de source_classifier : apprentissage sur le catalogue, puis
+classement par lots de sources synthétiques (100 000 par défaut).
+
+Les sources synthétiques sont des variantes de sources du catalogue (nom
+suffixé, hôte et chemin modifiés), pour que le texte ressemble à une vraie
+importation sans recouvrir exactement les exemples. Mesure aussi
+l'exactitude sur une partie du catalogue mise de côté.
+
+    python benchmarks/bench_classifier.py [--sources 100000]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catalog_core import JSON_FILE, load_catalog  # noqa: E402
+from source_classifier import SourceClassifier, evaluate  # noqa: E402
+
+def synthetic_sources(data, count, seed):
+    """Variantes de sources du catalogue : [(source, catégorie d'origine)]"""
+    rng = random.Random(seed)
+    pool = [(source, key) for key, category in data["categories"].items() for source in category["sources"]]
+    sources = []
+    for number in range(count):
+        source, key = rng.choice(pool)
+        scheme, _, rest = source["url"].partition("://")
+        host, _, path = rest.partition("/")
+        sources.append(({
+            "name": f"{source['name']} {rng.choice(['info', 'actu', 'blog', 'le fil', number])}",
+            "url": f"{scheme}://{rng.choice(['', 'news.', 'flux.'])}{host}/{path}{rng.choice(['', '/', '?p=' + str(number)])}",
+        }, key))
+    return sources
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--catalogue", type=Path, default=JSON_FILE, help="catalogue d'apprentissage")
+    parser.add_argument("--sources", type=int, default=100000, help="nombre de sources à classer")
+    parser.add_argument("--graine", type=int, default=42, help="graine du générateur")
+    parser.add_argument("--json", type=Path, help="enregistrer les résultats dans ce fichier")
+    args = parser.parse_args()
+
+    data = load_catalog(args.catalogue)
+    report = evaluate(data, seed=args.graine)
+
+    start = time.perf_counter()
+    classifier = SourceClassifier.train(data)
+    train_seconds = time.perf_counter() - start
+
+    sources = synthetic_sources(data, args.sources, args.graine)
+    start = time.perf_counter()
+    results = classifier.classify([source for source, _ in sources])
+    classify_seconds = time.perf_counter() - start
+    agreement = sum(result["category"] == key for result, (_, key) in zip(results, sources)) / len(sources)
+
+    result = {
+        "holdout": report,
+        "train_seconds": round(train_seconds, 2),
+        "sources": args.sources,
+        "classify_seconds": round(classify_seconds, 2),
+        "sources_per_second": round(args.sources / classify_seconds),
+        "variant_agreement": round(agreement, 3),
+    }
+    print(f"exactitude (catalogue mis de côté) : {report['accuracy']:.1%},"
+          f" confiance ≥ 0.8 : {report['confidence_0.8']['share']:.0%} des sources"
+          f" à {report['confidence_0.8']['accuracy']:.1%}")
+    print(f"apprentissage : {train_seconds:.2f} s ; {args.sources:,} sources classées en {classify_seconds:.2f} s"
+          f" ({result['sources_per_second']:,}/s), {agreement:.1%} dans la catégorie de leur modèle")
+
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2), encoding='utf-8')
+
+if __name__ == "__main__":
+    main()
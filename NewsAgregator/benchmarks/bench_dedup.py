@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai de article_dedup : signatures MinHash et regroupement LSH sur
+des articles synthétiques dont une partie sont des reprises d'une même
+dépêche (titre en capitales, un mot de l'extrait changé, « (AFP) » ajouté).
+
+Mesure le temps de calcul des signatures (fait une fois par téléchargement
+dans le service) et celui du regroupement (fait à chaque requête), puis la
+qualité : groupes purs (une seule dépêche) et dépêches retrouvées.
+
+    python benchmarks/bench_dedup.py [--articles 40000] [--reprises 0.2]
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from article_dedup import article_signature, cluster_articles  # noqa: E402
+
+def synthetic_articles(count, copies_ratio, seed):
+    """Articles et, pour chacun, l'indice de la dépêche d'origine"""
+    rng = random.Random(seed)
+    vocabulary = [''.join(rng.choices(string.ascii_lowercase + 'éèàç', k=rng.randint(3, 10)))
+                  for _ in range(8000)]
+    originals = int(count * (1 - copies_ratio))
+    stories = [(' '.join(rng.choices(vocabulary, k=10)), ' '.join(rng.choices(vocabulary, k=25)))
+               for _ in range(originals)]
+    articles = [{"title": title, "excerpt": excerpt} for title, excerpt in stories]
+    truth = list(range(originals))
+    for _ in range(count - originals):
+        story = rng.randrange(originals)
+        title, excerpt = stories[story]
+        words = excerpt.split()
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+        articles.append({"title": title.upper(), "excerpt": ' '.join(words) + " (AFP)"})
+        truth.append(story)
+    order = list(range(count))
+    rng.shuffle(order)
+    return [articles[i] for i in order], [truth[i] for i in order]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=40000, help="nombre d'articles")
+    parser.add_argument("--reprises", type=float, default=0.2, help="part d'articles qui sont des reprises")
+    parser.add_argument("--graine", type=int, default=42, help="graine du générateur")
+    parser.add_argument("--json", type=Path, help="enregistrer les résultats dans ce fichier")
+    args = parser.parse_args()
+
+    articles, truth = synthetic_articles(args.articles, args.reprises, args.graine)
+
+    start = time.perf_counter()
+    signatures = [article_signature(article) for article in articles]
+    signature_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    groups = cluster_articles(articles, signatures=signatures)
+    cluster_seconds = time.perf_counter() - start
+
+    pure = sum(1 for group in groups if len({truth[position] for position in group}) == 1)
+    result = {
+        "articles": len(articles),
+        "stories": len(set(truth)),
+        "groups": len(groups),
+        "pure_groups": pure,
+        "signature_seconds": round(signature_seconds, 3),
+        "cluster_seconds": round(cluster_seconds, 3),
+    }
+    print(f"{result['articles']:,} articles, {result['stories']:,} dépêches → {result['groups']:,} groupes"
+          f" ({pure / len(groups):.1%} purs)")
+    print(f"signatures : {signature_seconds:.2f} s ({signature_seconds / len(articles) * 1e6:.0f} µs/article)")
+    print(f"regroupement LSH : {cluster_seconds:.2f} s")
+
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2), encoding='utf-8')
+
+if __name__ == "__main__":
+    main()
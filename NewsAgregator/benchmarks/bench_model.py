@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai mémoire de catalog_model.Catalog face au dict de dicts de
+load_catalog(), sur les catalogues synthétiques de bench_catalog.
+
+Pour chaque taille : mémoire retenue après chargement, pic pendant le
+chargement (tracemalloc), temps de chargement et d'écriture, avec puis sans
+l'index de déduplication (UrlIndex d'un côté, Catalog.index de l'autre).
+L'aller-retour JSON est vérifié à l'octet près.
+
+    python benchmarks/bench_model.py [--tailles 10000 100000 1000000] [--json res.json]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_catalog import SourceGenerator, synthetic_catalog  # noqa: E402
+from catalog_core import UrlIndex, load_catalog, save_catalog  # noqa: E402
+from catalog_model import Catalog  # noqa: E402
+
+def measure(function):
+    """(résultat, secondes, octets retenus, pic en octets) d'un appel"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+def bench_size(size, seed):
+    generate = SourceGenerator(size, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_file = Path(tmp) / "catalog.json"
+        save_catalog(synthetic_catalog(generate(size)), catalog_file)
+        del generate
+        reference = catalog_file.read_bytes()
+
+        data, dict_seconds, dict_bytes, dict_peak = measure(lambda: load_catalog(catalog_file))
+        index, _, dict_index_bytes, _ = measure(lambda: UrlIndex.from_catalog(data))
+        del data, index
+
+        catalog, model_seconds, model_bytes, model_peak = measure(lambda: Catalog.load(catalog_file))
+        _, _, model_index_bytes, _ = measure(lambda: catalog.index)
+
+        start = time.perf_counter()
+        catalog.save(catalog_file)
+        save_seconds = time.perf_counter() - start
+        lossless = catalog_file.read_bytes() == reference
+
+    return {
+        "size": size,
+        "dict": {"bytes": dict_bytes, "peak_bytes": dict_peak, "index_bytes": dict_index_bytes,
+                 "load_seconds": round(dict_seconds, 3)},
+        "model": {"bytes": model_bytes, "peak_bytes": model_peak, "index_bytes": model_index_bytes,
+                  "load_seconds": round(model_seconds, 3), "save_seconds": round(save_seconds, 3)},
+        "lossless": lossless,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="nombres de sources des catalogues synthétiques")
+    parser.add_argument("--graine", type=int, default=42, help="graine du générateur")
+    parser.add_argument("--json", type=Path, help="enregistrer les résultats dans ce fichier")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'sources':>10}{'dicts Mo':>10}{'modèle Mo':>11}{'gain':>7}"
+          f"{'pic dicts':>11}{'pic modèle':>12}{'index d/m Mo':>15}  aller-retour")
+    for size in args.tailles:
+        entry = bench_size(size, args.graine)
+        results.append(entry)
+        dicts, model = entry["dict"], entry["model"]
+        print(f"{size:>10,}{dicts['bytes'] / 1e6:>10.1f}{model['bytes'] / 1e6:>11.1f}"
+              f"{dicts['bytes'] / model['bytes']:>6.1f}×{dicts['peak_bytes'] / 1e6:>11.1f}"
+              f"{model['peak_bytes'] / 1e6:>12.1f}"
+              f"{dicts['index_bytes'] / 1e6:>8.1f}/{model['index_bytes'] / 1e6:<6.1f}"
+              f"  {'identique' if entry['lossless'] else 'DIFFÉRENT'}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai de feed_parser : articles analysés par seconde sur des flux de
+référence (fixtures/) gonflés à la taille de nos plus gros flux.
+
+Chaque fixture est dupliquée élément par élément (--items) pour simuler par
+exemple un flux radiofrance-podcast.net de plusieurs milliers d'épisodes.
+Des flux réels sauvegardés peuvent être passés en argument, tels quels.
+
+    python benchmarks/bench_parser.py [--items 5000] [--tours 5] [flux.xml ...]
+"""
+
+import argparse
+import io
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from feed_parser import iter_articles  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+ITEM_BLOCK_RE = re.compile(rb'(<(item|entry)[\s>].*?</\2>)\s*', re.DOTALL)
+
+def inflate(xml_bytes, items):
+    """Répète les éléments <item>/<entry> jusqu'à en avoir `items`"""
+    blocks = [match.group(1) for match in ITEM_BLOCK_RE.finditer(xml_bytes)]
+    if not blocks or items <= len(blocks):
+        return xml_bytes
+    first = ITEM_BLOCK_RE.search(xml_bytes)
+    last_end = list(ITEM_BLOCK_RE.finditer(xml_bytes))[-1].end()
+    repeated = b'\n'.join(blocks[i % len(blocks)] for i in range(items))
+    return xml_bytes[:first.start()] + repeated + b'\n' + xml_bytes[last_end:]
+
+def bench(xml_bytes, rounds):
+    """Temps médian d'analyse complète et nombre d'articles produits"""
+    source = {"name": "bench", "category": "bench"}
+    timings, count = [], 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        count = sum(1 for _ in iter_articles(io.BytesIO(xml_bytes), source))
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for _ in iter_articles(io.BytesIO(xml_bytes), source):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), count, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("flux", nargs="*", type=Path, help="flux supplémentaires (non gonflés)")
+    parser.add_argument("--items", type=int, default=5000, help="taille des flux de référence gonflés")
+    parser.add_argument("--tours", type=int, default=5, help="nombre de mesures par flux")
+    parser.add_argument("--json", type=Path, help="enregistrer les résultats dans ce fichier")
+    args = parser.parse_args()
+
+    cases = [(path, inflate(path.read_bytes(), args.items)) for path in sorted(FIXTURES_DIR.glob("*.xml"))]
+    cases += [(path, path.read_bytes()) for path in args.flux]
+
+    results = []
+    print(f"{'flux':<28}{'articles':>10}{'Mo':>8}{'articles/s':>14}{'Mo/s':>8}{'pic Mo':>9}")
+    for path, xml_bytes in cases:
+        elapsed, count, peak = bench(xml_bytes, args.tours)
+        size_mb = len(xml_bytes) / 1e6
+        result = {
+            "feed": path.name,
+            "items": count,
+            "bytes": len(xml_bytes),
+            "seconds": round(elapsed, 4),
+            "items_per_second": round(count / elapsed),
+            "peak_memory_bytes": peak,
+        }
+        results.append(result)
+        print(f"{path.name:<28}{count:>10}{size_mb:>8.1f}{result['items_per_second']:>14,}"
+              f"{size_mb / elapsed:>8.1f}{peak / 1e6:>9.1f}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai de article_index : indexation puis recherche BM25 sur une
+semaine d'articles synthétiques (10 000 flux × 30 articles par défaut).
+
+Les mots suivent une loi de Zipf sur un vocabulaire accentué, comme un
+texte réel : quelques mots très fréquents, une longue traîne de mots rares.
+Mesure le débit d'indexation par lots de flux (comme au fil des
+rafraîchissements), la taille de la base, puis les latences médiane et
+p95 de requêtes d'un à trois mots, le dernier en préfixe.
+
+    python benchmarks/bench_search.py [--flux 10000] [--articles-par-flux 30]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from article_index import ArticleIndex  # noqa: E402
+
+VOCABULARY = 30000
+
+def synthetic_feeds(feeds, per_feed, seed):
+    """Par flux : (URL, articles datés sur les 7 derniers jours)"""
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase + 'éèàçô'
+    vocabulary = [''.join(rng.choices(letters, k=rng.randint(3, 11))) for _ in range(VOCABULARY)]
+    weights = list(accumulate(1 / rank for rank in range(1, VOCABULARY + 1)))
+    now = datetime.now(timezone.utc)
+    for feed in range(feeds):
+        url = f"https://flux{feed}.example/rss"
+        articles = []
+        for item in range(per_feed):
+            title = rng.choices(vocabulary, cum_weights=weights, k=rng.randint(6, 12))
+            excerpt = rng.choices(vocabulary, cum_weights=weights, k=rng.randint(15, 30))
+            articles.append({
+                "title": ' '.join(title).capitalize(),
+                "link": f"{url[:-4]}/article/{item}",
+                "excerpt": ' '.join(excerpt)[:200],  # comme parse_item()
+                "date": (now - timedelta(seconds=rng.uniform(0, 6.5 * 86400))).isoformat(),
+            })
+        yield url, articles
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flux", type=int, default=10000, help="nombre de flux")
+    parser.add_argument("--articles-par-flux", type=int, default=30, help="articles par flux sur la semaine")
+    parser.add_argument("--requetes", type=int, default=500, help="nombre de requêtes mesurées")
+    parser.add_argument("--graine", type=int, default=42, help="graine du générateur")
+    parser.add_argument("--json", type=Path, help="enregistrer les résultats dans ce fichier")
+    args = parser.parse_args()
+
+    rng = random.Random(args.graine)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "articles.db"
+        index = ArticleIndex(db_file)
+        words = []
+        start = time.perf_counter()
+        for url, feed_articles in synthetic_feeds(args.flux, args.articles_par_flux, args.graine):
+            index.add_articles(url, feed_articles, source=url, category='general')
+            if len(words) < 5000:
+                words.extend(feed_articles[0]["title"].lower().split())
+        index_seconds = time.perf_counter() - start
+        articles = index.stats()["articles"]
+
+        # Flux rafraîchi sans nouvel article : le cas le plus courant
+        start = time.perf_counter()
+        index.add_articles(url, feed_articles)
+        known_ms = (time.perf_counter() - start) * 1000
+        index.close()
+        size = sum(path.stat().st_size for path in Path(tmp).iterdir())
+
+        # Réouverture : l'index persisté est utilisable sans reconstruction
+        start = time.perf_counter()
+        index = ArticleIndex(db_file)
+        reopen_seconds = time.perf_counter() - start
+
+        latencies, hits = [], []
+        for _ in range(args.requetes):
+            query = rng.sample(words, rng.randint(1, 3))
+            query[-1] = query[-1][:max(3, len(query[-1]) - 2)]
+            start = time.perf_counter()
+            hits.append(len(index.search(' '.join(query), limit=20)))
+            latencies.append((time.perf_counter() - start) * 1000)
+        index.close()
+
+    latencies.sort()
+    result = {
+        "articles": articles,
+        "index_seconds": round(index_seconds, 2),
+        "articles_per_second": round(articles / index_seconds),
+        "db_bytes": size,
+        "known_feed_ms": round(known_ms, 2),
+        "reopen_ms": round(reopen_seconds * 1000, 2),
+        "query_p50_ms": round(statistics.median(latencies), 2),
+        "query_p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+        "mean_hits": round(statistics.mean(hits), 1),
+    }
+    print(f"{articles:,} articles indexés en {index_seconds:.1f} s"
+          f" ({result['articles_per_second']:,}/s), base de {size / 1e6:.0f} Mo")
+    print(f"flux déjà indexé : {result['known_feed_ms']} ms, réouverture : {result['reopen_ms']} ms")
+    print(f"requêtes : médiane {result['query_p50_ms']} ms, p95 {result['query_p95_ms']} ms"
+          f" ({result['mean_hits']} résultats en moyenne)")
+
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2), encoding='utf-8')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai de article_wire : taille et temps d'encodage / décodage du
+format compact face au JSON ordinaire, sur une semaine d'articles
+synthétiques (1 000 flux × 30 articles, 20 catégories par défaut).
+
+Les articles ont la forme de ceux de parse_feed (titre, lien, extrait de
+200 caractères au plus, date ISO, source, catégorie, image), une partie
+avec `alsoCoveredBy`. Chaque format est mesuré brut et après gzip (niveau
+5, comme le service) ; le décodage reconstruit les articles complets.
+
+    python benchmarks/bench_wire.py [--flux 1000] [--articles-par-flux 30]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import string
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import article_wire  # noqa: E402
+
+def synthetic_week(feeds, per_feed, categories, seed):
+    """Articles d'une semaine groupés par catégorie, du plus récent au plus ancien"""
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase + 'éèàçô'
+    vocabulary = [''.join(rng.choices(letters, k=rng.randint(3, 10))) for _ in range(8000)]
+    now = datetime.now(timezone.utc)
+    groups = {f"categorie-{number}": [] for number in range(categories)}
+    keys = list(groups)
+    for feed in range(feeds):
+        name = ' '.join(rng.choices(vocabulary, k=rng.randint(1, 3))).title()
+        host = f"www.{rng.choice(vocabulary)}{feed}.fr"
+        category = keys[feed % categories]
+        for item in range(per_feed):
+            slug = '-'.join(rng.choices(vocabulary, k=6))
+            article = {
+                "title": ' '.join(rng.choices(vocabulary, k=rng.randint(6, 12))).capitalize(),
+                "link": f"https://{host}/{category}/{slug}-{item}.html",
+                "excerpt": ' '.join(rng.choices(vocabulary, k=30))[:200],
+                "date": (now - timedelta(seconds=rng.uniform(0, 7 * 86400))).replace(microsecond=0).isoformat(),
+                "source": name,
+                "category": category,
+                "imageUrl": f"https://{host}/images/{slug}.jpg" if rng.random() < 0.7 else '',
+            }
+            if rng.random() < 0.1:
+                article["alsoCoveredBy"] = [
+                    {"source": name, "title": article["title"], "link": f"https://autre{feed}.fr/{slug}"}
+                ]
+            groups[category].append(article)
+    for articles in groups.values():
+        articles.sort(key=lambda article: article["date"], reverse=True)
+    return list(groups.items())
+
+def measure(encode, decode, repeat):
+    """(octets, octets gzip, ms d'encodage, ms de décodage), meilleur de `repeat` essais"""
+    encode_times, decode_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode()
+        encode_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        decode(body)
+        decode_times.append(time.perf_counter() - start)
+    return len(body), len(gzip.compress(body, compresslevel=5)), min(encode_times) * 1000, min(decode_times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flux", type=int, default=1000, help="nombre de flux")
+    parser.add_argument("--articles-par-flux", type=int, default=30, help="articles par flux sur la semaine")
+    parser.add_argument("--categories", type=int, default=20, help="nombre de catégories")
+    parser.add_argument("--essais", type=int, default=3, help="mesures par format (la meilleure est gardée)")
+    parser.add_argument("--graine", type=int, default=42, help="graine du générateur")
+    parser.add_argument("--json", type=Path, help="enregistrer les résultats dans ce fichier")
+    args = parser.parse_args()
+
+    groups = synthetic_week(args.flux, args.articles_par_flux, args.categories, args.graine)
+    articles = [article for _, category_articles in groups for article in category_articles]
+
+    formats = {
+        "json": (
+            lambda: json.dumps({"articles": articles}, ensure_ascii=False).encode('utf-8'),
+            lambda body: json.loads(body)["articles"],
+        ),
+        "compact": (
+            lambda: json.dumps(article_wire.encode_compact(articles), ensure_ascii=False).encode('utf-8'),
+            lambda body: article_wire.decode_compact(json.loads(body)),
+        ),
+        "ndjson": (
+            lambda: b''.join(article_wire.iter_stream(groups, "ndjson")),
+            lambda body: list(article_wire.decode_ndjson(body.splitlines())),
+        ),
+    }
+    if article_wire.msgpack is not None:
+        formats["msgpack"] = (
+            lambda: b''.join(article_wire.iter_stream(groups, "msgpack")),
+            lambda body: list(article_wire.decode_msgpack(body)),
+        )
+    else:
+        print("ℹ️ msgpack absent : format MessagePack non mesuré")
+
+    # Le décodage doit rendre les articles d'origine
+    for name in ("compact", "ndjson", "msgpack"):
+        if name in formats:
+            encode, decode = formats[name]
+            decoded = decode(encode())
+            decoded = [article for _, article in decoded] if name != "compact" else decoded
+            assert decoded == articles, f"{name} : articles décodés différents"
+
+    result = {"articles": len(articles), "formats": {}}
+    print(f"{len(articles):,} articles, {len(groups)} catégories")
+    print(f"{'format':<8} {'octets':>12} {'gzip':>12} {'encodage':>10} {'décodage':>10}")
+    for name, (encode, decode) in formats.items():
+        size, gzipped, encode_ms, decode_ms = measure(encode, decode, args.essais)
+        result["formats"][name] = {
+            "bytes": size, "gzip_bytes": gzipped,
+            "encode_ms": round(encode_ms, 1), "decode_ms": round(decode_ms, 1),
+        }
+        print(f"{name:<8} {size:>12,} {gzipped:>12,} {encode_ms:>8.0f} ms {decode_ms:>8.0f} ms")
+    base = result["formats"]["json"]
+    for name, measures in result["formats"].items():
+        if name != "json":
+            print(f"{name} : {measures['bytes'] / base['bytes']:.0%} de la taille JSON,"
+                  f" {measures['gzip_bytes'] / base['gzip_bytes']:.0%} après gzip")
+
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2), encoding='utf-8')
+
+if __name__ == "__main__":
+    main()
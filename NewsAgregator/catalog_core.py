@@ -0,0 +1,220 @@
+"""
+Fonctions de base du catalogue, partagées par le script d'extraction, le
+journal et les autres modules : normalisation des URLs, index des doublons,
+écriture atomique et fusion de sources dans le catalogue en mémoire.
+"""
+
+import hashlib
+import json
+import os
+import re
+import stat
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Chemins des fichiers
+SCRIPT_DIR = Path(__file__).parent
+JSON_FILE = SCRIPT_DIR / "rss-sources-complete.json"
+
+# Hôtes FeedBurner dont les variantes ?format=xml pointent vers le même flux
+FEEDBURNER_HOSTS = {"feeds.feedburner.com", "feeds2.feedburner.com", "feedproxy.google.com"}
+FEEDBURNER_FORMAT_PARAMS = {"format", "fmt"}
+
+# Enveloppe morss.it sans option : https://morss.it/https://exemple.fr/feed
+MORSS_WRAPPER = re.compile(r'^(?:https?://)?(?:www\.)?morss\.it/+(?=https?://)', re.IGNORECASE)
+
+# Clés de catégorie utilisables telles quelles comme nom de fichier ou de dossier
+SAFE_FILE_KEY = re.compile(r'[A-Za-z0-9_-]+')
+
+def normalize_url(url):
+    """
+    Forme canonique d'une URL de flux, utilisée comme clé de déduplication :
+    schéma ignoré (http == https), hôte en minuscules, port par défaut et
+    slashs finaux retirés, variantes FeedBurner ?format=xml et enveloppes
+    morss.it sans option déballées.
+    """
+    url = url.strip()
+    
+    # Déballer les enveloppes morss.it (les variantes avec options comme
+    # :items=... changent le contenu et restent donc distinctes)
+    while True:
+        unwrapped = MORSS_WRAPPER.sub('', url, count=1)
+        if unwrapped == url:
+            break
+        url = unwrapped
+    
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    
+    path = parts.path.rstrip('/')
+    
+    query = parts.query
+    if host in FEEDBURNER_HOSTS and query:
+        params = [
+            (k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+            if k.lower() not in FEEDBURNER_FORMAT_PARAMS
+        ]
+        query = urlencode(params)
+    
+    return f"//{host}{path}?{query}" if query else f"//{host}{path}"
+
+class UrlIndex:
+    """Index global URL normalisée → catégories, construit une fois par exécution"""
+    
+    def __init__(self):
+        self._categories = {}
+    
+    @classmethod
+    def from_catalog(cls, data):
+        """Construit l'index à partir de toutes les catégories du catalogue"""
+        index = cls()
+        for category_key, category in data["categories"].items():
+            for source in category["sources"]:
+                index.record(source["url"], category_key)
+                # Anciennes URLs d'une source regroupée (feed_redirects) : toujours des doublons
+                for alias in source.get("aliases", ()):
+                    if alias not in index:
+                        index.add(alias, category_key)
+        return index
+    
+    def __len__(self):
+        return len(self._categories)
+    
+    def __contains__(self, url):
+        return normalize_url(url) in self._categories
+    
+    def add(self, url, category_key):
+        """
+        Enregistre une URL si elle est inconnue du catalogue et retourne True ;
+        une URL déjà connue (source refusée) ne change rien à l'index.
+        """
+        key = normalize_url(url)
+        if key in self._categories:
+            return False
+        self._categories[key] = [category_key]
+        return True
+    
+    def record(self, url, category_key):
+        """Enregistre une source présente dans le catalogue, même si son URL y figure déjà"""
+        self._categories.setdefault(normalize_url(url), []).append(category_key)
+    
+    def remove(self, url, category_key=None):
+        """Oublie une URL retirée du catalogue, ou d'une seule catégorie"""
+        key = normalize_url(url)
+        if category_key is None:
+            self._categories.pop(key, None)
+            return
+        owners = self._categories.get(key)
+        if owners and category_key in owners:
+            owners.remove(category_key)
+            if not owners:
+                del self._categories[key]
+    
+    def categories_for(self, url):
+        """Catégories dans lesquelles l'URL apparaît déjà"""
+        return list(self._categories.get(normalize_url(url), ()))
+    
+    def duplicates(self):
+        """URLs présentes plusieurs fois dans le catalogue, avec leurs catégories"""
+        return {key: owners for key, owners in self._categories.items() if len(owners) > 1}
+    
+    def cross_category_duplicates(self):
+        """URLs partagées par au moins deux catégories différentes"""
+        return {
+            key: sorted(set(owners)) for key, owners in self._categories.items()
+            if len(set(owners)) > 1
+        }
+
+def file_key(category_key, reserved=()):
+    """
+    Nom de fichier (ou de dossier) d'une catégorie : sa clé si elle n'a que
+    des lettres, chiffres, _ et -, sinon sa forme réduite suivie de « ~ » et
+    d'une empreinte de la clé. Une clé venue d'un OPML ou d'une page (« ../x »,
+    « a/b ») ne sort jamais du dossier, et deux clés restent distinctes.
+    `reserved` : noms déjà pris dans le dossier (« manifest »...).
+    """
+    if SAFE_FILE_KEY.fullmatch(category_key) and category_key not in reserved:
+        return category_key
+    stem = '_'.join(SAFE_FILE_KEY.findall(category_key))
+    return f"{stem}~{hashlib.sha256(category_key.encode('utf-8')).hexdigest()[:12]}"
+
+@contextmanager
+def atomic_write(path, mode='w'):
+    """Ouvre un fichier temporaire qui remplace `path` atomiquement à la fermeture"""
+    path = Path(path)
+    # Le fichier temporaire doit être sur le même système de fichiers
+    # pour que os.replace() soit atomique
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        # mkstemp crée en 0600 : reprendre les droits du fichier remplacé
+        # (ou ceux par défaut), sinon le serveur web ne peut plus le lire
+        try:
+            permissions = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            permissions = 0o666 & ~umask
+        os.chmod(tmp_path, permissions)
+        encoding = None if 'b' in mode else 'utf-8'
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Ne jamais laisser traîner un fichier temporaire à moitié écrit
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def load_catalog(json_file=JSON_FILE):
+    """Charge le catalogue JSON complet en mémoire, modifications du journal comprises"""
+    # Import local : catalog_journal dépend lui-même de ce module
+    from catalog_journal import CatalogJournal
+    journal = CatalogJournal(json_file)
+    if not journal.path.exists():
+        # Jamais de journal : l'instantané, remplacé atomiquement, suffit
+        with open(json_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    with journal.lock(exclusive=False):
+        return journal.load()
+
+def save_catalog(data, json_file=JSON_FILE):
+    """Écrit le catalogue de façon atomique (fichier temporaire + renommage)"""
+    with atomic_write(json_file) as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def merge_sources(data, category_key, category_name, sources, url_index=None):
+    """
+    Ajoute les sources à une catégorie du catalogue déjà chargé en mémoire.
+    
+    Une URL déjà présente dans n'importe quelle catégorie (après normalisation)
+    est ignorée. Passer le même `url_index` d'un appel à l'autre évite de le
+    reconstruire pour chaque catégorie.
+    """
+    if url_index is None:
+        url_index = UrlIndex.from_catalog(data)
+    
+    # Créer la catégorie si elle n'existe pas
+    if category_key not in data["categories"]:
+        data["categories"][category_key] = {
+            "name": category_name,
+            "description": f"Sources {category_name.lower()}",
+            "sources": []
+        }
+    
+    # Ajouter les nouvelles sources (doublons détectés sur tout le catalogue)
+    category_sources = data["categories"][category_key]["sources"]
+    added_count = 0
+    for source in sources:
+        if url_index.add(source["url"], category_key):
+            category_sources.append(source)
+            added_count += 1
+    
+    return added_count
@@ -0,0 +1,275 @@
+"""
+Base SQLite parallèle au catalogue rss-sources-complete.json : sources,
+catégories et hôtes, index plein texte FTS5 sur les noms et index sur l'URL
+normalisée.
+
+La base reproduit le catalogue tel quel (sync puis export le restituent à
+l'identique) : une même URL peut figurer dans plusieurs catégories, voire
+deux fois dans une catégorie, comme dans le fichier JSON, et les champs
+autres que name et url (check, aliases...) sont gardés en JSON. Seule
+l'ingestion de pages (upsert_batches) déduplique, avec la règle de
+merge_sources() : une URL déjà présente dans le catalogue est ignorée.
+"""
+
+import json
+import sqlite3
+
+from catalog_core import SCRIPT_DIR, normalize_url
+
+DB_FILE = SCRIPT_DIR / "rss-sources.db"
+SCHEMA_VERSION = 2  # 2 : URL non unique, champs supplémentaires des sources
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL  -- valeur encodée en JSON
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    id          INTEGER PRIMARY KEY,
+    key         TEXT NOT NULL UNIQUE,
+    name        TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT ''
+);
+
+-- rev_name = hôte inversé (fr.lemonde.www) : la recherche d'un domaine et de
+-- ses sous-domaines devient une recherche de préfixe servie par l'index
+CREATE TABLE IF NOT EXISTS hosts (
+    id       INTEGER PRIMARY KEY,
+    name     TEXT NOT NULL UNIQUE,
+    rev_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hosts_rev_name ON hosts(rev_name);
+
+CREATE TABLE IF NOT EXISTS sources (
+    id          INTEGER PRIMARY KEY,
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    host_id     INTEGER NOT NULL REFERENCES hosts(id),
+    name        TEXT NOT NULL,
+    url         TEXT NOT NULL,
+    url_key     TEXT NOT NULL,
+    extra       TEXT            -- autres champs de la source en JSON (check, aliases...), NULL sinon
+);
+CREATE INDEX IF NOT EXISTS sources_category ON sources(category_id);
+CREATE INDEX IF NOT EXISTS sources_url_key ON sources(url_key, category_id);
+CREATE INDEX IF NOT EXISTS sources_host ON sources(host_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS sources_fts USING fts5(
+    name,
+    content='sources',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS sources_ai AFTER INSERT ON sources BEGIN
+    INSERT INTO sources_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS sources_ad AFTER DELETE ON sources BEGIN
+    INSERT INTO sources_fts(sources_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS sources_au AFTER UPDATE OF name ON sources BEGIN
+    INSERT INTO sources_fts(sources_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO sources_fts(rowid, name) VALUES (new.id, new.name);
+END;
+"""
+
+def connect(db_file=DB_FILE):
+    """Ouvre la base (en la créant si besoin) avec le schéma à jour"""
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        # Ancien schéma (URL unique sur toute la base) : les sources, dérivées
+        # du catalogue, sont recréées vides ; `db sync` les réimporte
+        conn.executescript("""
+            DROP TRIGGER IF EXISTS sources_ai;
+            DROP TRIGGER IF EXISTS sources_ad;
+            DROP TRIGGER IF EXISTS sources_au;
+            DROP TABLE IF EXISTS sources_fts;
+            DROP TABLE IF EXISTS sources;
+        """)
+    conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+def host_of(url_key):
+    """Hôte d'une URL déjà normalisée (//hote/chemin?requete)"""
+    return url_key[2:].split('/', 1)[0].split('?', 1)[0]
+
+class _Upserter:
+    """Caches d'identifiants pour une série d'upserts dans une même transaction"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.category_ids = dict(conn.execute("SELECT key, id FROM categories"))
+        self.host_ids = dict(conn.execute("SELECT name, id FROM hosts"))
+
+    def category_id(self, category_key, category_name, description=None):
+        category_id = self.category_ids.get(category_key)
+        if category_id is None:
+            cursor = self.conn.execute(
+                "INSERT INTO categories(key, name, description) VALUES (?, ?, ?)",
+                (category_key, category_name,
+                 description if description is not None else f"Sources {category_name.lower()}"),
+            )
+            category_id = self.category_ids[category_key] = cursor.lastrowid
+        return category_id
+
+    def host_id(self, host):
+        host_id = self.host_ids.get(host)
+        if host_id is None:
+            rev_name = '.'.join(reversed(host.split('.')))
+            cursor = self.conn.execute(
+                "INSERT INTO hosts(name, rev_name) VALUES (?, ?)", (host, rev_name)
+            )
+            host_id = self.host_ids[host] = cursor.lastrowid
+        return host_id
+
+    def insert(self, category_id, source, url_key=None):
+        """Insère une source telle quelle, champs supplémentaires compris"""
+        url_key = url_key or normalize_url(source["url"])
+        extra = {key: value for key, value in source.items() if key not in ("name", "url")}
+        self.conn.execute(
+            "INSERT INTO sources(category_id, host_id, name, url, url_key, extra) VALUES (?, ?, ?, ?, ?, ?)",
+            (category_id, self.host_id(host_of(url_key)), source["name"], source["url"], url_key,
+             json.dumps(extra, ensure_ascii=False) if extra else None),
+        )
+
+    def source(self, category_id, source):
+        """Insère une source si son URL est inconnue du catalogue ; retourne True si ajoutée"""
+        url_key = normalize_url(source["url"])
+        known = self.conn.execute("SELECT 1 FROM sources WHERE url_key = ? LIMIT 1", (url_key,)).fetchone()
+        if known is None:
+            self.insert(category_id, source, url_key)
+            return True
+        # URL déjà connue : seul le nom suit, et seulement dans sa propre catégorie
+        self.conn.execute(
+            "UPDATE sources SET name = ? WHERE url_key = ? AND category_id = ? AND name != ?",
+            (source["name"], url_key, category_id, source["name"]),
+        )
+        return False
+
+def _upsert(upserter, batches):
+    results = []
+    for category_key, category_name, sources in batches:
+        category_id = upserter.category_id(category_key, category_name)
+        found = added = 0
+        for source in sources:
+            found += 1
+            added += upserter.source(category_id, source)
+        results.append((category_name, found, added))
+    return results
+
+def upsert_batches(conn, batches):
+    """
+    Upsert groupé de (category_key, category_name, sources) dans une seule
+    transaction. Retourne la liste des tuples (category_name, trouvés, ajoutés).
+    """
+    with conn:
+        return _upsert(_Upserter(conn), batches)
+
+def delete_sources(conn, removals):
+    """
+    Retire des sources [(category_key, url)] dans une seule transaction ;
+    retourne le nombre de sources retirées.
+    """
+    with conn:
+        return sum(
+            conn.execute(
+                "DELETE FROM sources WHERE url_key = ?"
+                " AND category_id = (SELECT id FROM categories WHERE key = ?)",
+                (normalize_url(url), category_key),
+            ).rowcount
+            for category_key, url in removals
+        )
+
+def sync_from_catalog(conn, data):
+    """
+    Remplace le contenu de la base par le catalogue JSON, à l'identique (une
+    seule transaction). Retourne la liste des tuples (category_name, trouvés,
+    ajoutés), « ajoutés » comptant les sources absentes de la base jusque-là.
+    """
+    with conn:
+        known = {
+            (key, url) for key, url in
+            conn.execute("SELECT c.key, s.url FROM sources s JOIN categories c ON c.id = s.category_id")
+        }
+        conn.execute("DELETE FROM metadata")
+        conn.executemany(
+            "INSERT INTO metadata(key, value) VALUES (?, ?)",
+            ((key, json.dumps(value, ensure_ascii=False))
+             for key, value in data.get("metadata", {}).items()),
+        )
+        conn.execute("DELETE FROM sources")
+        conn.execute("DELETE FROM categories")
+        upserter = _Upserter(conn)
+        results = []
+        for category_key, category in data["categories"].items():
+            category_id = upserter.category_id(category_key, category["name"], category.get("description", ""))
+            added = 0
+            for source in category["sources"]:
+                upserter.insert(category_id, source)
+                added += (category_key, source["url"]) not in known
+            results.append((category["name"], len(category["sources"]), added))
+        return results
+
+def export_catalog(conn):
+    """Reconstruit la structure de rss-sources-complete.json depuis la base"""
+    data = {
+        "metadata": {
+            key: json.loads(value)
+            for key, value in conn.execute("SELECT key, value FROM metadata ORDER BY rowid")
+        },
+        "categories": {},
+    }
+    for row in conn.execute("SELECT id, key, name, description FROM categories ORDER BY id"):
+        sources = [
+            {"name": name, "url": url, **(json.loads(extra) if extra else {})}
+            for name, url, extra in conn.execute(
+                "SELECT name, url, extra FROM sources WHERE category_id = ? ORDER BY id", (row["id"],)
+            )
+        ]
+        data["categories"][row["key"]] = {
+            "name": row["name"],
+            "description": row["description"],
+            "sources": sources,
+        }
+    return data
+
+def fts_prefix_query(text):
+    """Transforme un texte libre en requête FTS5 de préfixes ("le" "mon" → "le"* "mon"*)"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def search(conn, name=None, host=None, category=None, limit=50):
+    """Recherche des sources par préfixe de nom, domaine et/ou catégorie"""
+    clauses, params = [], []
+    joins = "JOIN categories c ON c.id = s.category_id JOIN hosts h ON h.id = s.host_id"
+    if name:
+        joins += " JOIN sources_fts f ON f.rowid = s.id"
+        clauses.append("sources_fts MATCH ?")
+        params.append(fts_prefix_query(name))
+    if host:
+        # Le domaine lui-même et tous ses sous-domaines
+        rev_name = '.'.join(reversed(host.lower().split('.')))
+        clauses.append("(h.rev_name = ? OR h.rev_name GLOB ?)")
+        params += [rev_name, rev_name + '.*']
+    if category:
+        clauses.append("c.key = ?")
+        params.append(category)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    order = "ORDER BY f.rank" if name else "ORDER BY s.id"
+    sql = f"""
+        SELECT s.name, s.url, c.key AS category, h.name AS host
+        FROM sources s {joins} {where} {order} LIMIT ?
+    """
+    return [dict(row) for row in conn.execute(sql, [*params, limit])]
+
+def stats(conn):
+    """Compteurs globaux de la base"""
+    return {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("categories", "hosts", "sources")
+    }
@@ -0,0 +1,264 @@
+"""
+Journal des modifications du catalogue, pour des écritures concurrentes sans
+perte.
+
+Au lieu de relire, modifier et réécrire tout rss-sources-complete.json, un
+écrivain ajoute quelques lignes JSON à rss-sources-complete.journal :
+
+    {"op": "add", "category": "tech", "name": "Tech", "source": {...}}
+    {"op": "remove", "url": "https://exemple.fr/feed"}
+    {"op": "update", "url": "https://exemple.fr/feed", "fields": {"check": {...}}}
+
+Un remove ou un update désigne la source par son URL exacte : deux
+variantes d'une même URL normalisée (http/https, slash final) restent
+distinctes. Un champ "category" facultatif le limite à une catégorie ; un
+update peut changer l'URL de la source (champ "url").
+
+Les écrivains (et le compactage) prennent un verrou exclusif fcntl.flock()
+sur rss-sources-complete.json.lock, les lecteurs un verrou partagé : le
+catalogue est le dernier instantané JSON plus le rejeu du journal. Au-delà
+de COMPACT_BYTES, le journal est replié dans l'instantané (écriture
+atomique) puis vidé.
+
+Reprise après un arrêt brutal :
+- une dernière ligne incomplète (écriture interrompue) est ignorée au rejeu
+  et tronquée avant l'ajout suivant ;
+- un arrêt entre l'écriture de l'instantané et la vidange du journal est
+  sans conséquence : le rejeu est idempotent (un ajout d'URL déjà présente
+  est ignoré, une suppression d'URL absente aussi, une mise à jour pose les
+  mêmes valeurs).
+
+Sans fcntl (Windows), les verrous sont sans effet.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from catalog_core import JSON_FILE, UrlIndex, merge_sources, normalize_url, save_catalog
+
+COMPACT_BYTES = 256 * 1024  # taille du journal au-delà de laquelle il est replié dans l'instantané
+TAIL_BLOCK = 64 * 1024
+
+def encode_record(record):
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+def _sources_by_key(data):
+    by_key = {}
+    for category_key, category in data["categories"].items():
+        for source in category["sources"]:
+            by_key.setdefault(normalize_url(source["url"]), []).append((category_key, source))
+    return by_key
+
+def replay_records(data, records, url_index=None):
+    """Applique des modifications du journal, dans l'ordre, au catalogue en mémoire"""
+    if url_index is None:
+        url_index = UrlIndex.from_catalog(data)
+    by_key = None      # URL normalisée → [(catégorie, source)], construit au premier remove/update
+    removed = set()    # id() des sources retirées, filtrées en une passe à la fin
+    for record in records:
+        op = record["op"]
+        if op == "add":
+            source = record["source"]
+            if merge_sources(data, record["category"], record["name"], [source], url_index) and by_key is not None:
+                by_key.setdefault(normalize_url(source["url"]), []).append((record["category"], source))
+            continue
+        if op not in ("remove", "update"):
+            raise ValueError(f"Opération de journal inconnue : {op}")
+        if by_key is None:
+            by_key = _sources_by_key(data)
+        key = normalize_url(record["url"])
+        # "category", facultatif, limite la modification à une catégorie
+        category = record.get("category")
+        entries = by_key.get(key, [])
+        matched = [
+            entry for entry in entries
+            if entry[1]["url"] == record["url"] and (category is None or entry[0] == category)
+        ]
+        if not matched:
+            continue
+        if op == "remove":
+            removed.update(id(source) for _, source in matched)
+            # Une occurrence de moins par source retirée : une variante restée garde la clé
+            for category_key, _ in matched:
+                url_index.remove(record["url"], category_key)
+            entries[:] = [entry for entry in entries if id(entry[1]) not in removed]
+            continue
+        fields = record["fields"]
+        for _, source in matched:
+            for field, value in fields.items():
+                # null retire le champ
+                if value is None:
+                    source.pop(field, None)
+                else:
+                    source[field] = value
+        new_url = fields.get("url")
+        if new_url and normalize_url(new_url) != key:
+            # Source renommée (URL canonique) : l'index suit
+            moved = {id(source) for _, source in matched}
+            entries[:] = [entry for entry in entries if id(entry[1]) not in moved]
+            by_key.setdefault(normalize_url(new_url), []).extend(matched)
+            for category_key, _ in matched:
+                url_index.remove(record["url"], category_key)
+                url_index.record(new_url, category_key)
+        for alias in fields.get("aliases") or ():
+            if alias not in url_index:
+                url_index.add(alias, matched[0][0])
+    if removed:
+        for category in data["categories"].values():
+            category["sources"] = [source for source in category["sources"] if id(source) not in removed]
+
+def remove_records(data, targets):
+    """
+    Modifications "remove" pour des couples (catégorie ou None, URL) donnés
+    sous n'importe quelle variante : une par source du catalogue de même URL
+    normalisée, avec son URL exacte.
+    """
+    wanted = {}
+    for category_key, url in targets:
+        wanted.setdefault(normalize_url(url), set()).add(category_key)
+    records = []
+    for category_key, category in data["categories"].items():
+        for source in category["sources"]:
+            scopes = wanted.get(normalize_url(source["url"]))
+            if scopes and (None in scopes or category_key in scopes):
+                records.append({"op": "remove", "url": source["url"], "category": category_key})
+    return records
+
+class CatalogJournal:
+    """Instantané JSON du catalogue + journal des modifications, sous verrou de fichier"""
+
+    def __init__(self, json_file=JSON_FILE):
+        self.json_file = Path(json_file)
+        self.path = self.json_file.with_name(self.json_file.stem + ".journal")
+        self.lock_path = self.json_file.with_name(self.json_file.name + ".lock")
+
+    @contextmanager
+    def lock(self, exclusive=True):
+        """Verrou exclusif (écriture, compactage) ou partagé (lecture)"""
+        if fcntl is None:
+            yield
+            return
+        try:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+        except PermissionError:
+            if exclusive:
+                raise
+            # Catalogue en lecture seule : personne ne peut l'écrire non plus
+            yield
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)  # libère le verrou
+
+    def size(self):
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def records(self):
+        """
+        Modifications du journal, dans l'ordre. Une dernière ligne sans fin
+        de ligne (écriture interrompue) ou illisible est ignorée.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return []
+        records = []
+        for line in content.split(b'\n')[:-1]:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records
+
+    def replay(self, data, url_index=None):
+        """Rejoue le journal sur le catalogue chargé ; retourne le nombre de modifications lues"""
+        records = self.records()
+        if records:
+            replay_records(data, records, url_index)
+        return len(records)
+
+    def load(self):
+        """Instantané + journal (appeler sous verrou)"""
+        with open(self.json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.replay(data)
+        return data
+
+    def load_indexed(self):
+        """Instantané + journal et son UrlIndex, construit une seule fois pour le rejeu et l'appelant"""
+        with open(self.json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        url_index = UrlIndex.from_catalog(data)
+        self.replay(data, url_index)
+        return data, url_index
+
+    def _repair_tail(self, f):
+        """Tronque une dernière ligne incomplète laissée par un arrêt brutal"""
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - TAIL_BLOCK)
+            f.seek(start)
+            block = f.read(position - start)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            f.truncate(position)
+        f.seek(position)
+
+    def append(self, records):
+        """Ajoute des modifications au journal (appeler sous verrou exclusif)"""
+        payload = b''.join(encode_record(record) for record in records)
+        if not payload:
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        with os.fdopen(fd, 'r+b') as f:
+            self._repair_tail(f)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self, data=None):
+        """
+        Replie le journal dans l'instantané puis le vide (appeler sous verrou
+        exclusif). `data`, s'il est fourni, remplace le catalogue : il doit
+        déjà contenir les modifications du journal.
+        """
+        if data is None:
+            data = self.load()
+        save_catalog(data, self.json_file)
+        if self.size():
+            with open(self.path, 'r+b') as f:
+                f.truncate(0)
+                os.fsync(f.fileno())
+        return data
+
+    def commit(self, records, data=None, compact=False):
+        """
+        Ajoute des modifications au journal (appeler sous verrou exclusif)
+        et le compacte s'il dépasse COMPACT_BYTES, ou toujours avec
+        `compact=True` (le JSON seul, lu par le navigateur, est alors à
+        jour). `data` : catalogue à jour sous ce verrou, modifications
+        comprises, qui évite de le relire.
+        """
+        self.append(records)
+        if compact or self.size() > COMPACT_BYTES:
+            self.compact(data)
+            return True
+        return False
@@ -0,0 +1,357 @@
+"""
+Représentation compacte du catalogue en mémoire, pour les très gros catalogues.
+
+json.load() crée un dict par source (plus de 200 octets chacun avant même
+les chaînes) dans des listes imbriquées. Ici les sources sont rangées en
+colonnes : les noms et les chemins sont mis bout à bout en UTF-8 dans un
+bytearray (pas d'objet str par source), les URLs sont coupées en origine
+(https://www.youtube.com, partagée et internée une seule fois) et reste du
+chemin, la catégorie et l'origine de chaque ligne sont des tableaux
+d'entiers (array). Un index URL normalisée → ligne sert à la
+déduplication ; il n'est construit qu'à la première utilisation.
+
+Le format JSON de rss-sources-complete.json est conservé à l'octet près :
+une source qui a d'autres champs que {name, url} (par exemple "check")
+est gardée telle quelle à côté des colonnes.
+"""
+
+import json
+import sys
+from array import array
+from collections import Counter, defaultdict
+
+from catalog_core import JSON_FILE, atomic_write, normalize_url
+from catalog_journal import CatalogJournal
+
+INDENT = 2  # même mise en forme que save_catalog()
+
+class _SourcePair(tuple):
+    """(name, url) produit pendant json.load à la place d'un dict de source"""
+    __slots__ = ()
+
+def _pairs_hook(pairs):
+    # Appelé pour chaque objet JSON : les sources {name, url} ne deviennent
+    # jamais des dicts, ce qui limite aussi le pic mémoire du chargement
+    if (len(pairs) == 2 and pairs[0][0] == "name" and pairs[1][0] == "url"
+            and isinstance(pairs[0][1], str) and isinstance(pairs[1][1], str)):
+        return _SourcePair((pairs[0][1], pairs[1][1]))
+    return dict(pairs)
+
+def _restore(value):
+    """Redonne leur forme de dict aux paires hors des listes de sources"""
+    if isinstance(value, _SourcePair):
+        return {"name": value[0], "url": value[1]}
+    if isinstance(value, dict):
+        return {key: _restore(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_restore(item) for item in value]
+    return value
+
+def split_url(url):
+    """Coupe une URL en (origine, reste) : schéma et hôte d'un côté, chemin de l'autre"""
+    _, separator, rest = url.partition('//')
+    if not separator:
+        return '', url
+    end = len(url)
+    for delimiter in '/?#':
+        position = url.find(delimiter, len(url) - len(rest))
+        if position != -1 and position < end:
+            end = position
+    return url[:end], url[end:]
+
+def host_of(origin):
+    """Hôte en minuscules d'une origine (sans identifiants ni port)"""
+    host = origin.partition('//')[2].rpartition('@')[2]
+    if host.startswith('['):
+        return host.partition(']')[0][1:].lower()
+    return host.partition(':')[0].lower()
+
+def _dump(value, level):
+    """json.dumps indenté comme s'il était imbriqué à `level` niveaux"""
+    text = json.dumps(value, ensure_ascii=False, indent=INDENT)
+    return text.replace('\n', '\n' + ' ' * (INDENT * level))
+
+class TextColumn:
+    """Colonne de chaînes stockées en UTF-8 dans un seul tampon, avec leurs fins"""
+
+    __slots__ = ('_data', '_ends')
+
+    def __init__(self):
+        self._data = bytearray()
+        self._ends = array('Q')
+
+    def append(self, text):
+        self._data += text.encode('utf-8', 'surrogatepass')
+        self._ends.append(len(self._data))
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __getitem__(self, row):
+        start = self._ends[row - 1] if row else 0
+        return self._data[start:self._ends[row]].decode('utf-8', 'surrogatepass')
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self._ends)))
+
+class Catalog:
+    """Catalogue en colonnes : une ligne par source"""
+
+    def __init__(self, metadata=None):
+        self.metadata = metadata if metadata is not None else {}
+        self.names = TextColumn()
+        self.paths = TextColumn()
+        self.origin_ids = array('I')
+        self.category_ids = array('H')
+        self.origins = []
+        self._origin_ids = {}
+        self.hosts = []
+        self._host_ids = {}
+        self._origin_hosts = array('I')   # origine → hôte
+        # Par catégorie : champs hors sources (ordre d'origine) et lignes
+        self.category_keys = []
+        self._category_fields = []
+        self._category_ids = {}
+        self._rows = []
+        self._extras = {}       # ligne → dict d'origine, pour les sources non standard
+        self._index = None      # URL normalisée → première ligne
+        self._repeats = []      # (première ligne, catégorie) des doublons du fichier
+        # Champs de premier niveau, dans l'ordre du fichier
+        self._top_fields = ["metadata", "categories"]
+        self._top_extra = {}
+
+    @classmethod
+    def from_json(cls, data):
+        """Construit le modèle depuis la structure JSON (dicts ou paires)"""
+        catalog = cls(_restore(data.get("metadata", {})))
+        catalog._top_fields = list(data)
+        catalog._top_extra = {
+            key: _restore(value) for key, value in data.items() if key not in ("metadata", "categories")
+        }
+        for category_key, category in data["categories"].items():
+            fields = {key: _restore(value) for key, value in category.items() if key != "sources"}
+            category_id = catalog._category_id(category_key, fields, list(category))
+            for source in category["sources"]:
+                catalog._append(category_id, source)
+        return catalog
+
+    @classmethod
+    def load(cls, json_file=JSON_FILE):
+        """Charge un fichier catalogue sans créer de dict par source"""
+        journal = CatalogJournal(json_file)
+        if journal.size():
+            # Modifications en attente : rejeu sur la structure JSON ordinaire
+            with journal.lock(exclusive=False):
+                return cls.from_json(journal.load())
+        with open(json_file, 'r', encoding='utf-8') as f:
+            return cls.from_json(json.load(f, object_pairs_hook=_pairs_hook))
+
+    def _category_id(self, category_key, fields, order=None):
+        category_id = self._category_ids.get(category_key)
+        if category_id is None:
+            category_key = sys.intern(category_key)
+            category_id = len(self.category_keys)
+            self._category_ids[category_key] = category_id
+            self.category_keys.append(category_key)
+            self._category_fields.append((fields, order or [*fields, "sources"]))
+            self._rows.append(array('I'))
+        return category_id
+
+    def _origin_id(self, origin):
+        origin_id = self._origin_ids.get(origin)
+        if origin_id is None:
+            origin_id = len(self.origins)
+            self._origin_ids[sys.intern(origin)] = origin_id
+            self.origins.append(origin)
+            host = host_of(origin)
+            host_id = self._host_ids.get(host)
+            if host_id is None:
+                host_id = len(self.hosts)
+                self._host_ids[sys.intern(host)] = host_id
+                self.hosts.append(host)
+            self._origin_hosts.append(host_id)
+        return origin_id
+
+    def _append(self, category_id, source):
+        row = len(self.paths)
+        if isinstance(source, _SourcePair):
+            name, url = source
+        else:
+            name, url = source.get("name"), source.get("url")
+            if list(source) != ["name", "url"] or not isinstance(name, str) or not isinstance(url, str):
+                self._extras[row] = _restore(source)
+                name, url = str(name or ''), str(url or '')
+        origin, path = split_url(url)
+        self.names.append(name)
+        self.paths.append(path)
+        self.origin_ids.append(self._origin_id(origin))
+        self.category_ids.append(category_id)
+        self._rows[category_id].append(row)
+        if self._index is not None:
+            self._index.setdefault(normalize_url(url), row)
+        return row
+
+    def __len__(self):
+        return len(self.paths)
+
+    def url(self, row):
+        """URL d'origine d'une ligne, reconstituée à l'identique"""
+        return self.origins[self.origin_ids[row]] + self.paths[row]
+
+    @property
+    def index(self):
+        """Index URL normalisée → première ligne (construit à la demande)"""
+        if self._index is None:
+            # Les doublons déjà présents dans le fichier sont relevés au passage
+            self._index = {}
+            for row in range(len(self.paths)):
+                first = self._index.setdefault(normalize_url(self.url(row)), row)
+                if first != row:
+                    self._repeats.append((first, self.category_ids[row]))
+        return self._index
+
+    def __contains__(self, url):
+        return normalize_url(url) in self.index
+
+    def source(self, row):
+        """Source d'une ligne, sous sa forme JSON"""
+        extra = self._extras.get(row)
+        if extra is not None:
+            return extra
+        return {"name": self.names[row], "url": self.url(row)}
+
+    def sources(self, category_key):
+        """Sources d'une catégorie, dans l'ordre du catalogue"""
+        for row in self._rows[self._category_ids[category_key]]:
+            yield self.source(row)
+
+    def host(self, row):
+        return self.hosts[self._origin_hosts[self.origin_ids[row]]]
+
+    def add(self, category_key, category_name, source):
+        """
+        Ajoute une source si son URL est inconnue de tout le catalogue ;
+        même règle et même catégorie par défaut que merge_sources().
+        """
+        index = self.index
+        category_id = self._category_ids.get(category_key)
+        if category_id is None:
+            category_id = self._category_id(category_key, {
+                "name": category_name,
+                "description": f"Sources {category_name.lower()}",
+            })
+        if normalize_url(source["url"]) in index:
+            return False
+        self._append(category_id, source)
+        return True
+
+    def merge(self, category_key, category_name, sources):
+        """Équivalent de merge_sources() ; retourne le nombre de sources ajoutées"""
+        return sum(self.add(category_key, category_name, source) for source in sources)
+
+    def host_counts(self):
+        """Nombre de sources par hôte"""
+        counts = Counter()
+        for origin_id, count in Counter(self.origin_ids).items():
+            counts[self.hosts[self._origin_hosts[origin_id]]] += count
+        return counts
+
+    def cross_category_duplicates(self):
+        """URLs partagées par au moins deux catégories (comme UrlIndex)"""
+        if self._index is None:
+            self.index  # construit l'index et relève les doublons
+        owners = defaultdict(set)
+        for first, category_id in self._repeats:
+            owners[first].add(category_id)
+        return {
+            normalize_url(self.url(first)): sorted(
+                self.category_keys[category_id] for category_id in categories | {self.category_ids[first]}
+            )
+            for first, categories in owners.items()
+            if len(categories | {self.category_ids[first]}) > 1
+        }
+
+    def to_json(self):
+        """Structure JSON complète (dicts), identique à celle de load_catalog()"""
+        categories = {}
+        for category_id, category_key in enumerate(self.category_keys):
+            fields, order = self._category_fields[category_id]
+            sources = [self.source(row) for row in self._rows[category_id]]
+            categories[category_key] = {
+                key: sources if key == "sources" else fields[key] for key in order
+            }
+        data = {}
+        for key in self._top_fields:
+            if key == "metadata":
+                data[key] = self.metadata
+            elif key == "categories":
+                data[key] = categories
+            else:
+                data[key] = self._top_extra[key]
+        return data
+
+    def iter_json(self):
+        """
+        Texte JSON par morceaux, identique à save_catalog() (indent=2,
+        ensure_ascii=False) mais sans reconstruire le catalogue en dicts.
+        """
+        top_fields = self._top_fields
+        yield '{'
+        for position, key in enumerate(top_fields):
+            yield '\n' + ' ' * INDENT + json.dumps(key, ensure_ascii=False) + ': '
+            if key == "categories":
+                yield from self._iter_categories_json()
+            else:
+                value = self.metadata if key == "metadata" else self._top_extra[key]
+                yield _dump(value, 1)
+            if position < len(top_fields) - 1:
+                yield ','
+        yield '\n}'
+
+    def _iter_categories_json(self):
+        if not self.category_keys:
+            yield '{}'
+            return
+        pad = ' ' * INDENT
+        yield '{'
+        for category_id, category_key in enumerate(self.category_keys):
+            fields, order = self._category_fields[category_id]
+            yield '\n' + pad * 2 + json.dumps(category_key, ensure_ascii=False) + ': {'
+            for position, key in enumerate(order):
+                yield '\n' + pad * 3 + json.dumps(key, ensure_ascii=False) + ': '
+                if key == "sources":
+                    rows = self._rows[category_id]
+                    if not rows:
+                        yield '[]'
+                    else:
+                        yield '['
+                        yield ','.join(
+                            '\n' + pad * 4 + _dump(self.source(row), 4) for row in rows
+                        )
+                        yield '\n' + pad * 3 + ']'
+                else:
+                    yield _dump(fields[key], 3)
+                if position < len(order) - 1:
+                    yield ','
+            yield '\n' + pad * 2 + '}'
+            if category_id < len(self.category_keys) - 1:
+                yield ','
+        yield '\n' + pad + '}'
+
+    def save(self, json_file=JSON_FILE):
+        """
+        Écrit le catalogue de façon atomique, au fil de l'eau, sous le verrou
+        exclusif du journal. Un journal en attente (écrit par un autre
+        écrivain depuis le chargement) est rejoué sur le modèle puis compacté :
+        le rejeu est idempotent et rien n'est rejoué deux fois ensuite.
+        """
+        journal = CatalogJournal(json_file)
+        with journal.lock():
+            if journal.size():
+                data = self.to_json()
+                journal.replay(data)
+                journal.compact(data)
+                return
+            with atomic_write(json_file) as f:
+                for chunk in self.iter_json():
+                    f.write(chunk)
@@ -0,0 +1,111 @@
+"""
+Import et export OPML du catalogue, pour échanger des sources avec les
+autres lecteurs de flux.
+
+Un dossier OPML (<outline> sans xmlUrl) correspond à une catégorie du
+catalogue : reconnue par sa clé ou par son nom (sans accents ni casse),
+sinon créée avec une clé dérivée de son nom. Les flux hors dossier vont dans
+la catégorie par défaut. L'export note la clé de chaque catégorie (attribut
+`key`, ignoré des autres lecteurs) : un export réimporté dans un catalogue
+vide garde ses clés.
+
+L'import lit le fichier avec iterparse et vide chaque <outline> une fois
+traité ; les sources sont produites par lots (category_key, category_name,
+sources), comme les pages de l'Atlas, pour passer par ingest_batch() :
+même déduplication, une seule écriture. L'export écrit le document au fil
+de l'eau, catégorie par catégorie.
+"""
+
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape, quoteattr
+
+from atlas_html import slugify
+
+DEFAULT_CATEGORY = ("opml", "Import OPML")
+BATCH_SIZE = 1000  # sources par lot, pour borner la mémoire sur les gros dossiers
+
+def category_lookup(data):
+    """Clé ou nom de catégorie (normalisé par slugify) → clé du catalogue"""
+    lookup = {}
+    for category_key, category in data["categories"].items():
+        lookup.setdefault(slugify(category["name"]), category_key)
+        lookup[slugify(category_key)] = category_key
+    return lookup
+
+def _category(title, lookup, key=None):
+    slug = slugify(title)
+    # Clé notée par l'export, puis nom, puis clé dérivée du nom
+    found = lookup.get(slugify(key)) if key else None
+    return found or lookup.get(slug) or key or slug, title
+
+def iter_opml_batches(source, data=None, default_category=DEFAULT_CATEGORY):
+    """
+    Produit (category_key, category_name, sources) depuis un fichier OPML
+    (chemin ou fichier binaire ouvert). `data` (catalogue chargé) sert à
+    rattacher les dossiers aux catégories existantes.
+    """
+    lookup = category_lookup(data) if data is not None else {}
+    folders = []    # pile des dossiers ouverts : [(clé, nom) ou None, sources en attente]
+    parents = []
+    root_sources = []
+
+    def flush(category, sources):
+        if sources:
+            batch = (*(category or default_category), list(sources))
+            sources.clear()
+            return batch
+        return None
+
+    for event, element in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            if element.tag == 'outline' and not element.get('xmlUrl'):
+                title = (element.get('title') or element.get('text') or '').strip()
+                category = _category(title, lookup, element.get('key')) if slugify(title) else None
+                folders.append([category, []])
+            continue
+        parents.pop()
+        if element.tag != 'outline':
+            continue
+        url = (element.get('xmlUrl') or '').strip()
+        if url:
+            name = (element.get('title') or element.get('text') or url).strip()
+            # Un dossier sans nom utilisable rattache ses flux au dossier parent
+            folder = next((folder for folder in reversed(folders) if folder[0]), None)
+            category, pending = folder if folder else (None, root_sources)
+            pending.append({"name": name, "url": url})
+            if len(pending) >= BATCH_SIZE:
+                yield flush(category, pending)
+        else:
+            # Un dossier anonyme n'a jamais de sources en attente
+            category, pending = folders.pop()
+            batch = flush(category, pending)
+            if batch:
+                yield batch
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+    batch = flush(None, root_sources)
+    if batch:
+        yield batch
+
+def iter_opml(data, categories=None, title="NewsAgregator"):
+    """Document OPML 2.0 du catalogue, par morceaux de texte"""
+    now = format_datetime(datetime.now(timezone.utc), usegmt=True)
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<opml version="2.0">\n'
+    yield f'  <head>\n    <title>{escape(title)}</title>\n    <dateCreated>{now}</dateCreated>\n  </head>\n'
+    yield '  <body>\n'
+    for category_key, category in data["categories"].items():
+        if categories and category_key not in categories:
+            continue
+        name = quoteattr(category["name"])
+        yield f'    <outline text={name} title={name} key={quoteattr(category_key)}>\n'
+        yield ''.join(
+            f'      <outline type="rss" text={quoteattr(source["name"])} title={quoteattr(source["name"])}'
+            f' xmlUrl={quoteattr(source["url"])}/>\n'
+            for source in category["sources"]
+        )
+        yield '    </outline>\n'
+    yield '  </body>\n</opml>\n'
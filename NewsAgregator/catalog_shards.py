@@ -0,0 +1,217 @@
+"""
+Découpage du catalogue rss-sources-complete.json en un fichier par catégorie,
+avec un manifeste et des versions précompressées (gzip, brotli), pour que le
+client ne télécharge que les catégories qu'il ouvre.
+
+Le manifeste porte un numéro de version. Seules les catégories dont
+l'empreinte a changé sont réécrites, et chaque nouvelle version s'accompagne
+d'un correctif deltas/N-(N+1).json (sources ajoutées, retirées, modifiées) :
+un client en version N n'a plus à retélécharger tout le catalogue.
+
+Les fragments sont nommés d'après leur contenu (<catégorie>.<empreinte>.json) :
+un fragment publié n'est jamais réécrit en place, le nouveau manifeste ne
+désigne que des fichiers déjà complets, et aucune clé de catégorie (même
+"manifest" ou "deltas") ne peut écraser un autre fichier du dossier.
+"""
+
+import gzip
+import hashlib
+import json
+from datetime import date
+from pathlib import Path
+
+from catalog_core import SCRIPT_DIR, atomic_write, file_key, normalize_url
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+# Dossier de sortie des fragments
+SHARDS_DIR = SCRIPT_DIR / "sources"
+MANIFEST_NAME = "manifest.json"
+DELTAS_DIR_NAME = "deltas"
+DIGEST_CHARS = 16  # caractères de l'empreinte SHA-256 dans le nom des fragments
+MAX_DELTAS = 30  # correctifs conservés ; au-delà, le client recharge tout
+
+def encode_shard(category_key, category):
+    """Sérialise une catégorie en JSON compact (octets UTF-8)"""
+    shard = {
+        "key": category_key,
+        "name": category["name"],
+        "description": category.get("description", ""),
+        "sources": category["sources"],
+    }
+    return json.dumps(shard, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def compress_variants(payload):
+    """Retourne les variantes compressées {extension: octets} d'un fragment"""
+    # mtime=0 : sortie déterministe, le fichier ne change que si le contenu change
+    variants = {".gz": gzip.compress(payload, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(payload, quality=11)
+    return variants
+
+def write_bytes(path, payload):
+    """Écrit un fichier binaire de façon atomique"""
+    with atomic_write(path, 'wb') as f:
+        f.write(payload)
+
+def read_manifest(out_dir=SHARDS_DIR):
+    """Manifeste actuel d'un dossier de fragments ; None s'il n'existe pas"""
+    try:
+        with open(Path(out_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def diff_sources(old_sources, new_sources):
+    """
+    Différence entre deux listes de sources, appariées par URL normalisée.
+    `changed` associe l'URL connue du client à la nouvelle source.
+    """
+    old = {normalize_url(source["url"]): source for source in old_sources}
+    new = {normalize_url(source["url"]): source for source in new_sources}
+    return {
+        "added": [source for key, source in new.items() if key not in old],
+        "removed": [source["url"] for key, source in old.items() if key not in new],
+        "changed": [
+            {"url": old[key]["url"], "source": source}
+            for key, source in new.items() if key in old and old[key] != source
+        ],
+    }
+
+def shard_file_name(category_key, digest):
+    """Nom d'un fragment d'après son contenu : <catégorie>.<empreinte>.json (voir file_key)"""
+    return f"{file_key(category_key)}.{digest[:DIGEST_CHARS]}.json"
+
+def read_shard(path):
+    """Fragment publié ; None s'il a disparu ou n'est pas un fragment lisible"""
+    try:
+        shard = json.loads(path.read_bytes())
+    except (FileNotFoundError, ValueError):
+        return None
+    return shard if isinstance(shard, dict) and isinstance(shard.get("sources"), list) else None
+
+def category_delta(old_shard, new_shard):
+    """
+    Correctif d'une catégorie : métadonnées et différence de ses sources.
+    Sans ancien fragment pour comparer, `reload` demande au client de
+    recharger le fragment entier plutôt que de tout annoncer comme ajouté.
+    """
+    delta = {
+        "name": new_shard["name"],
+        "description": new_shard["description"],
+        "count": len(new_shard["sources"]),
+    }
+    if old_shard is None:
+        return {**delta, "reload": True}
+    return {**delta, **diff_sources(old_shard["sources"], new_shard["sources"])}
+
+def write_delta(out_dir, delta):
+    """Écrit un correctif (JSON compact + gzip) et retourne son entrée de manifeste"""
+    file_name = f"{DELTAS_DIR_NAME}/{delta['from']}-{delta['to']}.json"
+    payload = json.dumps(delta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    (out_dir / DELTAS_DIR_NAME).mkdir(exist_ok=True)
+    write_bytes(out_dir / file_name, payload)
+    entry = {"to": delta["to"], "file": file_name, "bytes": len(payload)}
+    for suffix, compressed in compress_variants(payload).items():
+        write_bytes(out_dir / (file_name + suffix), compressed)
+        entry[f"{suffix[1:]}_bytes"] = len(compressed)
+    return entry
+
+def remove_files(out_dir, file_name):
+    """Supprime un fichier et ses variantes compressées"""
+    if file_name == MANIFEST_NAME:
+        return  # ancien fragment d'une catégorie "manifest" : c'est le manifeste
+    for suffix in ("", ".gz", ".br"):
+        (out_dir / (file_name + suffix)).unlink(missing_ok=True)
+
+def build_shards(data, out_dir=SHARDS_DIR):
+    """
+    Met à jour les fragments et le manifeste ; retourne (manifeste, catégories réécrites).
+
+    Une catégorie dont l'empreinte n'a pas changé n'est pas réécrite. Si au
+    moins une a changé, la version est incrémentée et le correctif depuis la
+    version précédente est calculé à partir des anciens fragments. Les
+    nouveaux fragments s'écrivent sous de nouveaux noms, le manifeste en
+    dernier, et les anciens fragments ne sont supprimés qu'ensuite : un
+    client qui lit un manifeste trouve toujours les fragments et correctifs
+    qu'il désigne.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    previous = read_manifest(out_dir)
+    # Un manifeste sans version (ancien format) est reconstruit sans correctif
+    incremental = previous is not None and "version" in previous
+    previous_categories = previous["categories"] if incremental else {}
+
+    categories, rewritten, delta_categories = {}, [], {}
+    for category_key, category in data["categories"].items():
+        payload = encode_shard(category_key, category)
+        digest = hashlib.sha256(payload).hexdigest()
+        file_name = shard_file_name(category_key, digest)
+        old_entry = previous_categories.get(category_key)
+        if old_entry and old_entry["file"] == file_name and (out_dir / file_name).exists():
+            categories[category_key] = old_entry
+            continue
+
+        if incremental:
+            # Catégorie nouvelle : tout est ajouté ; ancien fragment disparu : à recharger
+            old_shard = read_shard(out_dir / old_entry["file"]) if old_entry else {"sources": []}
+            delta_categories[category_key] = category_delta(old_shard, json.loads(payload))
+
+        write_bytes(out_dir / file_name, payload)
+        entry = {
+            "name": category["name"],
+            "description": category.get("description", ""),
+            "count": len(category["sources"]),
+            "file": file_name,
+            "sha256": digest,
+            "bytes": len(payload),
+        }
+        for suffix, compressed in compress_variants(payload).items():
+            write_bytes(out_dir / (file_name + suffix), compressed)
+            entry[f"{suffix[1:]}_bytes"] = len(compressed)
+        categories[category_key] = entry
+        rewritten.append(category_key)
+
+    removed_categories = [key for key in previous_categories if key not in categories]
+    if incremental and not delta_categories and not removed_categories:
+        return previous, rewritten
+
+    version = previous["version"] + 1 if incremental else 1
+    deltas = dict(previous.get("deltas", {})) if incremental else {}
+    if incremental:
+        delta = {
+            "from": previous["version"],
+            "to": version,
+            "categories": delta_categories,
+            "removed_categories": removed_categories,
+        }
+        deltas[str(previous["version"])] = write_delta(out_dir, delta)
+    # Correctifs les plus anciens retirés du manifeste, puis du disque une fois celui-ci écrit
+    expired = [deltas.pop(from_version)["file"] for from_version in sorted(deltas, key=int)[:-MAX_DELTAS]]
+
+    manifest = {
+        "version": version,
+        "metadata": {
+            **data.get("metadata", {}),
+            "date_generated": date.today().isoformat(),
+        },
+        "total_sources": sum(entry["count"] for entry in categories.values()),
+        "categories": categories,
+        "deltas": deltas,
+    }
+    with atomic_write(out_dir / MANIFEST_NAME) as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    # Anciens fragments et correctifs, une fois en place le manifeste qui ne les désigne plus
+    current_files = {entry["file"] for entry in categories.values()}
+    for entry in (previous or {}).get("categories", {}).values():
+        if entry["file"] not in current_files:
+            expired.append(entry["file"])
+    for file_name in expired:
+        remove_files(out_dir, file_name)
+
+    return manifest, rewritten
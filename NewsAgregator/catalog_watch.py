@@ -0,0 +1,359 @@
+"""
+Surveillance des pages de flux (atlas_pages/ par défaut) et mise à jour
+incrémentale du catalogue.
+
+Chaque fichier de page est décrit dans un état persistant (watch_state.json) :
+date de modification, taille, empreinte SHA-256, catégorie et sources
+extraites. À chaque passage, seuls les fichiers dont la date ou la taille a
+changé sont relus ; si leur empreinte est la même (simple `touch`), ils ne
+sont pas réanalysés. Au redémarrage, un fichier inchangé n'est donc jamais
+réanalysé.
+
+Les sources d'un fichier modifié sont comparées à celles du passage
+précédent : les nouvelles sont ajoutées à sa catégorie, celles qui ont
+disparu en sont retirées (sauf si un autre fichier surveillé les fournit
+encore), via le journal du catalogue. Un fichier supprimé retire ses
+sources. Seules les sources que la surveillance a elle-même ajoutées (notées
+dans l'état) sont retirées : une source déjà au catalogue, ajoutée à la main
+ou par un autre outil, y reste même si un fichier la listait.
+Les fragments publiés (catalog_shards) et la base SQLite (catalog_db), s'ils
+existent, suivent les mêmes ajouts et retraits.
+
+Sous Linux, inotify (via ctypes) réveille la surveillance dès qu'un dossier
+change ; ailleurs, ou si inotify est indisponible, les dossiers sont
+parcourus à intervalle régulier.
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import sys
+import time
+from pathlib import Path
+
+from catalog_core import JSON_FILE, SCRIPT_DIR, atomic_write, load_catalog, merge_sources, normalize_url
+from catalog_journal import CatalogJournal, remove_records, replay_records
+from extract_rss_from_pages import HTML_SUFFIXES, iter_page_batches, iter_page_paths
+
+STATE_FILE = SCRIPT_DIR / "watch_state.json"
+STATE_VERSION = 2
+POLL_SECONDS = 2.0      # période de parcours sans inotify
+RESCAN_SECONDS = 300.0  # parcours de sûreté avec inotify (évènements perdus, file pleine)
+SETTLE_SECONDS = 0.5    # après un évènement, laisse l'éditeur finir d'écrire
+
+# Évènements inotify (linux/inotify.h)
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+
+class Inotify:
+    """Réveil sur les modifications de dossiers, par inotify (Linux)"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch  # AttributeError hors Linux
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def watch(self, directories):
+        """Surveille les dossiers (sans effet pour un dossier déjà surveillé)"""
+        for directory in directories:
+            if self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, f"inotify_add_watch {directory} : {os.strerror(errno)}")
+
+    def wait(self, timeout):
+        """True si un évènement est arrivé avant `timeout` secondes ; la file est vidée"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        # Le détail des évènements est inutile : le parcours qui suit compare
+        # dates et empreintes
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+def open_inotify():
+    """Inotify, ou None s'il est indisponible (autre système, limite de surveillances atteinte)"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return Inotify()
+    except (OSError, AttributeError):
+        return None
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def parse_files(paths, workers=None, json_file=JSON_FILE):
+    """
+    (chemin, (category_key, category_name, sources)) pour chaque page, pages
+    HTML en dernier, rattachées aux catégories du catalogue `json_file`.
+    """
+    html_paths = []
+    for path in paths:
+        if path.suffix in HTML_SUFFIXES:
+            html_paths.append(path)
+            continue
+        batches = iter_page_batches([path])
+        try:
+            category_key, category_name, sources = next(batches)
+            yield path, (category_key, category_name, list(sources))
+        finally:
+            batches.close()
+    if html_paths:
+        from atlas_html import iter_html_batches
+        yield from zip(html_paths, iter_html_batches(html_paths, workers=workers, data=load_catalog(json_file)))
+
+def _source_map(sources):
+    """URL normalisée → source {name, url}, dans l'ordre du fichier"""
+    return {normalize_url(source["url"]): source for source in sources}
+
+class CatalogWatcher:
+    """Synchronise le catalogue (et ses dérivés) avec des dossiers de pages de flux"""
+
+    def __init__(self, roots, json_file=JSON_FILE, state_file=STATE_FILE, fragments=None, db_file=None,
+                 workers=None):
+        self.roots = [Path(root).resolve() for root in roots]
+        self.json_file = Path(json_file)
+        self.state_file = Path(state_file)
+        self.fragments = Path(fragments) if fragments else None
+        self.db_file = Path(db_file) if db_file else None
+        self.workers = workers
+        self.files, self.owned = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}, set()
+        if state.get("version") != STATE_VERSION or state.get("catalog") != str(self.json_file.resolve()):
+            # Autre catalogue ou ancien format : tout sera relu (les ajouts déjà présents sont ignorés)
+            return {}, set()
+        return state["files"], {tuple(pair) for pair in state["owned"]}
+
+    def _save_state(self):
+        state = {
+            "version": STATE_VERSION,
+            "catalog": str(self.json_file.resolve()),
+            "files": self.files,
+            # (catégorie, URL normalisée) des sources ajoutées par la surveillance
+            "owned": sorted(self.owned),
+        }
+        with atomic_write(self.state_file) as f:
+            json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+
+    def directories(self):
+        """Dossiers à surveiller : les dossiers racines et leurs sous-dossiers, le dossier des fichiers isolés"""
+        directories = []
+        for root in self.roots:
+            if root.is_dir():
+                directories.append(root)
+                directories.extend(path for path in root.rglob('*') if path.is_dir())
+            elif root.parent.is_dir():
+                directories.append(root.parent)
+        return list(dict.fromkeys(directories))
+
+    def scan(self):
+        """
+        Compare les fichiers présents à l'état : retourne (fichiers à
+        analyser {clé: (chemin, stat, empreinte)}, fichiers supprimés,
+        nombre de fichiers seulement touchés).
+        """
+        changed, touched = {}, 0
+        present = set()
+        # Un dossier absent (démonté, renommé) ne vaut pas suppression de ses fichiers
+        roots = [root for root in self.roots if root.exists()]
+        for path in iter_page_paths([str(root) for root in roots]):
+            key = str(path)
+            present.add(key)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entry = self.files.get(key)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            digest = file_digest(path)
+            if entry and entry["sha256"] == digest:
+                # Même contenu (touch, copie identique) : pas de nouvelle analyse
+                entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+                touched += 1
+                continue
+            changed[key] = (path, stat, digest)
+        removed = [
+            key for key in self.files
+            if key not in present and any(Path(key) == root or root in Path(key).parents for root in roots)
+        ]
+        return changed, removed, touched
+
+    def sync(self):
+        """
+        Un passage : analyse des fichiers modifiés, ajouts et retraits dans le
+        catalogue, mise à jour des fragments et de la base. Retourne le
+        rapport du passage, ou None si rien n'a changé.
+        """
+        changed, removed_files, touched = self.scan()
+        if not changed and not removed_files:
+            if touched:
+                self._save_state()
+            return None
+
+        adds = {}        # catégorie → (nom, sources nouvelles)
+        removes = []     # (catégorie, URL)
+        files = []       # (clé, catégorie, ajouts, retraits) pour le rapport
+        entries = {}     # nouvel état des fichiers analysés
+        parsed = dict(parse_files([path for path, _, _ in changed.values()], self.workers, self.json_file))
+        for key, (path, stat, digest) in changed.items():
+            category_key, category_name, sources = parsed[path]
+            new = _source_map(sources)
+            old_entry = self.files.get(key)
+            old = _source_map({"name": name, "url": url} for name, url in old_entry["sources"]) if old_entry else {}
+            if old_entry and old_entry["category"] != category_key:
+                removes.extend((old_entry["category"], source["url"]) for source in old.values())
+                old = {}
+            added = [source for url_key, source in new.items() if url_key not in old]
+            gone = [source["url"] for url_key, source in old.items() if url_key not in new]
+            if added:
+                adds.setdefault(category_key, (category_name, []))[1].extend(added)
+            removes.extend((category_key, url) for url in gone)
+            files.append((key, category_key, len(added), len(gone)))
+            entries[key] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": digest,
+                "category": category_key,
+                "name": category_name,
+                "sources": [[source["name"], source["url"]] for source in new.values()],
+            }
+        for key in removed_files:
+            entry = self.files[key]
+            removes.extend((entry["category"], url) for _, url in entry["sources"])
+            files.append((key, entry["category"], 0, len(entry["sources"])))
+
+        # L'état n'est mis à jour qu'une fois le catalogue modifié : après un
+        # échec, le passage suivant retrouve les mêmes différences
+        files_after = {key: entry for key, entry in self.files.items() if key not in removed_files}
+        files_after.update(entries)
+        if removes:
+            # Une source qu'un autre fichier de la même catégorie fournit encore
+            # reste, de même qu'une source que la surveillance n'a pas ajoutée
+            provided = {
+                (entry["category"], normalize_url(url)) for entry in files_after.values() for _, url in entry["sources"]
+            }
+            removes = [(category_key, url) for category_key, url in removes
+                       if (category_key, normalize_url(url)) in self.owned - provided]
+
+        data, added, removed_count = self.apply(adds, removes)
+        self.owned -= {(category_key, normalize_url(url)) for category_key, url in removes}
+        self.owned |= {
+            (category_key, normalize_url(source["url"]))
+            for category_key, (_, sources) in added.items() for source in sources
+        }
+        self.files = files_after
+        self._save_state()
+        report = {
+            "files": files,
+            "added": sum(len(sources) for _, sources in added.values()),
+            "removed": removed_count,
+            "shards": None,
+            "db": None,
+        }
+        if added or removed_count:
+            report["shards"], report["db"] = self.update_artifacts(data, added, removes)
+        return report
+
+    def apply(self, adds, removes):
+        """
+        Retraits puis ajouts, dans le journal du catalogue sous verrou
+        exclusif. Retourne (catalogue à jour, sources ajoutées par catégorie,
+        nombre de sources retirées).
+        """
+        journal = CatalogJournal(self.json_file)
+        with journal.lock():
+            data, url_index = journal.load_indexed()
+            # URLs du fichier → URLs exactes du catalogue (variantes comprises)
+            records = remove_records(data, removes)
+            before = sum(len(category["sources"]) for category in data["categories"].values())
+            replay_records(data, records, url_index)
+            removed_count = before - sum(len(category["sources"]) for category in data["categories"].values())
+            added = {}
+            for category_key, (category_name, sources) in adds.items():
+                start = len(data["categories"].get(category_key, {}).get("sources", ()))
+                if merge_sources(data, category_key, category_name, sources, url_index):
+                    new_sources = data["categories"][category_key]["sources"][start:]
+                    added[category_key] = (category_name, new_sources)
+                    records.extend(
+                        {"op": "add", "category": category_key, "name": category_name, "source": source}
+                        for source in new_sources
+                    )
+            # Compacté à chaque passage qui modifie le catalogue : le JSON lu par le navigateur suit
+            journal.commit(records, data, compact=bool(records))
+        return data, added, removed_count
+
+    def update_artifacts(self, data, added, removes):
+        """
+        Fragments publiés et base SQLite, s'ils existent : retourne (catégories
+        réécrites ou None, (retirées, ajoutées) dans la base ou None).
+        """
+        rewritten = db_changes = None
+        if self.fragments is not None and (self.fragments / "manifest.json").exists():
+            from catalog_shards import build_shards
+            # Seules les catégories dont l'empreinte a changé sont réécrites
+            _, rewritten = build_shards(data, self.fragments)
+        if self.db_file is not None and self.db_file.exists():
+            import catalog_db
+            conn = catalog_db.connect(self.db_file)
+            try:
+                deleted = catalog_db.delete_sources(conn, removes)
+                results = catalog_db.upsert_batches(
+                    conn, [(category_key, name, sources) for category_key, (name, sources) in added.items()]
+                )
+                db_changes = (deleted, sum(count for _, _, count in results))
+            finally:
+                conn.close()
+        return rewritten, db_changes
+
+    def run(self, inotify=None, interval=POLL_SECONDS, on_sync=None, on_error=None):
+        """
+        Surveille jusqu'à interruption : un passage au démarrage, puis à chaque
+        modification signalée par `inotify` (voir open_inotify()), sinon toutes
+        les `interval` secondes.
+        """
+        while True:
+            try:
+                if inotify is not None:
+                    # Surveillances posées avant le parcours : rien n'est perdu entre les deux
+                    inotify.watch(self.directories())
+                report = self.sync()
+            except (OSError, ValueError) as exc:
+                # Fichier supprimé ou illisible pendant l'analyse : au passage suivant
+                report = None
+                if on_error:
+                    on_error(exc)
+            if report and on_sync:
+                on_sync(report)
+            if inotify is None:
+                time.sleep(interval)
+            elif inotify.wait(RESCAN_SECONDS):
+                time.sleep(SETTLE_SECONDS)
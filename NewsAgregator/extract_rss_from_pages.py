@@ -4,816 +4,844 @@ Script pour extraire les flux RSS des pages de l'Atlas des flux RSS
 et les ajouter au fichier rss-sources-complete.json
 """
 
+import argparse
+import itertools
 import json
 import re
+import sys
+import time
 from pathlib import Path
 
-# Chemins des fichiers
-SCRIPT_DIR = Path(__file__).parent
-JSON_FILE = SCRIPT_DIR / "rss-sources-complete.json"
+from catalog_core import (  # noqa: F401 - réexportés pour les autres modules
+    JSON_FILE, SCRIPT_DIR, UrlIndex, atomic_write, load_catalog, merge_sources, normalize_url,
+    save_catalog,
+)
+from catalog_journal import CatalogJournal, remove_records
 
-# Pages déjà fetchées avec leur contenu
-PAGES_CONTENT = {
-    "cuisine": """
-Kite : cuisine végétale
-https://kite.pixenjoy.com/en/rss-category?cat=Cuisine%20v%c3%a9g%c3%a9tale%20-%20Fr
+# Dossier des pages de l'Atlas sauvegardées (une catégorie par fichier)
+PAGES_DIR = SCRIPT_DIR / "atlas_pages"
+HTML_SUFFIXES = {".html", ".htm"}
+PAGE_SUFFIXES = {".txt"} | HTML_SUFFIXES
 
-RTBF : cuisine
-https://rss.rtbf.be/article/rss/highlight_rtbf_tendance-cuisine.xml
+# En-tête de métadonnées d'un fichier de page : "# clé: valeur"
+METADATA_LINE = re.compile(r'^#\s*([\w-]+)\s*:\s*(.*?)\s*$')
 
-Be : cuisine
-https://www.be.com/cuisine/feed
-
-Chef Nini
-https://www.chefnini.com/feed/
-
-Cuisine Land
-https://cuisine.land/rss.xml
-
-Healthy Alie
-https://healthyalie.com/feed/
-
-L'herboriste
-https://l-herboriste.com/feed/
-
-Menu végétarien
-https://menu-vegetarien.com/feed/
-
-Papilles à l'affût
-https://papillesalaffut.com/feed/
-
-Papilles et pupilles
-http://feeds.feedburner.com/PapillesEtPupilles?format=xml
-
-Poivreseb
-http://poivreseb.fr/feed/
-
-Quand Nad cuisine
-https://quandnadcuisine.fr/feed/
-
-Rachel Cuisine
-https://rachel-cuisine.fr/feed/
-
-Royal Chill : recettes
-https://www.royalchill.com/category/recettes/feed/
-
-Stella Cuisine
-https://www.stellacuisine.com/feed/
-
-Tangerine zest
-https://tangerinezest.com/feed/
-
-Une cuisine pour Voozenoo
-https://cuisine.voozenoo.fr/feed/
-
-Yuka
-https://yuka.io/feed/
-
-Des Elles en Cuisine
-https://feed.ausha.co/yE7G7txmAzRG
-
-La recette
-https://feed.ausha.co/Zg75JI109Rlm
-
-Radio France : cuisine
-https://www.radiofrance.fr/rss/vie-quotidienne/cuisine
-
-RTBF : Cook As You Are
-https://feeds.audiomeans.fr/feed/d1385f58-9889-45b0-8859-b8de2df6e6c2.xml
-
-RTL : L'astuce du chef
-https://feeds.audiomeans.fr/feed/7145aefc-f64e-4ec0-ae62-e3c5f2f0f66a.xml
-
-Christophe Feliciaggi : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UClpfVocAH5c20Jp041FRhvw
-
-Chunky Cooker : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCaRlZqMG5z0QE-vMCQhI-Sw
-
-Cuisine en folie : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCsgI5vHVdOSLqnhlwk-uHYw
-
-Cuisine rapide : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCVbR9QKT2GHoDxCWxeC1JKw
-
-CuisineAZ : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UC8AdLDn2gJf2sam4HJXGX3g
-
-CuisineSimple : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCyfyGuxNX-PMFF5gcpaM2mQ
-
-Douja Monde : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCeA3d5Cu9ITuJ4xYIbgfEfA
-
-JustInCooking : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCtBzfGaJzGGNJVOVM0mK4uQ
-
-L'atelier de Roxane : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UC3rxwrZSiTp6Kk2RXcyHtCA
-
-Le Loft de Nono : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCaTGIqq4SwM9A7o600gal-Q
-
-Mon carnivore : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCZ2ZUC9P7cg1P-jbx2_LnyQ
-
-Nicook : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCt5zg2wrnay71DvCMQCEbGQ
-
-Philippe Etchebest : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCO5U-JvGcz9B6ZoWvW77Tng
-
-Recettes cooking : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UClslBJddlv0wwIKMDyAniGQ
-
-Seizemay : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCiMbglOfIEtT4-4EY-Ruf5Q
-
-Sohan Tricoire : peertube
-https://tube.kher.nl/feeds/videos.xml?videoChannelId=1437
-
-Un jour Une recette : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCBbVof4rmlPeIGG-rd8xD7g
-
-Whoogy's : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCcVyMRkpb9IF1BLT3f4gRcw
-""",
-
-    "gastronomie": """
-Flipboard : gastronomie
-https://flipboard.com/topic/fr-gastronomie.rss
-
-Dernières Nouvelles d'Alsace : gastronomie
-https://www.dna.fr/culture-loisirs/gastronomie/rss
-
-Euronews - FR : gastronomie
-https://fr.euronews.com/rss?level=tag&name=gastronomie
-
-France Info : cuisine et gastronomie
-https://www.franceinfo.fr/culture/cuisine-et-gastronomie.rss
-
-France3 : gastronomie
-https://france3-regions.franceinfo.fr/culture/gastronomie/rss
-
-L'Humanité : bon et sain
-https://www.humanite.fr/mot-cle/bon-et-sain/feed
-
-LaPresse : gourmand
-https://www.lapresse.ca/gourmand/rss
-
-Le NouvelObs : drinks
-https://www.nouvelobs.com/drinks/rss.xml
-
-Le Point : gastronomie
-https://www.lepoint.fr/gastronomie/rss.xml
-
-Le Temps : gastronomie et vins
-https://www.letemps.ch/gastronomie-vin.rss
-
-Midi Libre : gastronomie et terroir
-https://www.midilibre.fr/culture-et-loisirs/gastronomie-et-terroir/rss.xml
-
-Nice-Matin : gastronomie
-https://www.nicematin.com/loisirs/gastronomie/rss
-
-Sud Ouest : gastronomie
-https://www.sudouest.fr/gastronomie/rss.xml
-
-Science et avenir : nutrition
-https://feeds.feedburner.com/sciencesetavenir/3TVQCdL25C1
-
-180°C
-https://www.180c.fr/feed/
-
-Aquitaine online : gastronomie
-https://www.aquitaineonline.com/actualites-en-aquitaine/feed/rss/?filter_tag[0]=2328
-
-Malt et Houblons
-https://maltsethoublons.com/feed/
-
-Potager : bien manger
-https://www.potagercaillebotte.fr/bien-manger/feed/
-
-Sortir à Paris : food and drink
-https://www.sortiraparis.com/rss/hotel-restaurant
-
-Binouze USA
-https://feed.ausha.co/aEI8E2JiB8Gk
-
-France Inter : L'adresse de François-Régis Gaudry
-https://radiofrance-podcast.net/podcast09/rss_10230.xml
-
-ici : À table en Champagne-Ardenne
-https://radiofrance-podcast.net/podcast09/rss_25294.xml
-
-ici : Côté saveurs en Alsace
-https://radiofrance-podcast.net/podcast09/rss_14884.xml
-
-ici : Côté saveurs en Hérault - Le carnet d'adresses
-https://radiofrance-podcast.net/podcast09/rss_22773.xml
-
-ici : En Direct du Marché
-https://radiofrance-podcast.net/podcast09/rss_23586.xml
-
-ici : La team des blogueurs cuisine
-https://radiofrance-podcast.net/podcast09/rss_22710.xml
-
-ici : La Vie en Bleu, le mag
-https://radiofrance-podcast.net/podcast09/rss_23461.xml
-
-ici : Les chroniques gourmandes
-https://radiofrance-podcast.net/podcast09/rss_25303.xml
-
-Radio France : cuisine
-https://www.radiofrance.fr/rss/vie-quotidienne/cuisine
-
-C'est meilleur quand c'est bon : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UC-jfDSLvQm7DFgsBJxjE2wA
-
-Food Story : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCzyN_JSs95aDgDFrfOxagEw
-
-RTBF : Les étoiles du chocolat belge : youtube
-https://www.youtube.com/feeds/videos.xml?playlist_id=PLThnUt_5q6GMEBIQzL8wjsG-jLqJpejHJ
-""",
-
-    "humour": """
-France Info : humour
-https://www.franceinfo.fr/culture/spectacles/humour.rss
-
-Le Monde : humour
-https://www.lemonde.fr/humour/rss_full.xml
-
-Newsmada : Tir en l'air
-https://newsmada.com/category/les-nouvelles/tir-en-lair/feed/
-
-Charlie hebdo : Turquie
-https://charliehebdo.fr/tag/turquie/feed/
-
-Europe 1 : humour
-https://www.europe1.fr/rss/humour.xml
-
-A Piazzetta
-https://www.apiazzetta.com/xml/syndication.rss
-
-Le Gorafi
-https://www.legorafi.fr/feed/
-
-Nord Press
-https://nordpresse.be/feed/
-
-VDM
-https://www.viedemerde.fr/rss
-
-Les joies du code
-https://lesjoiesducode.fr/feed
-
-Le Gorafi : sports
-https://www.legorafi.fr/category/sports/feed/
-
-Une année au lycée : le monde
-https://www.lemonde.fr/blog/uneanneeaulycee/feed/
-
-France Inter : Amandine Lourdel n'a pas compris
-https://radiofrance-podcast.net/podcast09/rss_24601.xml
-
-France Inter : Le héros du jour
-https://radiofrance-podcast.net/podcast09/rss_14032.xml
-
-France Inter : Moi, ce que j'en dis...
-https://radiofrance-podcast.net/podcast09/rss_23574.xml
-
-ici : Bernadette et Jean Claude
-https://radiofrance-podcast.net/podcast09/rss_14879.xml
-
-Radio Nova : Infox, le zapping audio parodique
-https://podcasts.nova.fr/radio-nova-infox-le-zapping-audio-parodique/feed/rss/website.xml
-
-Radio Nova : La chronique d'Aymeric Lompret
-https://podcasts.nova.fr/radio-nova-la-chronique-daymeric-lompret/feed/rss/website.xml
-
-Radio Nova : La chronique de Guillaume Meurice
-https://podcasts.nova.fr/radio-nova-la-chronique-de-guillaume-meurice/feed/rss/website.xml
-
-Rire et Chansons : L'appel trop con de Martin
-https://aod.nrjaudio.fm/xml/169.xml
-
-RMC : La chronique d'Anthony Morel
-https://rmc.bfmtv.com/podcast/integrale-anthony-morel/
-
-Corse Machin : facebook
-https://fetchrss.com/feed/1iIaFxGYM4cZ1jFv84GWk4cZ.rss
-
-Djal officiel : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCEX6y7CmEYPXcZ9OfkpLGJg
-
-France Inter : Philippe Katerine : youtube
-https://www.youtube.com/feeds/videos.xml?playlist_id=PL43OynbWaTMKk8vpS9AV_JNjt_GLpZ3oz
-
-Groland : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCJIl08OJstq_9kgI9wf_xjg
-
-Hugo tout seul : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCXapBbZyOgvYwOlqYzf8dhg
-
-Jigmé : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCkEa1AfdeB93-he4VziKGFg
-
-Karine Dubernet : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UC979ZGS-n-HQ2OegaDrucZw
-
-Le bouseuh : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCUl7mwOyySfZzUkq4H29nug
-
-Le journal des briques : peertube
-https://peertube.stream/feeds/videos.xml?videoChannelId=19755
-
-Le rire jaune : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCTt2AnK--mnRmICnf-CCcrw
-
-Mister V : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UC8Q0SLrZLiTj5s4qc9aad-w
-
-Palmashow : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCoZoRz4-y6r87ptDp4Jk74g
-
-Radio Nova : Aymeric Lompret : youtube
-https://www.youtube.com/feeds/videos.xml?playlist_id=PL9wDNu3ZrVQ5iAj77ot9CnDYWnZbbcc5v
-
-Radio Nova : Guillaume Meurice : youtube
-https://www.youtube.com/feeds/videos.xml?playlist_id=PL9wDNu3ZrVQ5NtNHF1dYQa0MdB2YYWoCF
-
-Radio Nova : La riposte : youtube
-https://www.youtube.com/feeds/videos.xml?playlist_id=PL9wDNu3ZrVQ53Adh-lKaNQPNgbuZBZiqU
-
-Radio Nova : Les chroniques des Grands Remplaçants : youtube
-https://www.youtube.com/feeds/videos.xml?playlist_id=PL9wDNu3ZrVQ6fpN_H15YByUd4RPbVOgAC
-
-Radio Nova : Les extraits de La dernière : youtube
-https://www.youtube.com/feeds/videos.xml?playlist_id=PL9wDNu3ZrVQ6y2SYIfOLTgDpjSbBxi-AE
-
-Squeezie : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCWeg2Pkate69NFdBeuRFTAw
-
-Studio Bagel : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCZ8kV8vuMdDLSerCIFfWnFQ
-
-Tano : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCpGbvEmVa7gZFuj-WbJeo6Q
-""",
-
-    "arts": """
-Flipboard : art
-https://flipboard.com/topic/fr-art.rss
-
-Google Actu : peinture
-https://news.google.com/rss/search?q=peinture&hl=fr&gl=FR&ceid=FR:fr
-
-Le Monde : photo
-https://www.lemonde.fr/photo/rss_full.xml
-
-Art Mag
-https://magazine-art-mag.fr/feed/
-
-Arts Allagnon
-https://artsallagnon.blogspot.com/feeds/posts/default?alt=rss
-
-Beaux arts magazine
-https://www.beauxarts.com/feed/
-
-Beware Mag
-https://www.bewaremag.com/feed/
-
-Blind Magazine
-https://www.blind-magazine.com/fr/feed/
-
-Citescope : exposition
-https://www.citescope.fr/themes/exposition/feed/
-
-Connaissances des arts
-https://www.connaissancedesarts.com/feed/
-
-DesignFax
-https://www.design-fax.fr/feed/
-
-Dessins poétiques
-https://rotring.over-blog.com/rss
-
-Espace des arts
-https://espacedesarts.pro/rss
-
-Flickr : Danemark
-https://api.flickr.com/services/feeds/photos_public.gne?tags=danemark
-
-Galerie Art et Style
-https://galerie-artstyle.com/feed/
-
-Galerie Vent des Cimes
-https://galerie-ventdescimes.com/feed/
-
-L'Atelier Géant
-https://lateliergeant.geant-beaux-arts.fr/feed/
-
-L'insatiable
-https://linsatiable.org/spip.php?page=backend
-
-L'officiel
-https://www.lofficiel.com/feed.rss
-
-La galerie de Rosana
-http://lagaleriederosana.blogspirit.com/index.rss
-
-Le Grand Continent : arts
-https://legrandcontinent.eu/fr/themes/arts/feed/
-
-Le Mague
-http://feeds.feedburner.com/leMague
-
-Les murs peints s'affichent
-http://feeds.feedburner.com/LesMursPeintsSaffichent?format=xml
-
-Marc Verat
-https://marcverat.blogspot.com/feeds/posts/default?alt=rss
-
-Nikon passion
-https://www.nikonpassion.com/feed/
-
-Yann Hovadik
-http://yannhovadik.blogspot.com/feeds/posts/default?alt=rss
-
-Creapills
-https://creapills.com/feed
-
-Écouter les Beaux-Arts de Marseille !
-https://feeds.transistor.fm/ecouter-les-beaux-arts-de-marseille
-
-Actes d'Arts
-https://feeds.soundcloud.com/users/soundcloud:users:978726166/sounds.rss
-
-Brève d'art
-https://feed.ausha.co/yUu2fQ82Zm7o
-
-Décodeur
-https://feed.ausha.co/y01vpFXlgq84
-
-Innover dans le Monde de l'Art
-https://feed.ausha.co/GAZ7OSvnw17l
-
-Urban Art Paris : podcast
-https://anchor.fm/s/38aece68/podcast/rss
-
-West Indies Art Podcast
-https://rss.buzzsprout.com/1971626.rss
-
-Dessin créatif
-https://art-dessincreatif.1fr1.net/rss
-
-Flickr : Espagne
-https://api.flickr.com/services/feeds/photos_public.gne?tags=espagne
-
-Beaux-Arts de Paris : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCEARNorNgk2IeDcGjtmGwmw
-
-Créa Lo : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UClhAN-ghjX3NTQOZoh-cG2g
-
-Florence Morin B. : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCmk0RPWv0b-Z55Emv8yinxw
-
-MédiART : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCYaFVZtpBB_6Zg2qN-qX6-g
-
-Rart : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCxorIykr7tkF-BUXjTKhrrw
-
-TutoDrawBonus : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UC7Wa-bGo-UXNbFZhgZP2BpA
-""",
-
-    "feminin": """
-Actu Maroc : femme
-https://actu-maroc.com/category/femme/feed/
-
-L'Humanité : metoo
-https://www.humanite.fr/mot-cle/metoo/feed
-
-Le Monde : beauté
-https://www.lemonde.fr/m-beaute/rss_full.xml
-
-Le Monde : Les lois du genre
-https://www.lemonde.fr/les-lois-du-genre/rss_full.xml
-
-Le NouvelObs : beauté
-https://www.nouvelobs.com/beaute/rss.xml
-
-RFI : droits des femmes
-https://www.rfi.fr/fr/tag/droits-des-femmes/rss
-
-RFI : femmes
-https://www.rfi.fr/fr/tag/femmes/rss
-
-RTBF : beauté
-https://rss.rtbf.be/article/rss/highlight_rtbf_tendance-beaute.xml?source=internal
-
-Le Monde : Droit à l'avortement
-https://www.lemonde.fr/droit-a-l-avortement/rss_full.xml
-
-Axelle Magazine
-https://www.axellemag.be/feed/
-
-Les glorieuses
-http://feeds.feedburner.com/LesGlorieuses
-
-Nations Unies : femmes
-https://news.un.org/feed/subscribe/fr/news/topic/women/feed/rss.xml
-
-AngryMum : emploi
-https://www.angrymum.fr/category/emploi/feed/
-
-Au féminin
-https://www.aufeminin.com/feed
-
-Be
-https://www.be.com/feed
-
-ELLE
-https://cdn-elle.ladmedia.fr/var/plain_site/storage/flux_rss/fluxToutELLEfr.xml
-
-Femina
-https://www.femina.fr/rss/content.xml
-
-Femme Actuelle
-https://www.femmeactuelle.fr/rss.xml
-
-Journal des femmes
-https://morss.it/https://www.journaldesfemmes.fr/rss/
-
-Les confettis
-https://www.lesconfettis.com/feed/
-
-Marie France : articles
-https://www.mariefrance.fr/feed/
-
-Marie France : mode
-https://www.mariefrance.fr/mode/feed
-
-Marie-Claire
-https://www.marieclaire.fr/rss/article/20001
-
-MaxiMag : beauté
-https://www.maxi-mag.fr/beaute/feed
-
-Objeko
-https://www.objeko.com/feed/
-
-Omagazine
-https://omagazine.fr/feed/
-
-Terra Femina
-https://www.terrafemina.com/partners/generic/news.xml
-
-The Body Optimist
-https://www.ma-grande-taille.com/feed
-
-Vanity Fair France
-https://www.vanityfair.fr/feed/rss
-
-YomByYom
-https://www.yombyyom.com/feed/
-
-Àblock
-https://ablock.fr/feed/
-
-Gazette des sports : football féminin
-https://gazettesports.fr/football/football-feminin/feed/
-
-Women Sports
-https://www.womensports.fr/feed
-
-CEFCYS : Les CyberStories racontées par les femmes
-https://feed.ausha.co/l22YRI0rYarJ
-
-France Inter : En marge
-https://radiofrance-podcast.net/podcast09/rss_16539.xml
-
-France Inter : Pomme and Co
-https://radiofrance-podcast.net/podcast09/rss_22776.xml
-
-Le Figaro : Madame Figaro : conversations
-https://feed.ausha.co/BngaaIzK41ro
-
-Les Couilles sur la table
-https://feeds.audiomeans.fr/feed/d9cd7538-7491-4873-b0c4-90ccba60ccf1.xml
-
-RCFM : Beauté bien être
-https://radiofrance-podcast.net/podcast09/rss_15495.xml
-
-les sans pagEs : bluesky
-https://bsky.app/profile/did:plc:kohjveomnxefysmtmyouenhi/rss
-
-CEFCYS - CErcle des Femmes de la CYberSécurité : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCx6jwkLFV1YWdZ_7RGSQN1w
-
-Nous Toutes : peertube
-https://indymotion.fr/feeds/videos.xml?videoChannelId=1369
-""",
-
-    "people": """
-20minutes : people
-https://www.20minutes.fr/feeds/rss-people.xml
-
-7sur7 : monarchies
-https://www.7sur7.be/monarchies/rss.xml
-
-7sur7 : people
-https://www.7sur7.be/people/rss.xml
-
-BFM : people
-https://www.bfmtv.com/rss/people/
-
-France Info : people
-https://www.franceinfo.fr/culture/people.rss
-
-France3 : Miss France
-https://france3-regions.franceinfo.fr/culture/people/miss-france/rss
-
-HuffPost : people
-https://www.huffingtonpost.fr/people/rss_headline.xml
-
-L'Indépendant : people
-https://www.lindependant.fr/divertissement/people/rss.xml
-
-La Dépêche : divertissement
-https://www.ladepeche.fr/divertissement/rss.xml
-
-Le Monde : Un château de sable avec...
-https://www.lemonde.fr/un-chateau-de-sable-avec/rss_full.xml
-
-Le NouvelObs : people
-https://www.nouvelobs.com/people/rss.xml
-
-Le NouvelObs tendances : people
-https://o.nouvelobs.com/people/rss.xml
-
-Le Parisien : people et medias
-https://feeds.leparisien.fr/leparisien/rss/laparisienne/people
-
-LyonMag : people
-https://www.lyonmag.com/rss/category/6/people
-
-Midi Libre : people
-https://www.midilibre.fr/divertissement/people/rss.xml
-
-Nice-Matin : people
-https://www.nicematin.com/sujet/people/rss
-
-Radio-Canada : célébrités
-https://ici.radio-canada.ca/info/rss/sous-theme/celebrites
-
-RTBF : people
-https://rss.rtbf.be/article/rss/highlight_tv_people-rtbf-actualites.xml?source=internal
-
-Barbanews
-https://www.barbanews.com/feed/
-
-Closer
-https://www.closermag.fr/feed
-
-Coin tribune : FR : people
-https://www.cointribune.com/actu/actu-people/feed/
-
-Demotivateur
-https://feeds.feedburner.com/demotivateur/qATCg3PWmlW
-
-Hollywoodpq
-https://feeds.feedburner.com/hollywoodpq/TKiZ13ebxzi
-
-Melty : célébrités
-https://www.melty.fr/people/feed
-
-Public
-https://www.public.fr/feed
-
-Stéphane Larue
-https://stephanelarue.com/feed/
-
-VSD
-https://vsd.fr/feed/
-
-ici : Génération(s) Star Academy
-https://radiofrance-podcast.net/podcast09/rss_24576.xml
-
-ici : Petite histoire des noms de stars
-https://radiofrance-podcast.net/podcast09/rss_25093.xml
-
-Le Figaro : Madame Figaro : scandales
-https://feed.ausha.co/B4W44cp5eq67
-
-Sud Info : Show Buzz
-https://feeds.sudinfo.be/sudinfo/showbuzz
-
-VSD : bluesky
-https://bsky.app/profile/did:plc:i44t4mkhvzvavdj2twqzthqr/rss
-
-Entrée libre : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCct38M-8F9JO9Fgb8KZ5ccw
-
-Voici : youtube
-https://www.youtube.com/feeds/videos.xml?channel_id=UCDfz74gMnHcckb48XzXzoGQ
-"""
-}
-
-def parse_rss_sources(content_text):
-    """Parse le contenu texte pour extraire les flux RSS"""
-    sources = []
-    lines = content_text.strip().split('\n')
-    
+def iter_rss_sources(lines):
+    """Parcourt des lignes de texte et produit les flux RSS {name, url} au fil de l'eau"""
     current_name = None
     for line in lines:
         line = line.strip()
-        if not line:
+        if not line or line.startswith('#'):
             continue
             
         # Si la ligne est une URL (commence par http)
         if line.startswith('http'):
             if current_name:
-                sources.append({
+                yield {
                     "name": current_name,
                     "url": line
-                })
+                }
                 current_name = None
         else:
             # C'est un nom de source
             current_name = line
+
+def parse_rss_sources(content_text):
+    """Parse le contenu texte pour extraire les flux RSS"""
+    return list(iter_rss_sources(content_text.splitlines()))
+
+def read_page_metadata(lines):
+    """
+    Lit l'en-tête "# clé: valeur" d'une page sauvegardée.
     
-    return sources
+    Retourne les métadonnées et un itérateur sur le reste des lignes,
+    sans rien charger de plus que l'en-tête.
+    """
+    lines = iter(lines)
+    metadata = {}
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        match = METADATA_LINE.match(stripped)
+        if not match:
+            return metadata, itertools.chain([line], lines)
+        metadata[match.group(1).lower()] = match.group(2)
+    return metadata, iter(())
+
+def iter_page_paths(inputs):
+    """Développe les entrées (fichiers, dossiers ou "-" pour stdin) en chemins"""
+    for entry in inputs:
+        if entry == '-':
+            yield entry
+            continue
+        path = Path(entry)
+        if path.is_dir():
+            yield from sorted(
+                p for p in path.rglob('*')
+                if p.is_file() and p.suffix in PAGE_SUFFIXES
+            )
+        else:
+            yield path
 
-def add_sources_to_json(category_key, category_name, sources):
-    """Ajoute les sources à la catégorie du fichier JSON"""
+def iter_page_batches(inputs, default_category=None, default_name=None, workers=None, data=None):
+    """
+    Produit (category_key, category_name, sources) pour chaque page, en lisant
+    chaque fichier ligne par ligne : la mémoire utilisée ne dépend pas de la
+    taille des pages.
+    
+    La catégorie vient de l'en-tête du fichier ("# category:", "# name:"),
+    sinon des valeurs par défaut, sinon du nom du fichier.
+    
+    Les pages HTML (miroir de l'Atlas) sont analysées après les pages texte,
+    sur `workers` processus (voir atlas_html) ; `data` (catalogue chargé)
+    rattache leur titre à une catégorie existante.
+    """
+    html_paths = []
+    for path in iter_page_paths(inputs):
+        if path != '-' and path.suffix in HTML_SUFFIXES:
+            html_paths.append(path)
+            continue
+        if path == '-':
+            stream, stem = sys.stdin, None
+        else:
+            stream, stem = open(path, 'r', encoding='utf-8'), path.stem
+        try:
+            metadata, lines = read_page_metadata(stream)
+            category_key = metadata.get("category") or default_category or stem
+            if not category_key:
+                raise ValueError("catégorie inconnue pour stdin : utiliser --categorie")
+            category_name = (
+                metadata.get("name") or default_name or category_key.replace('_', ' ').capitalize()
+            )
+            yield category_key, category_name, iter_rss_sources(lines)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
     
-    # Charger le fichier JSON existant
-    with open(JSON_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Créer la catégorie si elle n'existe pas
-    if category_key not in data["categories"]:
-        data["categories"][category_key] = {
-            "name": category_name,
-            "description": f"Sources {category_name.lower()}",
-            "sources": []
-        }
-    
-    # Récupérer les URLs existantes pour éviter les doublons
-    existing_urls = {source["url"] for source in data["categories"][category_key]["sources"]}
-    
-    # Ajouter les nouvelles sources
-    added_count = 0
-    for source in sources:
-        if source["url"] not in existing_urls:
-            data["categories"][category_key]["sources"].append(source)
-            existing_urls.add(source["url"])
-            added_count += 1
-    
-    # Sauvegarder le fichier JSON mis à jour
-    with open(JSON_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    return added_count
+    if html_paths:
+        from atlas_html import iter_html_batches
+        yield from iter_html_batches(html_paths, default_category, default_name, workers, data)
 
-def main():
-    """Fonction principale"""
+def add_sources_to_json(category_key, category_name, sources, json_file=JSON_FILE):
+    """Ajoute les sources à la catégorie du fichier JSON"""
+    results, _ = ingest_batch([(category_key, category_name, sources)], json_file, compact=True)
+    return results[0][2]
+
+def ingest_batch(batches, json_file=JSON_FILE, data=None, compact=False):
+    """
+    Ingestion groupée : charge le catalogue une seule fois, applique toutes
+    les catégories en mémoire puis ajoute les sources nouvelles au journal
+    du catalogue, sous verrou exclusif (voir catalog_journal).
+    
+    Le journal n'est replié dans le fichier JSON qu'au-delà de COMPACT_BYTES :
+    sans `compact`, les lecteurs du seul JSON (le navigateur) ne voient les
+    ajouts qu'après ce repliement. `compact=True` réécrit le JSON aussitôt,
+    comme le fait la ligne de commande.
+    
+    `batches` est un itérable de tuples (category_key, category_name, sources).
+    `data`, s'il est fourni, est le catalogue déjà chargé depuis `json_file`.
+    Retourne la liste des tuples (category_name, trouvés, ajoutés) et l'index
+    global des URLs, qui sert aussi au rapport de doublons.
+    """
+    journal = CatalogJournal(json_file)
+    with journal.lock():
+        # Un catalogue chargé avant le verrou sert à dédupliquer (le rejeu
+        # ignore un ajout en double) mais pas à compacter
+        current = data is None
+        if current:
+            data, url_index = journal.load_indexed()
+        else:
+            url_index = UrlIndex.from_catalog(data)
+        
+        results = []
+        records = []
+        for category_key, category_name, sources in batches:
+            # Compter au passage sans matérialiser les sources
+            found = itertools.count()
+            counted = (source for source, _ in zip(sources, found))
+            before = len(data["categories"].get(category_key, {}).get("sources", ()))
+            added = merge_sources(data, category_key, category_name, counted, url_index)
+            results.append((category_name, next(found), added))
+            records.extend(
+                {"op": "add", "category": category_key, "name": category_name, "source": source}
+                for source in data["categories"][category_key]["sources"][before:]
+            )
+        
+        # Quelques lignes ajoutées au journal, même pour des centaines de pages
+        journal.commit(records, data if current else None, compact)
+    
+    return results, url_index
+
+def print_duplicates_report(url_index, verbose=False):
+    """Affiche les URLs partagées entre plusieurs catégories"""
+    cross = url_index.cross_category_duplicates()
+    print(f"🔁 {len(cross)} URLs présentes dans plusieurs catégories")
+    if verbose:
+        for key, categories in sorted(cross.items()):
+            print(f"  - {key} : {', '.join(categories)}")
+
+def cmd_ingest(args):
+    """Ingère des pages de l'Atlas sauvegardées dans le catalogue"""
     
     print("Extraction des flux RSS depuis les pages de l'Atlas...")
     print("=" * 60)
     
-    # Mapper les catégories
-    categories_mapping = {
-        "cuisine": ("cuisine", "Cuisine"),
-        "gastronomie": ("gastronomie", "Gastronomie"),
-        "humour": ("humour", "Humour"),
-        "arts": ("arts", "Arts"),
-        "feminin": ("feminin", "Féminin"),
-        "people": ("people", "People")
-    }
+    data = load_catalog(args.catalogue)
+    batches = iter_page_batches(args.entrees, args.categorie, args.nom, args.processus, data)
+    results, url_index = ingest_batch(batches, args.catalogue, compact=True)
     
     total_added = 0
-    
-    for page_key, content in PAGES_CONTENT.items():
-        category_key, category_name = categories_mapping[page_key]
-        
+    for category_name, found, added in results:
         print(f"\n Traitement de la catégorie: {category_name}")
-        sources = parse_rss_sources(content)
-        print(f"  - {len(sources)} flux RSS trouvés")
-        
-        added = add_sources_to_json(category_key, category_name, sources)
+        print(f"  - {found} flux RSS trouvés")
         print(f"  - {added} nouveaux flux ajoutés")
-        print(f"  - {len(sources) - added} flux déjà existants")
+        print(f"  - {found - added} flux déjà existants")
         
         total_added += added
     
     print("\n" + "=" * 60)
     print(f"✅ Terminé ! {total_added} nouveaux flux RSS ajoutés au total")
-    print(f"📁 Fichier mis à jour: {JSON_FILE}")
+    print(f"📁 Fichier mis à jour: {args.catalogue}")
+    print_duplicates_report(url_index, verbose=args.doublons)
+    
+    # Fragments déjà publiés : mise à jour incrémentale et correctif
+    if total_added and (args.fragments / "manifest.json").exists():
+        from catalog_shards import build_shards
+        manifest, rewritten = build_shards(load_catalog(args.catalogue), args.fragments)
+        print(f"📦 Fragments version {manifest['version']} : {', '.join(rewritten)} réécrit(s)")
+
+def cmd_opml(args):
+    """Importe ou exporte le catalogue au format OPML (dossiers = catégories)"""
+    from catalog_opml import DEFAULT_CATEGORY, iter_opml, iter_opml_batches
+    
+    start = time.perf_counter()
+    data = load_catalog(args.catalogue)
+    
+    if args.action == "export":
+        chunks = iter_opml(data, args.categorie)
+        if str(args.fichier) == "-":
+            sys.stdout.writelines(chunks)
+        else:
+            with atomic_write(args.fichier) as f:
+                f.writelines(chunks)
+        total = sum(
+            len(category["sources"]) for key, category in data["categories"].items()
+            if not args.categorie or key in args.categorie
+        )
+        print(f"📁 {total} flux exportés vers {args.fichier} ({time.perf_counter() - start:.2f} s)",
+              file=sys.stderr if str(args.fichier) == "-" else sys.stdout)
+        return
+    
+    source = sys.stdin.buffer if str(args.fichier) == "-" else args.fichier
+    default = (args.categorie[0], args.nom or args.categorie[0]) if args.categorie else DEFAULT_CATEGORY
+    batches = iter_opml_batches(source, data, default)
+    results, url_index = ingest_batch(batches, args.catalogue, data, compact=True)
+    
+    # Une catégorie peut arriver en plusieurs lots : totaux par catégorie
+    totals = {}
+    for category_name, found, added in results:
+        previous = totals.get(category_name, (0, 0))
+        totals[category_name] = (previous[0] + found, previous[1] + added)
+    for category_name, (found, added) in totals.items():
+        print(f"  - {category_name}: {found} flux, {added} nouveaux")
+    total_added = sum(added for _, added in totals.values())
+    print(f"✅ {total_added} nouveaux flux importés depuis {args.fichier} ({time.perf_counter() - start:.2f} s)")
+    print_duplicates_report(url_index)
+
+def cmd_shards(args):
+    """Génère un fragment précompressé par catégorie et le manifeste"""
+    from catalog_shards import brotli, build_shards
+    
+    manifest, rewritten = build_shards(load_catalog(args.catalogue), args.sortie)
+    
+    print(f"📦 {len(rewritten)}/{len(manifest['categories'])} fragments écrits dans {args.sortie}"
+          f" (version {manifest['version']})")
+    for category_key in rewritten:
+        entry = manifest["categories"][category_key]
+        sizes = f"{entry['bytes']} o, gzip {entry['gz_bytes']} o"
+        if "br_bytes" in entry:
+            sizes += f", brotli {entry['br_bytes']} o"
+        print(f"  - {category_key}: {entry['count']} flux ({sizes})")
+    delta = manifest["deltas"].get(str(manifest["version"] - 1))
+    if rewritten and delta:
+        print(f"🩹 Correctif {delta['file']} : {delta['bytes']} o, gzip {delta['gz_bytes']} o")
+    if brotli is None:
+        print("⚠️ Module brotli absent : variantes .br non générées (pip install brotli)")
+
+def cmd_db(args):
+    """Maintient et interroge la base SQLite parallèle au catalogue"""
+    import catalog_db
+    
+    conn = catalog_db.connect(args.base)
+    
+    if args.action in ("sync", "ingest"):
+        start = time.perf_counter()
+        if args.action == "sync":
+            results = catalog_db.sync_from_catalog(conn, load_catalog(args.catalogue))
+        else:
+            batches = iter_page_batches(args.entrees or [str(PAGES_DIR)], args.categorie, args.nom)
+            results = catalog_db.upsert_batches(conn, batches)
+        elapsed = time.perf_counter() - start
+        found = sum(found for _, found, _ in results)
+        added = sum(added for _, _, added in results)
+        print(f"🗄️ {found} flux traités, {added} ajoutés en une transaction ({elapsed:.2f} s)")
+        print(f"📊 {catalog_db.stats(conn)}")
+    
+    elif args.action == "query":
+        start = time.perf_counter()
+        rows = catalog_db.search(
+            conn, name=args.nom, host=args.hote, category=args.categorie, limit=args.limite
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        for row in rows:
+            print(f"[{row['category']}] {row['name']}\n    {row['url']}")
+        print(f"🔍 {len(rows)} résultats en {elapsed:.1f} ms")
+    
+    elif args.action == "export":
+        data = catalog_db.export_catalog(conn)
+        journal = CatalogJournal(args.catalogue)
+        # La base remplace l'instantané ; les modifications du journal pas
+        # encore repliées (ingestion, vérification, watch...) sont rejouées
+        # dessus avant de le vider, sinon elles seraient perdues
+        with journal.lock():
+            pending = journal.replay(data)
+            journal.compact(data)
+        total = sum(len(category["sources"]) for category in data["categories"].values())
+        print(f"📁 {total} flux exportés vers {args.catalogue}"
+              + (f" ({pending} modifications du journal rejouées)" if pending else ""))
+    
+    conn.close()
+
+def cmd_check(args):
+    """Vérifie que les flux du catalogue répondent encore"""
+    import feed_checker
+    
+    data = load_catalog(args.catalogue)
+    checked = 0
+    
+    def progress(source):
+        nonlocal checked
+        checked += 1
+        if checked % 500 == 0:
+            print(f"  … {checked} flux vérifiés")
+    
+    start = time.perf_counter()
+    sources = feed_checker.check_catalog(
+        data, categories=args.categorie, limit=args.limite, on_result=progress,
+        concurrency=args.concurrence, per_host=args.par_hote, timeout=args.delai,
+    )
+    elapsed = time.perf_counter() - start
+    
+    print(f"📡 {len(sources)} flux vérifiés en {elapsed:.1f} s")
+    for label, count in feed_checker.summarize(sources).items():
+        print(f"  - {label}: {count}")
+    
+    if not args.sans_ecriture:
+        # Seuls les résultats partent au journal : une ingestion lancée
+        # pendant la vérification n'est pas écrasée
+        journal = CatalogJournal(args.catalogue)
+        with journal.lock():
+            journal.commit(
+                ({"op": "update", "url": source["url"], "fields": {"check": source["check"]}}
+                 for source in sources),
+                compact=True,
+            )
+        print(f"📁 Résultats enregistrés dans {args.catalogue}")
+
+def cmd_redirects(args):
+    """Résout les redirections des flux et regroupe ceux qui aboutissent au même flux"""
+    from feed_redirects import RedirectCache, collapse_records, summarize
+    from feed_server import is_public_host
+    
+    data = load_catalog(args.catalogue)
+    urls = [
+        source["url"]
+        for key, category in data["categories"].items()
+        if not args.categorie or key in args.categorie
+        for source in category["sources"]
+    ][:args.limite]
+    cache = RedirectCache(args.cache)
+    resolved_count = 0
+    
+    def progress(url):
+        nonlocal resolved_count
+        resolved_count += 1
+        if resolved_count % 500 == 0:
+            print(f"  … {resolved_count} URLs résolues")
+    
+    start = time.perf_counter()
+    try:
+        resolved = cache.resolve(
+            urls, concurrency=args.concurrence, per_host=args.par_hote, timeout=args.delai,
+            allow_host=None if args.reseau_local else is_public_host, on_result=progress,
+        )
+        cache.purge()
+    finally:
+        cache.close()
+    kinds, hosts = summarize(resolved)
+    print(f"📡 {len(resolved)} URLs ({resolved_count} résolues, {len(resolved) - resolved_count} en cache)"
+          f" en {time.perf_counter() - start:.1f} s")
+    for kind, count in sorted(kinds.items()):
+        print(f"  - {kind}: {count}")
+    for host, count in hosts[:10]:
+        print(f"🔁 {host}: {count} redirections")
+    
+    journal = CatalogJournal(args.catalogue)
+    with journal.lock():
+        # Regroupement calculé sur le catalogue à jour, sous le verrou
+        records, groups = collapse_records(journal.load(), resolved, args.categorie)
+        removed = sum(1 for record in records if record["op"] == "remove")
+        print(f"🔗 {groups} sources regroupées sous une URL canonique, {removed} doublons retirés")
+        if args.appliquer and records:
+            journal.commit(records, compact=True)
+            print(f"📁 Catalogue mis à jour ({args.catalogue}), anciennes URLs gardées dans \"aliases\"")
+        elif records:
+            print("ℹ️ Relancer avec --appliquer pour modifier le catalogue")
+
+def cmd_classify(args):
+    """Range automatiquement des sources sans catégorie, d'après le catalogue existant"""
+    from source_classifier import SourceClassifier, evaluate, require_numpy
+    
+    try:
+        require_numpy()
+    except ImportError as error:
+        raise SystemExit(f"❌ {error}")
+    
+    data = load_catalog(args.catalogue)
+    if args.evaluer:
+        report = evaluate(data)
+        print(f"🔍 Exactitude {report['accuracy']:.1%} sur {report['test']} sources mises de côté"
+              f" (apprentissage {report['train_seconds']} s, classement {report['classify_seconds']} s)")
+        for threshold in (0.5, 0.8, 0.9):
+            entry = report[f"confidence_{threshold}"]
+            if entry["accuracy"] is not None:
+                print(f"  - confiance ≥ {threshold} : {entry['share']:.0%} des sources, exactitude {entry['accuracy']:.1%}")
+        if not args.fichier:
+            return
+    if not args.fichier:
+        raise SystemExit("❌ Indiquer un fichier OPML ou une page de flux à classer")
+    
+    # Sources du fichier, quels que soient ses dossiers ou son en-tête
+    if args.fichier.suffix.lower() in (".opml", ".xml"):
+        from catalog_opml import iter_opml_batches
+        batches = iter_opml_batches(args.fichier)
+    else:
+        batches = iter_page_batches([args.fichier], default_category="auto")
+    url_index = UrlIndex.from_catalog(data)
+    sources, known = [], 0
+    for _, _, batch in batches:
+        for source in batch:
+            if source["url"] in url_index:
+                known += 1
+            else:
+                url_index.add(source["url"], None)
+                sources.append(source)
+    
+    start = time.perf_counter()
+    classifier = SourceClassifier.train(data)
+    trained = time.perf_counter() - start
+    start = time.perf_counter()
+    results = classifier.classify(sources)
+    elapsed = time.perf_counter() - start
+    
+    print(f"🔍 {len(sources)} sources classées en {elapsed:.2f} s (apprentissage {trained:.2f} s),"
+          f" {known} déjà au catalogue")
+    accepted = {}
+    for source, result in zip(sources, results):
+        if result["confidence"] >= args.seuil:
+            accepted.setdefault(result["category"], []).append(source)
+    for category_key, category_sources in sorted(accepted.items(), key=lambda item: -len(item[1])):
+        print(f"  - {category_key}: {len(category_sources)}")
+    uncertain = len(sources) - sum(map(len, accepted.values()))
+    print(f"⚠️ {uncertain} sources sous le seuil de confiance {args.seuil}")
+    
+    if args.sortie:
+        with atomic_write(args.sortie) as f:
+            json.dump([{**source, **result} for source, result in zip(sources, results)],
+                      f, ensure_ascii=False, indent=2)
+        print(f"📁 Propositions enregistrées dans {args.sortie}")
+    if args.ajouter and accepted:
+        batches = [
+            (category_key, data["categories"][category_key]["name"], category_sources)
+            for category_key, category_sources in accepted.items()
+        ]
+        results, _ = ingest_batch(batches, args.catalogue, compact=True)
+        print(f"✅ {sum(added for _, _, added in results)} sources ajoutées au catalogue")
+
+def cmd_journal(args):
+    """Journal des modifications du catalogue : état, compactage, retrait de flux"""
+    from collections import Counter
+    
+    journal = CatalogJournal(args.catalogue)
+    if args.action == "status":
+        with journal.lock(exclusive=False):
+            records = journal.records()
+            size = journal.size()
+        ops = Counter(record["op"] for record in records)
+        detail = ", ".join(f"{op} {count}" for op, count in sorted(ops.items()))
+        print(f"🗄️ {journal.path.name} : {len(records)} modifications, {size} o" + (f" ({detail})" if detail else ""))
+        return
+    
+    if args.action == "remove":
+        if not args.urls:
+            raise SystemExit("❌ Indiquer les URLs des flux à retirer")
+        with journal.lock():
+            data, url_index = journal.load_indexed()
+            found = sum(1 for url in args.urls if url in url_index)
+            # Toutes les variantes de chaque URL (http/https, slash final), dans toutes les catégories
+            records = remove_records(data, [(None, url) for url in args.urls])
+            journal.commit(records, compact=True)
+        print(f"✅ {found}/{len(args.urls)} flux retirés du catalogue ({len(records)} sources)")
+        return
+    
+    start = time.perf_counter()
+    with journal.lock():
+        replayed = len(journal.records())
+        journal.compact()
+    print(f"📁 {replayed} modifications repliées dans {args.catalogue} ({time.perf_counter() - start:.2f} s)")
+
+def cmd_snapshots(args):
+    """Télécharge les flux et met à jour les instantanés statiques d'articles récents"""
+    from article_snapshots import collect_articles, update_snapshots
+    from catalog_shards import brotli
+    from feed_cache import FeedCache
+    from feed_metrics import FeedMetrics
+    from feed_server import FeedAggregator
+    
+    data = load_catalog(args.catalogue)
+    cache = None if args.sans_cache else FeedCache(args.cache)
+    metrics = FeedMetrics()
+    aggregator = FeedAggregator(
+        data, workers=args.workers, allow_private=args.reseau_local, cache=cache, metrics=metrics,
+    )
+    try:
+        start = time.perf_counter()
+        articles_by_category = collect_articles(aggregator, args.categorie)
+        fetched = sum(map(len, articles_by_category.values()))
+        print(f"📡 {len(aggregator._entries)} flux lus, {fetched} articles en {time.perf_counter() - start:.1f} s")
+    finally:
+        aggregator.close()
+    
+    summary = metrics.summary(top=5)
+    if summary["total"]["failures"]:
+        print("⚠️ Échecs : " + ", ".join(f"{cause} {count}" for cause, count in summary["total"]["failures"].items()))
+    for host in summary["slowest_hosts"]:
+        print(f"⏱️ {host['key']}: {host['mean_seconds'] * 1000:.0f} ms en moyenne sur {host['fetches']} flux")
+    if args.metriques:
+        with atomic_write(args.metriques) as f:
+            f.write(metrics.prometheus())
+        print(f"📁 Mesures Prometheus enregistrées dans {args.metriques}")
+    
+    manifest, rewritten = update_snapshots(articles_by_category, data, args.sortie, max_articles=args.max_articles)
+    print(f"📦 {len(rewritten)}/{len(manifest['categories'])} instantanés réécrits dans {args.sortie}")
+    for category_key in rewritten:
+        entry = manifest["categories"][category_key]
+        print(f"  - {category_key}: {entry['count']} articles ({entry['bytes']} o, gzip {entry['gz_bytes']} o)")
+    if brotli is None:
+        print("⚠️ Module brotli absent : variantes .br non générées (pip install brotli)")
+
+def cmd_watch(args):
+    """Surveille les pages de flux et met à jour le catalogue au fil des modifications"""
+    from catalog_watch import CatalogWatcher, open_inotify
+    
+    watcher = CatalogWatcher(
+        args.entrees, args.catalogue, args.etat, fragments=args.fragments, db_file=args.base, workers=args.processus,
+    )
+    
+    def report(result):
+        for key, category_key, added, removed in result["files"]:
+            print(f"🔁 {Path(key).name} [{category_key}] : +{added} / -{removed}")
+        print(f"✅ Catalogue : {result['added']} flux ajoutés, {result['removed']} retirés")
+        if result["shards"]:
+            print(f"📦 Fragments : {', '.join(result['shards'])} réécrit(s)")
+        if result["db"]:
+            print(f"🗄️ Base SQLite : {result['db'][0]} retirés, {result['db'][1]} ajoutés")
+    
+    def error(exc):
+        print(f"⚠️ Passage interrompu, nouvel essai au suivant : {exc}")
+    
+    if args.une_fois:
+        start = time.perf_counter()
+        result = watcher.sync()
+        if result:
+            report(result)
+        print(f"ℹ️ {len(watcher.files)} fichiers suivis, passage en {time.perf_counter() - start:.2f} s")
+        return
+    
+    inotify = None if args.sans_inotify else open_inotify()
+    mode = "inotify" if inotify is not None else f"parcours toutes les {args.intervalle:g} s"
+    print(f"👀 Surveillance de {', '.join(map(str, args.entrees))} ({mode}), Ctrl+C pour arrêter")
+    try:
+        watcher.run(inotify, args.intervalle, on_sync=report, on_error=error)
+    except KeyboardInterrupt:
+        print("\n🛑 Arrêt de la surveillance")
+    finally:
+        if inotify is not None:
+            inotify.close()
+
+def cmd_serve(args):
+    """Lance le service d'agrégation (remplace les proxys CORS)"""
+    from article_index import ArticleIndex
+    from feed_cache import FeedCache
+    from feed_metrics import FeedMetrics
+    from feed_redirects import RedirectCache
+    from feed_scheduler import FeedScheduler
+    from feed_server import FeedAggregator, is_public_host, make_server
+    from image_resolver import ImageResolver
+    
+    cache = None if args.sans_cache else FeedCache(args.cache, args.cache_mo * 1024 * 1024)
+    scheduler = None if args.intervalle_fixe else FeedScheduler(
+        args.etat, min_interval=args.intervalle_min, max_interval=args.intervalle_max,
+    )
+    index = None if args.sans_index else ArticleIndex(args.index)
+    images = None if args.sans_verif_images else ImageResolver(
+        args.images, per_host=args.images_par_hote, allow_host=None if args.reseau_local else is_public_host,
+    )
+    aggregator = FeedAggregator(
+        load_catalog(args.catalogue), interval=args.intervalle,
+        workers=args.workers, allow_private=args.reseau_local, cache=cache, scheduler=scheduler,
+        index=index, images=images, metrics=None if args.sans_metriques else FeedMetrics(),
+        redirects=None if args.sans_redirections else RedirectCache(args.redirections),
+    )
+    if index is not None:
+        print(f"🔍 Index des articles : {index.stats()['articles']} articles récents")
+    if scheduler is not None:
+        print(f"⏱️ Planification adaptative : {scheduler.stats()['feeds']} flux suivis")
+        aggregator.start_refresher(args.tick)
+    server = make_server(aggregator, args.hote, args.port)
+    print(f"🚀 Service d'agrégation sur http://{args.hote}:{args.port}/api/categories")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Arrêt du service")
+    finally:
+        server.server_close()
+        aggregator.close()
+
+def main(argv=None):
+    """Fonction principale"""
+    
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "--catalogue", type=Path, default=JSON_FILE,
+        help="fichier JSON du catalogue (défaut : rss-sources-complete.json)"
+    )
+    commands = parser.add_subparsers(dest="command")
+    
+    ingest = commands.add_parser("ingest", help=cmd_ingest.__doc__)
+    ingest.add_argument(
+        "entrees", nargs="*", default=[str(PAGES_DIR)],
+        help="fichiers, dossiers ou - pour stdin (défaut : atlas_pages/)"
+    )
+    ingest.add_argument("--categorie", help="catégorie par défaut si la page n'a pas d'en-tête")
+    ingest.add_argument("--nom", help="nom de catégorie par défaut si la page n'a pas d'en-tête")
+    ingest.add_argument(
+        "--doublons", action="store_true",
+        help="lister les URLs présentes dans plusieurs catégories"
+    )
+    ingest.add_argument(
+        "--processus", type=int,
+        help="processus pour analyser les pages HTML (défaut : un par cœur)"
+    )
+    ingest.add_argument(
+        "--fragments", type=Path, default=SCRIPT_DIR / "sources",
+        help="fragments à mettre à jour s'ils existent déjà (défaut : sources/)"
+    )
+    ingest.set_defaults(handler=cmd_ingest)
+    
+    opml = commands.add_parser("opml", help=cmd_opml.__doc__)
+    opml.add_argument("action", choices=["import", "export"], help="import : OPML → catalogue, export : catalogue → OPML")
+    opml.add_argument("fichier", type=Path, help="fichier OPML, ou - pour stdin / stdout")
+    opml.add_argument(
+        "--categorie", action="append",
+        help="export : catégories à exporter (répétable) ; import : catégorie des flux hors dossier"
+    )
+    opml.add_argument("--nom", help="import : nom de la catégorie des flux hors dossier")
+    opml.set_defaults(handler=cmd_opml)
+    
+    shards = commands.add_parser("shards", help=cmd_shards.__doc__)
+    shards.add_argument(
+        "--sortie", type=Path, default=SCRIPT_DIR / "sources",
+        help="dossier de sortie (défaut : sources/)"
+    )
+    shards.set_defaults(handler=cmd_shards)
+    
+    db = commands.add_parser("db", help=cmd_db.__doc__)
+    db.add_argument(
+        "action", choices=["sync", "ingest", "query", "export"],
+        help="sync : JSON → base, ingest : pages → base, query : recherche, export : base → JSON"
+    )
+    db.add_argument("entrees", nargs="*", help="pages à ingérer (action ingest)")
+    db.add_argument(
+        "--base", type=Path, default=SCRIPT_DIR / "rss-sources.db",
+        help="fichier SQLite (défaut : rss-sources.db)"
+    )
+    db.add_argument("--nom", help="préfixe(s) du nom de la source")
+    db.add_argument("--hote", help="domaine (sous-domaines inclus)")
+    db.add_argument("--categorie", help="clé de catégorie")
+    db.add_argument("--limite", type=int, default=50, help="nombre maximal de résultats")
+    db.set_defaults(handler=cmd_db)
+    
+    check = commands.add_parser("check", help=cmd_check.__doc__)
+    check.add_argument("--categorie", action="append", help="limiter à une catégorie (répétable)")
+    check.add_argument("--limite", type=int, help="nombre maximal de flux à vérifier")
+    check.add_argument("--concurrence", type=int, default=100, help="requêtes simultanées au total")
+    check.add_argument("--par-hote", type=int, default=4, help="requêtes simultanées par hôte")
+    check.add_argument("--delai", type=float, default=10.0, help="délai maximal par requête (s)")
+    check.add_argument(
+        "--sans-ecriture", action="store_true",
+        help="ne pas enregistrer les résultats dans le catalogue"
+    )
+    check.set_defaults(handler=cmd_check)
+    
+    classify = commands.add_parser("classify", help=cmd_classify.__doc__)
+    classify.add_argument("fichier", type=Path, nargs="?", help="fichier OPML (.opml, .xml) ou page de flux (.txt)")
+    classify.add_argument("--seuil", type=float, default=0.8, help="confiance minimale pour ranger une source")
+    classify.add_argument("--ajouter", action="store_true", help="ajouter au catalogue les sources rangées")
+    classify.add_argument("--sortie", type=Path, help="enregistrer toutes les propositions (JSON)")
+    classify.add_argument(
+        "--evaluer", action="store_true",
+        help="mesurer l'exactitude sur une partie du catalogue mise de côté"
+    )
+    classify.set_defaults(handler=cmd_classify)
+    
+    redirects = commands.add_parser("redirects", help=cmd_redirects.__doc__)
+    redirects.add_argument("--categorie", action="append", help="limiter à une catégorie (répétable)")
+    redirects.add_argument("--limite", type=int, help="nombre maximal de flux à résoudre")
+    redirects.add_argument("--concurrence", type=int, default=100, help="requêtes simultanées au total")
+    redirects.add_argument("--par-hote", type=int, default=4, help="requêtes simultanées par hôte")
+    redirects.add_argument("--delai", type=float, default=10.0, help="délai maximal par requête (s)")
+    redirects.add_argument(
+        "--cache", type=Path, default=SCRIPT_DIR / "redirects.db",
+        help="cache des redirections résolues (défaut : redirects.db)"
+    )
+    redirects.add_argument(
+        "--reseau-local", action="store_true",
+        help="autoriser les flux hébergés sur le réseau local"
+    )
+    redirects.add_argument(
+        "--appliquer", action="store_true",
+        help="regrouper les sources dans le catalogue (sinon, simple rapport)"
+    )
+    redirects.set_defaults(handler=cmd_redirects)
+    
+    journal = commands.add_parser("journal", help=cmd_journal.__doc__)
+    journal.add_argument(
+        "action", choices=["status", "compact", "remove"],
+        help="status : modifications en attente, compact : les replier dans le JSON, remove : retirer des flux"
+    )
+    journal.add_argument("urls", nargs="*", help="URLs des flux à retirer (action remove)")
+    journal.set_defaults(handler=cmd_journal)
+    
+    snapshots = commands.add_parser("snapshots", help=cmd_snapshots.__doc__)
+    snapshots.add_argument(
+        "--sortie", type=Path, default=SCRIPT_DIR / "snapshots",
+        help="dossier des instantanés (défaut : snapshots/)"
+    )
+    snapshots.add_argument("--categorie", action="append", help="limiter à une catégorie (répétable)")
+    snapshots.add_argument("--max-articles", type=int, default=1000, help="articles par instantané (au seau près)")
+    snapshots.add_argument("--workers", type=int, default=16, help="téléchargements simultanés")
+    snapshots.add_argument(
+        "--reseau-local", action="store_true",
+        help="autoriser les flux hébergés sur le réseau local"
+    )
+    snapshots.add_argument(
+        "--cache", type=Path, default=SCRIPT_DIR / "feed_cache",
+        help="dossier du cache des flux (défaut : feed_cache/)"
+    )
+    snapshots.add_argument("--sans-cache", action="store_true", help="désactiver les requêtes conditionnelles")
+    snapshots.add_argument(
+        "--metriques", type=Path,
+        help="écrire les mesures des téléchargements au format texte de Prometheus"
+    )
+    snapshots.set_defaults(handler=cmd_snapshots)
+    
+    watch = commands.add_parser("watch", help=cmd_watch.__doc__)
+    watch.add_argument(
+        "entrees", nargs="*", default=[str(PAGES_DIR)],
+        help="dossiers ou fichiers de pages à surveiller (défaut : atlas_pages/)"
+    )
+    watch.add_argument(
+        "--etat", type=Path, default=SCRIPT_DIR / "watch_state.json",
+        help="état des fichiers déjà analysés (défaut : watch_state.json)"
+    )
+    watch.add_argument("--intervalle", type=float, default=2.0, help="période de parcours sans inotify (s)")
+    watch.add_argument("--sans-inotify", action="store_true", help="parcourir les dossiers à intervalle régulier")
+    watch.add_argument("--une-fois", action="store_true", help="un seul passage, puis quitter")
+    watch.add_argument(
+        "--fragments", type=Path, default=SCRIPT_DIR / "sources",
+        help="fragments à mettre à jour s'ils existent déjà (défaut : sources/)"
+    )
+    watch.add_argument(
+        "--base", type=Path, default=SCRIPT_DIR / "rss-sources.db",
+        help="base SQLite à mettre à jour si elle existe (défaut : rss-sources.db)"
+    )
+    watch.add_argument(
+        "--processus", type=int,
+        help="processus pour analyser les pages HTML (défaut : un par cœur)"
+    )
+    watch.set_defaults(handler=cmd_watch)
+    
+    serve = commands.add_parser("serve", help=cmd_serve.__doc__)
+    serve.add_argument("--hote", default="127.0.0.1", help="adresse d'écoute")
+    serve.add_argument("--port", type=int, default=8080, help="port d'écoute")
+    serve.add_argument(
+        "--intervalle", type=int, default=900,
+        help="durée de validité d'un flux téléchargé, avec --intervalle-fixe (s)"
+    )
+    serve.add_argument(
+        "--intervalle-fixe", action="store_true",
+        help="même intervalle pour tous les flux, sans planification adaptative"
+    )
+    serve.add_argument("--intervalle-min", type=int, default=300, help="intervalle adaptatif minimal (s)")
+    serve.add_argument("--intervalle-max", type=int, default=10800, help="intervalle adaptatif maximal (s)")
+    serve.add_argument("--tick", type=int, default=30, help="période du rafraîchissement de fond (s)")
+    serve.add_argument(
+        "--etat", type=Path, default=SCRIPT_DIR / "feed_scheduler.json",
+        help="état persistant du planificateur (défaut : feed_scheduler.json)"
+    )
+    serve.add_argument("--workers", type=int, default=16, help="téléchargements simultanés")
+    serve.add_argument(
+        "--reseau-local", action="store_true",
+        help="autoriser les flux hébergés sur le réseau local"
+    )
+    serve.add_argument(
+        "--cache", type=Path, default=SCRIPT_DIR / "feed_cache",
+        help="dossier du cache des flux (défaut : feed_cache/)"
+    )
+    serve.add_argument("--cache-mo", type=int, default=200, help="taille maximale du cache (Mo)")
+    serve.add_argument("--sans-cache", action="store_true", help="désactiver les requêtes conditionnelles")
+    serve.add_argument(
+        "--index", type=Path, default=SCRIPT_DIR / "articles.db",
+        help="index plein texte des articles (défaut : articles.db)"
+    )
+    serve.add_argument("--sans-index", action="store_true", help="désactiver la recherche d'articles")
+    serve.add_argument(
+        "--images", type=Path, default=SCRIPT_DIR / "image_cache.db",
+        help="cache des images vérifiées (défaut : image_cache.db)"
+    )
+    serve.add_argument("--images-par-hote", type=int, default=4, help="HEAD simultanés par hôte d'images")
+    serve.add_argument(
+        "--sans-verif-images", action="store_true",
+        help="laisser les images non vérifiées (le navigateur s'en charge)"
+    )
+    serve.add_argument("--sans-metriques", action="store_true", help="désactiver /metrics et /api/metrics")
+    serve.add_argument(
+        "--redirections", type=Path, default=SCRIPT_DIR / "redirects.db",
+        help="cache des redirections des flux (défaut : redirects.db)"
+    )
+    serve.add_argument(
+        "--sans-redirections", action="store_true",
+        help="suivre les redirections à chaque téléchargement"
+    )
+    serve.set_defaults(handler=cmd_serve)
+    
+    args = parser.parse_args(argv)
+    if args.command is None:
+        # Sans commande : comportement historique, ingestion de atlas_pages/
+        args = parser.parse_args([*(argv if argv is not None else sys.argv[1:]), "ingest"])
+    args.handler(args)
 
 if __name__ == "__main__":
     main()
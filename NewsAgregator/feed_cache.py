@@ -0,0 +1,189 @@
+"""
+Cache disque des flux téléchargés, pour les requêtes conditionnelles.
+
+Les corps sont rangés par empreinte SHA-256 (deux URLs qui servent le même
+contenu partagent un seul fichier) et un index SQLite garde, par URL, les
+validateurs ETag / Last-Modified. Un 304 coûte alors quelques centaines
+d'octets au lieu du flux complet. Le cache reste sous un budget d'octets
+en évinçant les URLs les moins récemment utilisées.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from catalog_core import SCRIPT_DIR, atomic_write
+
+CACHE_DIR = SCRIPT_DIR / "feed_cache"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url           TEXT PRIMARY KEY,
+    digest        TEXT NOT NULL,
+    size          INTEGER NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    fetched_at    REAL NOT NULL,
+    last_access   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_digest ON entries(digest);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access);
+"""
+
+class FeedCache:
+    """Cache adressé par contenu, avec validateurs HTTP et éviction LRU"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.blobs = self.directory / "blobs"
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.directory / "index.db", check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        # Taille réelle sur disque : un contenu partagé n'est compté qu'une fois
+        self._total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+        ).fetchone()[0]
+        self.counters = {
+            "hits": 0,             # 304 : corps servi depuis le disque
+            "misses": 0,           # 200 : corps téléchargé puis stocké
+            "bytes_saved": 0,      # octets non retéléchargés grâce aux 304
+            "bytes_downloaded": 0,
+            "evictions": 0,
+        }
+
+    def _blob_path(self, digest):
+        return self.blobs / digest[:2] / digest
+
+    def _in_use(self, digest):
+        return self._db.execute(
+            "SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)
+        ).fetchone() is not None
+
+    def validators(self, url):
+        """En-têtes If-None-Match / If-Modified-Since à envoyer pour `url`"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return {}
+        etag, last_modified = row
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def not_modified(self, url, headers=None):
+        """
+        Enregistre un 304 et retourne le corps en cache (None s'il a disparu).
+        Un nouvel ETag éventuel remplace l'ancien.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT digest, size FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            digest, size = row
+            try:
+                body = self._blob_path(digest).read_bytes()
+            except FileNotFoundError:
+                self._forget(url)
+                self._db.commit()
+                return None
+            headers = headers or {}
+            self._db.execute(
+                """
+                UPDATE entries SET last_access = ?,
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+                """,
+                (time.time(), headers.get("etag"), headers.get("last-modified"), url),
+            )
+            self._db.commit()
+            self.counters["hits"] += 1
+            self.counters["bytes_saved"] += size
+            return body
+
+    def store(self, url, headers, body):
+        """Enregistre un corps reçu en 200 avec ses validateurs, puis applique le budget"""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        now = time.time()
+        with self._lock:
+            self.counters["misses"] += 1
+            self.counters["bytes_downloaded"] += len(body)
+            if not (headers.get("etag") or headers.get("last-modified")):
+                # Sans validateur, un 304 est impossible : inutile de stocker
+                self._forget(url)
+                self._db.commit()
+                return
+            if not self._in_use(digest):
+                self._total += len(body)
+                if not path.exists():
+                    path.parent.mkdir(exist_ok=True)
+                    with atomic_write(path, 'wb') as f:
+                        f.write(body)
+            previous = self._db.execute("SELECT digest FROM entries WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO entries(url, digest, size, etag, last_modified, fetched_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (url, digest, len(body), headers.get("etag"), headers.get("last-modified"), now, now),
+            )
+            if previous and previous[0] != digest:
+                self._drop_blob_if_unused(previous[0])
+            self._evict()
+            self._db.commit()
+
+    def _forget(self, url):
+        row = self._db.execute("SELECT digest FROM entries WHERE url = ?", (url,)).fetchone()
+        if row:
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._drop_blob_if_unused(row[0])
+
+    def _drop_blob_if_unused(self, digest):
+        if not self._in_use(digest):
+            path = self._blob_path(digest)
+            try:
+                self._total -= path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        """Évince les URLs les moins récemment utilisées jusqu'à respecter le budget"""
+        if self._total <= self.max_bytes:
+            return
+        for url, digest in self._db.execute(
+            "SELECT url, digest FROM entries ORDER BY last_access"
+        ).fetchall():
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._drop_blob_if_unused(digest)
+            self.counters["evictions"] += 1
+            if self._total <= self.max_bytes:
+                break
+
+    def stats(self):
+        """Compteurs de session et occupation du cache"""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            stored = self._total
+        requests = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_ratio": round(self.counters["hits"] / requests, 3) if requests else 0.0,
+            "entries": entries,
+            "stored_bytes": stored,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
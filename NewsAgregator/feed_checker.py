@@ -0,0 +1,252 @@
+"""
+Vérification asynchrone de la disponibilité des flux du catalogue.
+
+Chaque flux reçoit un GET dont on ne lit que la ligne de statut et les
+en-têtes (le corps n'est jamais téléchargé), en suivant les redirections.
+La concurrence est bornée globalement et par hôte : www.youtube.com ou
+radiofrance-podcast.net portent des centaines de flux et ne doivent pas
+être martelés.
+"""
+
+import asyncio
+import socket
+import ssl
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from urllib.parse import quote, urljoin, urlsplit
+
+USER_AGENT = "CraftKontrol-NewsAgregator/1.0 (+https://github.com/CraftKontrol/AI_Agents)"
+ACCEPT = "application/rss+xml, application/atom+xml, application/xml;q=0.9, text/xml;q=0.9, */*;q=0.8"
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_HEADER_BYTES = 64 * 1024
+# Caractères laissés tels quels dans la cible de la requête : l'ASCII visible
+# (% déjà encodés compris), seuls les espaces et le non-ASCII sont encodés
+TARGET_SAFE = ''.join(map(chr, range(0x21, 0x7f)))
+
+class CheckError(Exception):
+    """Échec de vérification, avec une cause courte (timeout, dns, ssl, ...)"""
+
+    def __init__(self, cause, message=""):
+        super().__init__(message or cause)
+        self.cause = cause
+
+def parse_head(raw):
+    """Découpe la ligne de statut et les en-têtes d'une réponse HTTP/1.x"""
+    lines = raw.decode('iso-8859-1').split('\r\n')
+    parts = lines[0].split(' ', 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+        raise CheckError("http", f"ligne de statut invalide : {lines[0][:80]!r}")
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+    return int(parts[1]), headers
+
+def request_target(parts):
+    """
+    Cible de la requête HTTP (chemin?requête) d'une URL découpée, les
+    caractères non ASCII d'une IRI (accents) et les espaces encodés en %XX :
+    une ligne de requête HTTP/1.1 n'accepte ni l'un ni l'autre.
+    """
+    target = quote(parts.path or '/', safe=TARGET_SAFE)
+    return target + (f"?{quote(parts.query, safe=TARGET_SAFE)}" if parts.query else '')
+
+async def fetch_head(url, timeout, ssl_context, method="GET", accept=ACCEPT):
+    """Envoie un GET (ou un HEAD) et retourne (statut, en-têtes) sans lire le corps"""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise CheckError("url", f"URL non supportée : {url}")
+    secure = parts.scheme == "https"
+    try:
+        port = parts.port or (443 if secure else 80)
+        # Nom de domaine internationalisé : sa forme ASCII (punycode)
+        hostname = parts.hostname.encode('idna').decode('ascii')
+    except ValueError as error:  # port hors limites, UnicodeError
+        raise CheckError("url", f"URL invalide : {url} ({error})") from None
+    target = request_target(parts)
+    host_header = hostname if parts.port is None else f"{hostname}:{parts.port}"
+
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                hostname, port,
+                ssl=ssl_context if secure else None,
+                server_hostname=hostname if secure else None,
+                limit=MAX_HEADER_BYTES,
+            ),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        raise CheckError("timeout", "connexion trop lente") from None
+    except ssl.SSLError as error:
+        raise CheckError("ssl", str(error)) from None
+    except socket.gaierror as error:
+        raise CheckError("dns", str(error)) from None
+    except OSError as error:
+        raise CheckError("connexion", str(error)) from None
+
+    try:
+        writer.write(
+            f"{method} {target} HTTP/1.1\r\n"
+            f"Host: {host_header}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            f"Accept: {accept}\r\n"
+            "Connection: close\r\n\r\n".encode('ascii')
+        )
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout)
+    except asyncio.TimeoutError:
+        raise CheckError("timeout", "pas de réponse") from None
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as error:
+        raise CheckError("http", f"en-têtes illisibles : {error}") from None
+    except (ssl.SSLError, OSError) as error:
+        raise CheckError("connexion", str(error)) from None
+    finally:
+        writer.close()
+        try:
+            await asyncio.wait_for(writer.wait_closed(), timeout)
+        except (asyncio.TimeoutError, ssl.SSLError, OSError):
+            pass  # la réponse est déjà lue : seule la fermeture a échoué
+
+    return parse_head(raw[:-4])
+
+class FeedChecker:
+    """
+    Vérifie des URLs avec une limite globale et une limite par hôte.
+
+    `allow_host(hostname)`, s'il est fourni, est consulté avant chaque requête
+    (redirections comprises) ; un hôte refusé lève CheckError("hote").
+    """
+
+    def __init__(self, concurrency=100, per_host=4, timeout=10.0, max_redirects=5,
+                 method="GET", accept=ACCEPT, allow_host=None):
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.method = method
+        self.accept = accept
+        self.allow_host = allow_host
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.ssl_context = ssl.create_default_context()
+        self._global = asyncio.Semaphore(concurrency)
+        self._hosts = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+
+    async def _hop(self, url, timing):
+        host = urlsplit(url).hostname or ''
+        if self.allow_host is not None:
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(None, self.allow_host, host):
+                raise CheckError("hote", f"hôte refusé : {host}")
+        async with self._hosts[host], self._global:
+            # La latence ne compte que le réseau, pas l'attente des sémaphores
+            start = time.perf_counter()
+            try:
+                return await fetch_head(url, self.timeout, self.ssl_context, self.method, self.accept)
+            finally:
+                timing[0] += time.perf_counter() - start
+
+    async def follow(self, url, timing=None, hops=None):
+        """
+        Suit les redirections depuis `url` ; retourne (statut, en-têtes, URL
+        finale). Chaque redirection suivie est ajoutée à `hops` (statut, URL
+        cible) s'il est fourni. Lève CheckError en cas d'échec.
+        """
+        timing = timing if timing is not None else [0.0]
+        current = url.strip()
+        for _ in range(self.max_redirects + 1):
+            status, headers = await self._hop(current, timing)
+            location = headers.get("location")
+            if status in REDIRECT_STATUSES and location:
+                current = urljoin(current, location)
+                if hops is not None:
+                    hops.append((status, current))
+                continue
+            return status, headers, current
+        raise CheckError("redirections", f"plus de {self.max_redirects} redirections")
+
+    async def check(self, url):
+        """Vérifie une URL ; retourne le résultat à stocker dans la source"""
+        timing = [0.0]
+        result = {"checked_at": datetime.now(timezone.utc).isoformat(timespec='seconds')}
+        try:
+            status, headers, current = await self.follow(url, timing)
+            result.update({
+                "status": status,
+                "content_type": headers.get("content-type", "").split(';')[0].strip(),
+            })
+            if current != url.strip():
+                result["final_url"] = current
+        except CheckError as error:
+            result["error"] = error.cause
+            result["detail"] = str(error)[:200]
+        result["latency_ms"] = round(timing[0] * 1000)
+        return result
+
+def interleave_by_host(sources):
+    """
+    Réordonne les sources en tourniquet par hôte : les 1 260 flux YouTube
+    ne bloquent pas la fenêtre de tâches derrière leur sémaphore d'hôte.
+    """
+    queues = defaultdict(deque)
+    for source in sources:
+        queues[urlsplit(source["url"].strip()).hostname or ''].append(source)
+    active = deque(queues.values())
+    while active:
+        queue = active.popleft()
+        yield queue.popleft()
+        if queue:
+            active.append(queue)
+
+async def check_sources(sources, checker, on_result=None, window=None):
+    """
+    Vérifie les sources en gardant au plus `window` tâches en vol, et stocke
+    le résultat dans source["check"]. `on_result(source)` est appelé au fil de l'eau.
+    """
+    window = window or checker.concurrency * 4
+    pending = set()
+
+    async def run(source):
+        source["check"] = await checker.check(source["url"])
+        return source
+
+    def collect(done):
+        for task in done:
+            if on_result:
+                on_result(task.result())
+
+    for source in interleave_by_host(sources):
+        if len(pending) >= window:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            collect(done)
+        pending.add(asyncio.create_task(run(source)))
+    if pending:
+        done, _ = await asyncio.wait(pending)
+        collect(done)
+
+def check_catalog(data, categories=None, limit=None, on_result=None, **options):
+    """Vérifie (en place) les sources du catalogue ; retourne les sources vérifiées"""
+    selected = [
+        source
+        for key, category in data["categories"].items()
+        if not categories or key in categories
+        for source in category["sources"]
+    ][:limit]
+
+    async def main():
+        await check_sources(selected, FeedChecker(**options), on_result)
+
+    asyncio.run(main())
+    return selected
+
+def summarize(sources):
+    """Compteurs par classe de statut ou cause d'erreur"""
+    counts = defaultdict(int)
+    for source in sources:
+        check = source.get("check", {})
+        if "error" in check:
+            counts[check["error"]] += 1
+        else:
+            counts[f"{check['status'] // 100}xx"] += 1
+    return dict(sorted(counts.items()))
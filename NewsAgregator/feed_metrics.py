@@ -0,0 +1,195 @@
+"""
+Mesures du chemin critique des rafraîchissements : téléchargement et analyse
+de chaque flux.
+
+Pour chaque flux, chaque hôte et l'ensemble : histogrammes de la connexion
+(DNS + TCP + TLS, nulle sur une connexion réutilisée), du temps jusqu'au
+premier octet, de la durée et du volume du téléchargement, du temps
+d'analyse et du nombre d'articles ; compteurs d'échecs par cause (timeout,
+http_404, xml, empty...). Un relevé coûte une recherche dichotomique et
+quelques incréments sous un verrou.
+
+Export au format texte de Prometheus (par hôte et global : un label par
+flux ferait des centaines de milliers de séries) et en résumé JSON avec les
+hôtes et les flux les plus lents.
+"""
+
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+ITEMS_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 1000)
+
+# nom → (bornes, description) ; les noms Prometheus sont préfixés par PREFIX
+METRICS = {
+    "connect_seconds": (SECONDS_BUCKETS, "Résolution DNS et connexion (TCP + TLS)"),
+    "ttfb_seconds": (SECONDS_BUCKETS, "Envoi de la requête jusqu'aux en-têtes de la réponse"),
+    "download_seconds": (SECONDS_BUCKETS, "Lecture du corps de la réponse"),
+    "download_bytes": (BYTES_BUCKETS, "Octets reçus (avant décompression)"),
+    "parse_seconds": (SECONDS_BUCKETS, "Analyse du flux"),
+    "items": (ITEMS_BUCKETS, "Articles par flux analysé"),
+}
+PREFIX = "newsagg_feed_"
+# Temps d'un rafraîchissement, pour classer les plus lents
+LATENCY_METRICS = ("connect_seconds", "ttfb_seconds", "download_seconds", "parse_seconds")
+
+class Histogram:
+    """Histogramme à bornes fixes (compteurs non cumulés, cumulés à l'export)"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # dernier compartiment : +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Quantile estimé par interpolation linéaire dans son compartiment"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for position, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.bounds[position - 1] if position else 0.0
+                if position == len(self.bounds):
+                    return lower
+                return lower + (self.bounds[position] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+class Series:
+    """Histogrammes et compteurs d'échecs d'un flux, d'un hôte ou de l'ensemble"""
+
+    __slots__ = ('histograms', 'failures')
+
+    def __init__(self):
+        self.histograms = {}
+        self.failures = Counter()
+
+    def observe(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(METRICS[name][0])
+        histogram.observe(value)
+
+    def latency(self):
+        """Temps moyen d'un rafraîchissement (somme des moyennes des étapes)"""
+        return sum(self.histograms[name].mean() for name in LATENCY_METRICS if name in self.histograms)
+
+    def summary(self):
+        return {
+            "fetches": self.histograms["ttfb_seconds"].count if "ttfb_seconds" in self.histograms else 0,
+            "mean_seconds": round(self.latency(), 4),
+            **{
+                name: {
+                    "mean": round(histogram.mean(), 4),
+                    "p50": round(histogram.quantile(0.5), 4),
+                    "p95": round(histogram.quantile(0.95), 4),
+                }
+                for name, histogram in self.histograms.items()
+            },
+            "failures": dict(self.failures),
+        }
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class FeedMetrics:
+    """Registre des mesures par flux, par hôte et global"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = Series()
+        self.hosts = {}
+        self.feeds = {}
+
+    def _series(self, url, host):
+        feed = self.feeds.get(url)
+        if feed is None:
+            feed = self.feeds[url] = Series()
+        host_series = self.hosts.get(host)
+        if host_series is None:
+            host_series = self.hosts[host] = Series()
+        return self.total, host_series, feed
+
+    def observe(self, url, host, **values):
+        """Relève des mesures d'un flux : observe(url, host, ttfb_seconds=0.12, download_bytes=5321)"""
+        with self._lock:
+            for series in self._series(url, host):
+                for name, value in values.items():
+                    series.observe(name, value)
+
+    def failure(self, url, host, cause):
+        """Compte un échec de rafraîchissement (cause courte : timeout, http_404, xml, empty...)"""
+        with self._lock:
+            for series in self._series(url, host):
+                series.failures[cause] += 1
+
+    def prometheus(self):
+        """Export au format texte de Prometheus (0.0.4)"""
+        lines = []
+        with self._lock:
+            scopes = [('', self.total)] + [
+                (f'host="{_escape(host)}"', series) for host, series in sorted(self.hosts.items())
+            ]
+            for name, (bounds, description) in METRICS.items():
+                metric = PREFIX + name
+                lines.append(f"# HELP {metric} {description}")
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, series in scopes:
+                    histogram = series.histograms.get(name)
+                    if histogram is None:
+                        continue
+                    separator = ',' if labels else ''
+                    cumulative = 0
+                    for bound, count in zip((*bounds, '+Inf'), histogram.counts):
+                        cumulative += count
+                        le = bound if bound == '+Inf' else _number(bound)
+                        lines.append(f'{metric}_bucket{{{labels}{separator}le="{le}"}} {cumulative}')
+                    suffix = f"{{{labels}}}" if labels else ''
+                    lines.append(f"{metric}_sum{suffix} {_number(histogram.sum)}")
+                    lines.append(f"{metric}_count{suffix} {histogram.count}")
+            metric = PREFIX + "failures_total"
+            lines.append(f"# HELP {metric} Échecs de rafraîchissement par cause")
+            lines.append(f"# TYPE {metric} counter")
+            for labels, series in scopes:
+                for cause, count in sorted(series.failures.items()):
+                    separator = ',' if labels else ''
+                    lines.append(f'{metric}{{{labels}{separator}cause="{_escape(cause)}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def totals(self):
+        """Résumé global seul"""
+        with self._lock:
+            return {"feeds": len(self.feeds), "hosts": len(self.hosts), **self.total.summary()}
+
+    def summary(self, top=20):
+        """Résumé JSON : totaux, échecs, hôtes et flux les plus lents"""
+        with self._lock:
+            def slowest(items):
+                measured = [item for item in items if "ttfb_seconds" in item[1].histograms]
+                ranked = sorted(measured, key=lambda item: item[1].latency(), reverse=True)[:top]
+                return [{"key": key, **series.summary()} for key, series in ranked]
+
+            return {
+                "feeds": len(self.feeds),
+                "hosts": len(self.hosts),
+                "total": self.total.summary(),
+                "slowest_hosts": slowest(self.hosts.items()),
+                "slowest_feeds": slowest(self.feeds.items()),
+            }
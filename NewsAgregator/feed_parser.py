@@ -0,0 +1,268 @@
+"""
+Analyse des flux RSS 2.0 / Atom côté serveur.
+
+Portage de parseArticle() / cleanImageUrl() de script.js : même forme
+d'article {title, link, excerpt, date, source, category, imageUrl} (date
+sérialisée en ISO 8601 UTC) et même ordre de recherche de l'image. Seule
+différence : un article sans date lisible a `date` à None au lieu de
+l'heure courante ; c'est à l'appelant de dater sa première observation
+(voir FeedAggregator).
+
+Le flux est lu avec iterparse : chaque <item>/<entry> est traité puis retiré
+de l'arbre, si bien qu'un gros flux de podcast n'est jamais entièrement
+matérialisé. Toutes les expressions régulières sont compilées au chargement
+du module et la recherche d'image s'arrête au premier candidat valide.
+"""
+
+import io
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+TAG_RE = re.compile(r'<[^>]*>')
+SPACES_RE = re.compile(r'\s+')
+ENTITIES = (('&amp;', '&'), ('&lt;', '<'), ('&gt;', '>'), ('&quot;', '"'), ('&#39;', "'"))
+IMAGE_ENTITIES = ENTITIES + (('&#x2F;', '/'),)
+
+# Recherche d'images dans le HTML de la description, dans l'ordre de parseArticle()
+DESCRIPTION_IMAGE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'<img[^>]+src=["\']([^"\']+)["\']',
+    r'<img[^>]+src=([^\s>]+)',
+    r'<img[^>]+data-src=["\']([^"\']+)["\']',
+    r'<img[^>]+data-lazy-src=["\']([^"\']+)["\']',
+    r'background-image:\s*url\(["\']?([^"\')]+)["\']?\)',
+    r'url\(["\']?([^"\')]+\.(jpg|jpeg|png|gif|webp|svg))["\']?\)',
+    r'(https?://[^\s<>"\']+\.(jpg|jpeg|png|gif|webp|svg)(\?[^\s<>"\']*)?)(?=[\s<>"\']|$)',
+))
+
+# Règles de cleanImageUrl()
+IMAGE_TRIM_RE = re.compile(r'^["\'()\s]+|["\'()\s]+$')
+IMAGE_BLACKLIST_RE = re.compile('|'.join((
+    r'/1x1\.', r'/pixel\.', r'/tracking\.', r'/spacer\.', r'/blank\.',
+    r'/transparent\.', r'/ajax-loader\.', r'/spinner\.',
+    r'feedburner\.com', r'b\.scorecardresearch\.com', r'pixel\.wp\.com',
+)))
+IMAGE_EXTENSION_RE = re.compile(r'\.(jpg|jpeg|png|gif|webp|svg|bmp|ico)(\?|$|#)', re.IGNORECASE)
+IMAGE_PATH_RE = re.compile(
+    r'/(image|img|media|upload|photo|picture|asset|content|static|file)/', re.IGNORECASE
+)
+IMAGE_CDN_RE = re.compile(r'(cdn|cloudinary|imgur|imgix|imagekit|cloudfront|akamai|fastly|gstatic)', re.IGNORECASE)
+IMAGE_PARAM_RE = re.compile(r'[?&](image|img|media|photo|picture)=', re.IGNORECASE)
+
+# Préfixes usuels, pour nommer les éléments comme les sélecteurs de script.js
+NAMESPACE_PREFIXES = {
+    "http://search.yahoo.com/mrss/": "media",
+    "http://www.itunes.com/dtds/podcast-1.0.dtd": "itunes",
+    "http://purl.org/dc/elements/1.1/": "dc",
+    "http://purl.org/rss/1.0/modules/content/": "content",
+}
+META_IMAGE_KEYS = ('og:image', 'twitter:image')
+ITEM_TAGS = {'item': False, 'entry': True}  # nom local → is_atom
+
+def local_name(tag):
+    """Nom d'un élément sans son espace de noms"""
+    return tag.rsplit('}', 1)[-1]
+
+@lru_cache(maxsize=1024)
+def qualified_name(tag):
+    """Nom préfixé à la façon de querySelector (media:content, itunes:image, ...)"""
+    if not tag.startswith('{'):
+        return tag
+    namespace, name = tag[1:].split('}', 1)
+    prefix = NAMESPACE_PREFIXES.get(namespace)
+    return f"{prefix}:{name}" if prefix else name
+
+def decode_entities(text, entities=ENTITIES):
+    """Décode les quelques entités HTML que script.js décode aussi"""
+    for entity, char in entities:
+        if entity in text:
+            text = text.replace(entity, char)
+    return text
+
+def clean_text(text):
+    """Équivalent de cleanText() : entités courantes décodées, espaces normalisés"""
+    return SPACES_RE.sub(' ', decode_entities(text)).strip()
+
+def parse_date(value):
+    """Date RFC 822 (RSS) ou ISO 8601 (Atom) ; None si illisible"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            date = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    # Tout en UTC : les dates ISO se comparent alors comme des chaînes
+    return date.astimezone(timezone.utc)
+
+def clean_image_url(image_url, article_link):
+    """Équivalent de cleanImageUrl() : résout, filtre et valide une URL d'image"""
+    if not image_url:
+        return ''
+    image_url = decode_entities(image_url, IMAGE_ENTITIES).strip()
+    image_url = IMAGE_TRIM_RE.sub('', image_url).strip().replace('\\', '')
+
+    if image_url.startswith('data:'):
+        return ''
+
+    article = urlsplit(article_link)
+    if image_url.startswith('//'):
+        image_url = 'https:' + image_url
+    elif not image_url.startswith(('http://', 'https://')):
+        if not article.scheme or not article.netloc:
+            return ''
+        origin = f"{article.scheme}://{article.netloc}"
+        if image_url.startswith('/'):
+            image_url = origin + image_url
+        else:
+            base_path = article.path[:article.path.rfind('/') + 1] or '/'
+            image_url = origin + base_path + image_url
+
+    try:
+        hostname = urlsplit(image_url).hostname or ''
+    except ValueError:
+        return ''
+    if not hostname or IMAGE_BLACKLIST_RE.search(image_url):
+        return ''
+
+    has_extension = IMAGE_EXTENSION_RE.search(image_url) is not None
+    if has_extension or IMAGE_PATH_RE.search(image_url) or IMAGE_CDN_RE.search(hostname) \
+            or IMAGE_PARAM_RE.search(image_url):
+        # Une URL trop courte sans extension est probablement un pixel
+        if len(image_url) > 30 or has_extension:
+            return image_url
+
+    # Repli : URL assez longue servie par le domaine de l'article
+    if hostname == (article.hostname or '') and len(image_url) > 40:
+        return image_url
+    return ''
+
+def iter_image_candidates(item, description):
+    """
+    Candidats d'image dans l'ordre de parseArticle(). C'est un générateur :
+    les expressions régulières sur la description ne tournent que si aucun
+    candidat structuré n'a été retenu.
+    """
+    media_content = media_thumbnail = itunes_image = None
+    enclosures, meta_images = [], []
+    for element in item.iter():
+        name = qualified_name(element.tag)
+        if media_content is None and (name == 'media:content' or (name == 'content' and element.get('url'))):
+            media_content = element
+        elif media_thumbnail is None and name in ('media:thumbnail', 'thumbnail'):
+            media_thumbnail = element
+        elif name == 'enclosure':
+            if (element.get('type') or '').startswith('image/'):
+                enclosures.append(element.get('url') or '')
+        elif name == 'meta':
+            key = element.get('property') or element.get('name') or ''
+            if key.startswith(META_IMAGE_KEYS):
+                content = element.get('content') or element.get('value')
+                if content:
+                    meta_images.append(content)
+        elif itunes_image is None and name == 'itunes:image':
+            itunes_image = element
+
+    if media_content is not None:
+        yield media_content.get('url') or ''
+    if media_thumbnail is not None:
+        yield media_thumbnail.get('url') or ''
+    yield from enclosures
+    yield from meta_images
+    if itunes_image is not None:
+        yield itunes_image.get('href') or ''
+
+    if description:
+        for pattern in DESCRIPTION_IMAGE_PATTERNS:
+            for match in pattern.finditer(description):
+                if match.group(1):
+                    yield match.group(1)
+
+def find_image(item, description, link, failed_images=()):
+    """Première image valide (déjà nettoyée) ; '' si aucune"""
+    for candidate in iter_image_candidates(item, description):
+        candidate = candidate.strip()
+        if candidate:
+            cleaned = clean_image_url(candidate, link)
+            if cleaned and cleaned not in failed_images:
+                return cleaned
+    return ''
+
+def first_text(fields, *names):
+    """Premier texte non vide parmi les champs `names`"""
+    for name in names:
+        value = fields.get(name)
+        if value:
+            return value
+    return ''
+
+def parse_item(item, source, is_atom, failed_images=()):
+    """Transforme un <item> ou <entry> en article ; None si titre ou lien manquant"""
+    # Premier descendant de chaque nom, comme querySelector()
+    fields = {}
+    atom_link = None
+    for element in item.iter():
+        if element is item:
+            continue
+        name = qualified_name(element.tag)
+        if name not in fields:
+            fields[name] = element.text or ''
+        if atom_link is None and name == 'link':
+            atom_link = element
+
+    title = fields.get('title', '')
+    if is_atom:
+        link = (atom_link.get('href') or atom_link.text or '') if atom_link is not None else ''
+        description = first_text(fields, 'summary', 'content')
+        pub_date = first_text(fields, 'published', 'updated', 'date', 'dc:date')
+    else:
+        link = fields.get('link', '')
+        description = first_text(fields, 'description', 'content:encoded')
+        pub_date = first_text(fields, 'pubDate', 'dc:date', 'date', 'updated', 'published')
+
+    link = link.strip()
+    if not title or not link:
+        return None
+
+    date = parse_date(pub_date)
+    return {
+        "title": clean_text(title),
+        "link": link,
+        "excerpt": clean_text(TAG_RE.sub('', description).strip())[:200],
+        "date": date.isoformat() if date else None,
+        "source": source["name"],
+        "category": source.get("category") or 'general',
+        "imageUrl": find_image(item, description, link, failed_images),
+    }
+
+def iter_articles(stream, source, failed_images=()):
+    """
+    Produit les articles d'un flux lu depuis un fichier binaire, élément par
+    élément. Chaque item est retiré de son parent dès qu'il a été analysé.
+    """
+    parents = []
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        is_atom = ITEM_TAGS.get(local_name(element.tag))
+        if is_atom is None:
+            continue
+        article = parse_item(element, source, is_atom, failed_images)
+        if parents:
+            parents[-1].remove(element)
+        if article:
+            yield article
+
+def parse_feed(xml_bytes, source, failed_images=()):
+    """Analyse un flux complet et retourne la liste de ses articles"""
+    return list(iter_articles(io.BytesIO(xml_bytes), source, failed_images))
@@ -0,0 +1,252 @@
+"""
+Résolution des redirections des flux et regroupement sous une URL canonique.
+
+Beaucoup d'URLs du catalogue ne sont que des détours vers le même flux
+(feeds.feedburner.com, enveloppes morss.it, fetchrss.com, http → https) :
+chaque rafraîchissement repaie la chaîne de redirections, et deux sources
+qui aboutissent au même flux le font télécharger deux fois.
+
+Chaque URL → URL finale est résolue une fois (GET sans lecture du corps,
+comme feed_checker) puis gardée dans un cache SQLite avec une durée de
+validité qui dépend de la chaîne : longue si toutes les redirections sont
+permanentes (301, 308), courte si l'une est temporaire, très courte après
+une erreur. Le service d'agrégation télécharge directement l'URL finale et
+partage une seule entrée entre les sources qui y mènent.
+
+Dans le catalogue, les sources d'une catégorie qui aboutissent au même flux
+sont fusionnées en une seule (via le journal du catalogue) : l'URL finale
+devient l'URL de la source si la chaîne est permanente, les anciennes URLs
+sont gardées dans `aliases` (elles restent reconnues comme doublons à
+l'ingestion).
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+from catalog_core import SCRIPT_DIR, normalize_url
+from feed_checker import CheckError, FeedChecker, interleave_by_host
+
+CACHE_FILE = SCRIPT_DIR / "redirects.db"
+PERMANENT_STATUSES = {301, 308}
+MAX_CHAIN = 5       # résolutions enchaînées au plus (comme les redirections suivies)
+STORE_BATCH = 500   # résolutions enregistrées par transaction
+
+HOUR = 3600
+DAY = 24 * HOUR
+# Durée de validité d'une résolution selon la chaîne de redirections
+TTL = {
+    "permanent": 30 * DAY,   # uniquement des 301 / 308
+    "temporary": DAY,        # au moins une 302 / 303 / 307
+    "direct": 7 * DAY,       # pas de redirection
+    "error": HOUR,           # échec : on réessaie bientôt
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS redirects (
+    url        TEXT PRIMARY KEY,
+    final_url  TEXT,            -- NULL après une erreur
+    kind       TEXT NOT NULL,   -- permanent, temporary, direct, error
+    checked_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS redirects_expires_at ON redirects(expires_at);
+"""
+
+def chain_kind(hops):
+    """Nature d'une chaîne de redirections [(statut, URL cible)]"""
+    if not hops:
+        return "direct"
+    return "permanent" if all(status in PERMANENT_STATUSES for status, _ in hops) else "temporary"
+
+def canonical_url(url, final_url, kind):
+    """
+    URL à garder dans le catalogue : l'URL finale si la chaîne est
+    permanente ou ne fait que passer en https, sinon l'URL d'origine (une
+    redirection temporaire peut changer de cible).
+    """
+    if final_url is None or kind in ("direct", "error"):
+        return url
+    if kind == "permanent" or normalize_url(final_url) == normalize_url(url):
+        # Jamais de retour de https vers http
+        if final_url.startswith("https:") or url.startswith("http:"):
+            return final_url
+    return url
+
+class RedirectCache:
+    """Cache SQLite URL → URL finale, avec une durée de validité par nature de chaîne"""
+
+    def __init__(self, db_file=CACHE_FILE):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_file, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        # Résolutions déjà lues : le service en consulte une par source demandée
+        self._memo = {}
+        self.counters = {"resolved": 0, "hits": 0}
+
+    def lookup(self, url):
+        """(URL finale, nature) encore valide pour `url`, ou None"""
+        now = time.time()
+        memo = self._memo.get(url)
+        if memo is not None and memo[2] > now:
+            return memo[:2]
+        with self._lock:
+            row = self._db.execute(
+                "SELECT final_url, kind, expires_at FROM redirects WHERE url = ? AND expires_at > ?", (url, now),
+            ).fetchone()
+        if row is None:
+            self._memo.pop(url, None)
+            return None
+        self._memo[url] = row
+        return row[:2]
+
+    def final(self, url):
+        """URL à télécharger pour `url` : sa cible connue, sinon elle-même"""
+        # Une URL finale peut à son tour avoir été redirigée depuis
+        for _ in range(MAX_CHAIN):
+            found = self.lookup(url)
+            if found is None or found[0] is None or found[0] == url:
+                return url
+            self.counters["hits"] += 1
+            url = found[0]
+        return url
+
+    def store(self, url, final_url, kind):
+        """Enregistre une résolution (final_url None pour une erreur)"""
+        self.store_many([(url, final_url, kind)])
+
+    def store_many(self, results):
+        """Enregistre des résolutions [(URL, URL finale, nature)] en une transaction"""
+        now = time.time()
+        rows = [(url, final_url, kind, now, now + TTL[kind]) for url, final_url, kind in results]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO redirects(url, final_url, kind, checked_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        for url, final_url, kind, _, expires_at in rows:
+            self._memo[url] = (final_url, kind, expires_at)
+        self.counters["resolved"] += len(rows)
+
+    def resolve(self, urls, concurrency=50, per_host=4, timeout=10.0, allow_host=None, on_result=None):
+        """
+        Résout les URLs sans résolution valide en cache (GET concurrents,
+        bornés globalement et par hôte) ; retourne URL → (URL finale, nature)
+        pour toutes les URLs. `on_result(url)` est appelé au fil de l'eau.
+        """
+        resolved = {}
+        unknown = []
+        for url in dict.fromkeys(urls):
+            found = self.lookup(url)
+            if found is None:
+                unknown.append(url)
+            else:
+                resolved[url] = found
+        if not unknown:
+            return resolved
+
+        async def main():
+            checker = FeedChecker(concurrency=concurrency, per_host=per_host, timeout=timeout,
+                                  allow_host=allow_host)
+
+            async def run(url):
+                hops = []
+                try:
+                    status, _, final_url = await checker.follow(url, hops=hops)
+                    kind = chain_kind(hops) if status < 400 else "error"
+                except CheckError:
+                    final_url, kind = None, "error"
+                return url, (final_url if kind != "error" else None), kind
+
+            # Sémaphore global pris après celui de l'hôte : les centaines de
+            # flux d'un même hôte n'occupent pas la fenêtre
+            ordered = [source["url"] for source in interleave_by_host({"url": url} for url in unknown)]
+            pending = []
+            for task in asyncio.as_completed([run(url) for url in ordered]):
+                url, final_url, kind = await task
+                resolved[url] = (final_url, kind)
+                pending.append((url, final_url, kind))
+                if len(pending) >= STORE_BATCH:
+                    self.store_many(pending)
+                    pending.clear()
+                if on_result:
+                    on_result(url)
+            self.store_many(pending)
+
+        asyncio.run(main())
+        return resolved
+
+    def purge(self):
+        """Supprime les résolutions expirées"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM redirects WHERE expires_at <= ?", (time.time(),))
+
+    def stats(self):
+        """Compteurs de session et résolutions valides par nature"""
+        with self._lock:
+            kinds = dict(self._db.execute(
+                "SELECT kind, COUNT(*) FROM redirects WHERE expires_at > ? GROUP BY kind", (time.time(),)
+            ).fetchall())
+        return {**self.counters, "kinds": kinds}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def collapse_records(data, resolved, categories=None):
+    """
+    Modifications du journal qui regroupent, catégorie par catégorie, les
+    sources aboutissant au même flux : une source gardée (celle qui porte
+    déjà l'URL canonique, sinon la première), son URL canonique et ses
+    alias ; les autres sont retirées de la catégorie. Seules les chaînes
+    permanentes ou directes comptent : deux flux redirigés temporairement
+    vers la même page (connexion, consentement) restent distincts.
+    Retourne (modifications, nombre de groupes fusionnés).
+    """
+    records = []
+    groups_count = 0
+    for category_key, category in data["categories"].items():
+        if categories and category_key not in categories:
+            continue
+        groups = {}
+        for source in category["sources"]:
+            final_url, kind = resolved.get(source["url"], (None, "error"))
+            key = normalize_url(final_url if kind in ("permanent", "direct") else source["url"])
+            groups.setdefault(key, []).append((source, canonical_url(source["url"], final_url, kind)))
+        for members in groups.values():
+            keeper, canonical = next(
+                ((source, canonical) for source, canonical in members if source["url"] == canonical),
+                members[0],
+            )
+            # Le journal désigne les sources par URL exacte : une copie à l'identique
+            # de la source gardée ne peut pas être retirée seule, elle reste
+            others = [source for source, _ in members if source["url"] != keeper["url"]]
+            if not others and canonical == keeper["url"]:
+                continue
+            groups_count += 1
+            aliases = list(keeper.get("aliases", ()))
+            for source, _ in members:
+                for url in (source["url"], *source.get("aliases", ())):
+                    if url != canonical and url not in aliases:
+                        aliases.append(url)
+            records.append({
+                "op": "update", "url": keeper["url"], "category": category_key,
+                "fields": {"url": canonical, "aliases": aliases},
+            })
+            records.extend({"op": "remove", "url": source["url"], "category": category_key} for source in others)
+    return records, groups_count
+
+def summarize(resolved):
+    """Compteurs par nature de résolution, et redirections par hôte d'origine"""
+    kinds = {}
+    hosts = {}
+    for url, (_, kind) in resolved.items():
+        kinds[kind] = kinds.get(kind, 0) + 1
+        if kind in ("permanent", "temporary"):
+            host = urlsplit(url).hostname or ''
+            hosts[host] = hosts.get(host, 0) + 1
+    return kinds, sorted(hosts.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,146 @@
+"""
+Planification adaptative du rafraîchissement des flux.
+
+Chaque flux a son propre intervalle, déduit du rythme de publication observé
+dans les dates de ses articles : un blog de cuisine quotidien n'est plus
+interrogé aussi souvent qu'un fil d'actualité. Les échéances sont gardées
+dans un tas (file de priorité) : à chaque tick, seuls les flux arrivés à
+échéance sont téléchargés. L'état est persisté entre deux redémarrages.
+"""
+
+import heapq
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from catalog_core import atomic_write
+
+DEFAULT_MIN_INTERVAL = 5 * 60
+DEFAULT_MAX_INTERVAL = 3 * 60 * 60
+SMOOTHING = 0.3          # poids d'une nouvelle observation dans la moyenne mobile
+POLLS_PER_ITEM = 2       # on interroge deux fois par intervalle moyen entre articles
+IDLE_BACKOFF = 1.25      # rien de neuf : l'intervalle s'allonge
+RECENT_ITEMS = 20        # nombre d'articles récents utilisés pour estimer le rythme
+JITTER = 0.1             # ±10 % pour ne pas synchroniser les flux entre eux
+
+def publication_gap(dates):
+    """Écart moyen (s) entre les articles les plus récents ; None si indéterminable"""
+    timestamps = sorted(
+        (datetime.fromisoformat(date).timestamp() for date in dates), reverse=True
+    )[:RECENT_ITEMS]
+    if len(timestamps) < 2 or timestamps[0] == timestamps[-1]:
+        return None
+    return (timestamps[0] - timestamps[-1]) / (len(timestamps) - 1)
+
+class FeedScheduler:
+    """Intervalles par flux et file de priorité des prochaines échéances"""
+
+    def __init__(self, state_file=None, min_interval=DEFAULT_MIN_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL):
+        self.state_file = Path(state_file) if state_file else None
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._feeds = {}
+        self._heap = []
+        self._lock = threading.Lock()
+        if self.state_file and self.state_file.exists():
+            self.load()
+
+    def _clamp(self, interval):
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def _push(self, url, next_due):
+        # Les anciennes entrées du tas restent en place et sont ignorées
+        # au dépilement si leur échéance ne correspond plus (suppression paresseuse)
+        self._feeds[url]["next_due"] = next_due
+        heapq.heappush(self._heap, (next_due, url))
+
+    def is_fresh(self, url, now=None):
+        """True si le flux est suivi et pas encore arrivé à échéance"""
+        feed = self._feeds.get(url)
+        return feed is not None and feed["next_due"] > (now or time.time())
+
+    def observe(self, url, dates=(), error=False, now=None):
+        """
+        Met à jour l'intervalle d'un flux après un téléchargement et replanifie.
+        `dates` sont les dates de publication ISO 8601 des articles obtenus,
+        sans celles des articles non datés (une heure d'observation ferait
+        croire à un article neuf à chaque téléchargement) : un flux sans
+        aucune date est traité comme un flux sans nouveauté.
+        """
+        now = now or time.time()
+        with self._lock:
+            feed = self._feeds.setdefault(url, {
+                "interval": self.min_interval, "gap": None, "newest": None, "failures": 0,
+            })
+            if error:
+                # Repli exponentiel, borné par l'intervalle maximal
+                feed["failures"] += 1
+                feed["interval"] = self._clamp(self.min_interval * 2 ** feed["failures"])
+            else:
+                feed["failures"] = 0
+                newest = max(dates) if dates else None
+                gap = publication_gap(dates) if dates else None
+                if gap is not None:
+                    feed["gap"] = gap if feed["gap"] is None else (
+                        SMOOTHING * gap + (1 - SMOOTHING) * feed["gap"]
+                    )
+                if newest is None or newest == feed["newest"]:
+                    feed["interval"] = self._clamp(feed["interval"] * IDLE_BACKOFF)
+                elif feed["gap"] is not None:
+                    feed["interval"] = self._clamp(feed["gap"] / POLLS_PER_ITEM)
+                feed["newest"] = newest or feed["newest"]
+            jitter = 1 + random.uniform(-JITTER, JITTER)
+            self._push(url, now + feed["interval"] * jitter)
+
+    def forget(self, url):
+        """Ne suit plus un flux (son entrée du tas est ignorée au dépilement)"""
+        with self._lock:
+            self._feeds.pop(url, None)
+
+    def due(self, now=None, limit=None):
+        """Dépile les flux arrivés à échéance (au plus `limit`)"""
+        now = now or time.time()
+        urls = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and (limit is None or len(urls) < limit):
+                next_due, url = heapq.heappop(self._heap)
+                feed = self._feeds.get(url)
+                if feed is None or feed["next_due"] != next_due:
+                    continue  # entrée périmée
+                # Repoussé d'un intervalle minimal en attendant observe()
+                self._push(url, now + self.min_interval)
+                urls.append(url)
+        return urls
+
+    def stats(self):
+        """Nombre de flux suivis et intervalle médian"""
+        with self._lock:
+            intervals = sorted(feed["interval"] for feed in self._feeds.values())
+            failing = sum(1 for feed in self._feeds.values() if feed["failures"])
+        return {
+            "feeds": len(intervals),
+            "median_interval": intervals[len(intervals) // 2] if intervals else None,
+            "failing": failing,
+        }
+
+    def save(self):
+        """Persiste l'état (écriture atomique)"""
+        if not self.state_file:
+            return
+        with self._lock:
+            state = {"version": 1, "feeds": self._feeds}
+            with atomic_write(self.state_file) as f:
+                json.dump(state, f, ensure_ascii=False)
+
+    def load(self):
+        """Recharge l'état et reconstruit la file de priorité"""
+        with open(self.state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        with self._lock:
+            self._feeds = state.get("feeds", {})
+            self._heap = [(feed["next_due"], url) for url, feed in self._feeds.items()]
+            heapq.heapify(self._heap)
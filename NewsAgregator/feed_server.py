@@ -0,0 +1,697 @@
+"""
+Service d'agrégation des flux, pour remplacer les proxys CORS publics.
+
+Chaque flux est téléchargé au plus une fois par intervalle, quel que soit
+le nombre de clients, analysé côté serveur, puis servi en JSON sous la forme
+des articles de parseArticle(). Les connexions HTTP amont sont gardées
+ouvertes (keep-alive) et réutilisées hôte par hôte. Avec un planificateur
+(feed_scheduler), l'intervalle est propre à chaque flux et les flux déjà
+demandés sont rafraîchis en tâche de fond, à leur échéance. Avec un index
+(article_index), les nouveaux articles de chaque téléchargement sont indexés
+pour la recherche plein texte ; avec image_resolver, leurs images sont
+vérifiées une fois côté serveur. Avec feed_metrics, chaque téléchargement
+et chaque analyse sont mesurés (GET /metrics, GET /api/metrics). Avec
+feed_redirects, une redirection n'est suivie qu'une fois : les sources sont
+ensuite téléchargées à leur URL finale, et celles qui aboutissent au même
+flux partagent une seule entrée. Les articles peuvent aussi être servis
+au format compact d'article_wire (table de chaînes, dates en secondes), en
+document JSON ou en flux NDJSON / MessagePack envoyé catégorie par
+catégorie.
+"""
+
+import gzip
+import http.client
+import ipaddress
+import json
+import socket
+import ssl
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urljoin, urlsplit
+from xml.etree.ElementTree import ParseError
+
+from article_dedup import article_signature, deduplicate_articles
+from article_wire import CONTENT_TYPES, FORMATS, encode_compact, iter_stream, require_msgpack
+from feed_checker import ACCEPT, REDIRECT_STATUSES, USER_AGENT, request_target
+from feed_parser import parse_feed
+from feed_redirects import chain_kind
+
+RECENT_DAYS = 7  # même fenêtre que isArticleRecent()
+MAX_FEED_BYTES = 20 * 1024 * 1024
+MAX_CLIENT_FEEDS = 1000  # flux hors catalogue (demandés par les clients) gardés en mémoire
+
+class FetchError(Exception):
+    """Échec de téléchargement d'un flux, avec une cause courte (http_404, redirects, ...)"""
+
+    def __init__(self, message, cause="fetch"):
+        super().__init__(message)
+        self.cause = cause
+
+def failure_cause(exc):
+    """Cause courte d'un échec de rafraîchissement, pour les compteurs de feed_metrics"""
+    if isinstance(exc, FetchError):
+        return exc.cause
+    if isinstance(exc, ParseError):
+        return "xml"
+    if isinstance(exc, UnicodeError):
+        return "url"
+    if isinstance(exc, (zlib.error, EOFError)):
+        return "decode"
+    if isinstance(exc, http.client.HTTPException):
+        return "http_protocol"
+    if isinstance(exc, TimeoutError):
+        return "timeout"
+    if isinstance(exc, socket.gaierror):
+        return "dns"
+    if isinstance(exc, ssl.SSLError):
+        return "ssl"
+    if isinstance(exc, ValueError):
+        return "invalid"
+    return "connection"
+
+class ConnectionPool:
+    """Connexions HTTP/1.1 persistantes, réutilisées par (schéma, hôte, port)"""
+
+    def __init__(self, max_idle_per_host=4, timeout=10.0):
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self._idle = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _acquire(self, key):
+        with self._lock:
+            if self._idle[key]:
+                return self._idle[key].pop(), True
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(host, port, timeout=self.timeout), False
+
+    def _release(self, key, connection):
+        with self._lock:
+            if len(self._idle[key]) < self.max_idle_per_host:
+                self._idle[key].append(connection)
+                return
+        connection.close()
+
+    def request(self, url, headers=None, timings=None):
+        """
+        GET sur `url` ; retourne (statut, en-têtes, corps). `timings` (dict),
+        s'il est fourni, cumule les durées de connexion, d'attente du premier
+        octet et de lecture, ainsi que les octets reçus.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise FetchError(f"URL non supportée : {url}", "url")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        target = request_target(parts)
+        headers = {
+            "User-Agent": USER_AGENT,
+            "Accept": ACCEPT,
+            "Accept-Encoding": "gzip, deflate",
+            **(headers or {}),
+        }
+
+        # Une connexion réutilisée peut avoir été fermée par le serveur :
+        # dans ce cas seulement, on réessaie une fois sur une connexion neuve
+        for attempt in range(2):
+            connection, reused = self._acquire(key)
+            try:
+                start = time.perf_counter()
+                if connection.sock is None:
+                    connection.connect()  # explicite, pour mesurer DNS + TCP + TLS à part
+                connected = time.perf_counter()
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+                first_byte = time.perf_counter()
+                body = response.read(MAX_FEED_BYTES + 1)
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            if timings is not None:
+                for name, value in (("connect_seconds", connected - start),
+                                    ("ttfb_seconds", first_byte - connected),
+                                    ("download_seconds", time.perf_counter() - first_byte),
+                                    ("download_bytes", len(body))):
+                    timings[name] = timings.get(name, 0) + value
+            if len(body) > MAX_FEED_BYTES:
+                connection.close()
+                raise FetchError(f"flux trop volumineux : {url}", "too_large")
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(key, connection)
+            return response.status, {k.lower(): v for k, v in response.getheaders()}, body
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+def stamp_undated(articles, previous=()):
+    """
+    Date les articles sans date de publication (date None de parse_feed) par
+    leur première observation, gardée d'un téléchargement à l'autre depuis
+    les articles précédents du flux : `seenAt` la porte et marque la date
+    comme estimée, `date` la reprend pour le tri et la fenêtre de 7 jours.
+    """
+    seen = {article["link"]: article["seenAt"] for article in previous if "seenAt" in article}
+    now = None
+    for article in articles:
+        if article["date"] is None:
+            if article["link"] not in seen:
+                now = now or datetime.now(timezone.utc).isoformat()
+            article["date"] = article["seenAt"] = seen.get(article["link"]) or now
+    return articles
+
+def decode_body(headers, body):
+    """Décompresse un corps gzip/deflate, sans dépasser MAX_FEED_BYTES une fois décompressé"""
+    encoding = headers.get("content-encoding", "").lower()
+    if encoding not in ("gzip", "deflate"):
+        return body
+    # 32 + MAX_WBITS : en-tête gzip ou zlib détecté automatiquement
+    decompressor = zlib.decompressobj(wbits=32 + zlib.MAX_WBITS)
+    data = decompressor.decompress(body, MAX_FEED_BYTES + 1)
+    if len(data) > MAX_FEED_BYTES:
+        raise FetchError("flux trop volumineux une fois décompressé", "too_large")
+    if not decompressor.eof:
+        raise EOFError("flux compressé tronqué")
+    return data
+
+def is_public_host(host):
+    """Refuse les hôtes qui résolvent vers le réseau local (pas de SSRF)"""
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except socket.gaierror:
+        return True  # l'erreur DNS sera remontée par le téléchargement
+    return all(ipaddress.ip_address(info[4][0]).is_global for info in infos)
+
+class FeedAggregator:
+    """Cache partagé des flux analysés, rafraîchi au plus une fois par intervalle"""
+
+    def __init__(self, catalog, interval=900, workers=16, allow_private=False, pool=None, cache=None,
+                 scheduler=None, index=None, images=None, metrics=None, redirects=None,
+                 max_client_feeds=MAX_CLIENT_FEEDS):
+        self.catalog = catalog
+        self.redirects = redirects
+        self.cache = cache
+        self.scheduler = scheduler
+        self.index = index
+        self.images = images
+        self.metrics = metrics
+        # URL → (nom, catégorie), pour indexer les flux rafraîchis en tâche de fond
+        self._sources = {
+            source["url"].strip(): (source["name"], category_key)
+            for category_key, category in catalog["categories"].items()
+            for source in category["sources"]
+        }
+        self._catalog_urls = set(self._sources)
+        # Flux hors catalogue (/api/feed, POST /api/articles), du moins au plus
+        # récemment demandé : au-delà de max_client_feeds, les plus anciens
+        # sont oubliés (entrée, source, planificateur)
+        self._client_feeds = OrderedDict()
+        self.max_client_feeds = max_client_feeds
+        # Avec un planificateur, l'intervalle fixe n'est plus que le minimum
+        self.interval = scheduler.min_interval if scheduler is not None else interval
+        self.allow_private = allow_private
+        self.pool = pool or ConnectionPool()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self._entries = {}
+        self._locks = defaultdict(threading.Lock)
+        self._locks_guard = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher = None
+
+    def _lock_for(self, url):
+        with self._locks_guard:
+            return self._locks[url]
+
+    def fetch(self, url, max_redirects=5, timings=None):
+        """
+        Télécharge un flux en suivant les redirections. Avec un cache, la
+        requête est conditionnelle (ETag / Last-Modified).
+        Retourne (corps décodé, True si le serveur a répondu 304).
+        """
+        current = url
+        hops = []
+        conditional = self.cache is not None
+        for _ in range(max_redirects + 2):
+            if not self.allow_private and not is_public_host(urlsplit(current).hostname or ''):
+                raise FetchError(f"hôte non public refusé : {current}", "private_host")
+            validators = self.cache.validators(current) if conditional else {}
+            status, headers, body = self.pool.request(current, validators, timings)
+            if status in REDIRECT_STATUSES and headers.get("location"):
+                current = urljoin(current, headers["location"])
+                hops.append((status, current))
+                continue
+            if status == 304 and validators:
+                cached = self.cache.not_modified(current, headers)
+                if cached is not None:
+                    if hops and self.redirects is not None:
+                        self.redirects.store(url, current, chain_kind(hops))
+                    return cached, True
+                # Corps évincé entre-temps : on redemande sans validateur
+                conditional = False
+                continue
+            if status != 200:
+                raise FetchError(f"HTTP {status}", f"http_{status}")
+            if hops and self.redirects is not None:
+                self.redirects.store(url, current, chain_kind(hops))
+            body = decode_body(headers, body)
+            if self.cache is not None:
+                self.cache.store(current, headers, body)
+            return body, False
+        raise FetchError(f"plus de {max_redirects} redirections", "redirects")
+
+    def _is_fresh(self, url, entry):
+        if entry is None:
+            return False
+        if self.scheduler is not None:
+            return self.scheduler.is_fresh(url)
+        return time.monotonic() - entry["fetched_at"] < self.interval
+
+    def _final(self, url):
+        """URL à télécharger : la cible connue des redirections de `url`"""
+        return self.redirects.final(url) if self.redirects is not None else url
+
+    def _entry(self, source):
+        """
+        Entrée en cache d'une source, rafraîchie si elle est arrivée à échéance.
+
+        Un verrou par URL garantit qu'un seul téléchargement a lieu même si
+        plusieurs clients demandent le même flux au même moment.
+        """
+        requested = source["url"].strip()
+        url = self._final(requested)
+        if requested not in self._catalog_urls:
+            self._track_client_feed(url)
+        entry = self._entries.get(url)
+        if self._is_fresh(url, entry):
+            return entry
+        self._sources.setdefault(url, (source["name"], source.get("category") or 'general'))
+
+        with self._lock_for(url):
+            entry = self._entries.get(url)
+            if self._is_fresh(url, entry):
+                return entry
+            return self._refresh(url, entry)
+
+    def _safe_entry(self, source):
+        """Comme _entry, mais l'échec imprévu d'un flux n'interrompt pas les autres"""
+        try:
+            return self._entry(source)
+        except Exception as exc:
+            print(f"⚠️ Flux {source['url']} : {exc!r}")
+            return {"fetched_at": time.monotonic(), "articles": [], "signatures": [],
+                    "error": str(exc) or exc.__class__.__name__}
+
+    def _track_client_feed(self, url):
+        """Marque un flux hors catalogue comme demandé ; oublie les plus anciens au-delà de la limite"""
+        if url in self._catalog_urls:
+            return
+        with self._locks_guard:
+            self._client_feeds[url] = None
+            self._client_feeds.move_to_end(url)
+            evicted = []
+            while len(self._client_feeds) > self.max_client_feeds:
+                evicted.append(self._client_feeds.popitem(last=False)[0])
+        for old in evicted:
+            self._forget(old)
+
+    def _forget(self, url):
+        # Sous le verrou de l'URL : un rafraîchissement en cours se termine d'abord
+        with self._lock_for(url):
+            self._entries.pop(url, None)
+            self._sources.pop(url, None)
+            if self.scheduler is not None:
+                self.scheduler.forget(url)
+        with self._locks_guard:
+            self._locks.pop(url, None)
+
+    def feed_articles(self, source):
+        """Articles d'une source, depuis le cache s'il n'est pas arrivé à échéance"""
+        return self._tag(self._safe_entry(source)["articles"], source)
+
+    def _refresh(self, url, entry):
+        """Télécharge et analyse un flux (verrou de l'URL tenu), puis le replanifie"""
+        timings = {} if self.metrics is not None else None
+        try:
+            body, not_modified = self.fetch(url, timings=timings)
+            final = self._final(url)
+            if final != url:
+                # Redirection découverte : l'entrée passe à l'URL finale,
+                # partagée par toutes les sources qui y aboutissent
+                self._entries.pop(url, None)
+                if self.scheduler is not None:
+                    self.scheduler.forget(url)
+                self._sources.setdefault(final, self._sources.get(url, (url, None)))
+                if url in self._client_feeds:
+                    # Flux hors catalogue : suivi sous son URL finale (la limite
+                    # s'applique à la demande suivante, sans autre verrou ici)
+                    with self._locks_guard:
+                        self._client_feeds.pop(url, None)
+                        if final not in self._catalog_urls:
+                            self._client_feeds[final] = None
+                    self._sources.pop(url, None)
+                url = final
+            if not_modified and entry and entry["error"] is None:
+                # 304 : les articles déjà analysés restent valables
+                articles, signatures = entry["articles"], entry["signatures"]
+            else:
+                start = time.perf_counter()
+                if self.images is not None:
+                    articles = self.images.parse(body, {"name": url})
+                else:
+                    articles = parse_feed(body, {"name": url})
+                if timings is not None:
+                    timings["parse_seconds"] = time.perf_counter() - start
+                    timings["items"] = len(articles)
+                stamp_undated(articles, entry["articles"] if entry else ())
+                # Signatures de quasi-doublons calculées une fois par téléchargement
+                signatures = [article_signature(article) for article in articles]
+                if self.index is not None:
+                    self.index.add_articles(url, articles, *self._sources.get(url, (url, None)))
+            error = None
+        except (FetchError, ParseError, OSError, EOFError, ValueError, http.client.HTTPException,
+                zlib.error) as exc:
+            # Un flux en erreur n'est pas réessayé avant l'intervalle suivant
+            articles, signatures, error = [], [], str(exc) or exc.__class__.__name__
+            if self.metrics is not None:
+                self.metrics.failure(url, urlsplit(url).hostname or '', failure_cause(exc))
+        if self.metrics is not None and error is None:
+            host = urlsplit(url).hostname or ''
+            self.metrics.observe(url, host, **timings)
+            if timings.get("items") == 0:
+                self.metrics.failure(url, host, "empty")
+        entry = {"fetched_at": time.monotonic(), "articles": articles, "signatures": signatures, "error": error}
+        self._entries[url] = entry
+        if self.scheduler is not None:
+            # Dates de publication seulement : pas les premières observations (seenAt)
+            dates = [article["date"] for article in articles if "seenAt" not in article]
+            self.scheduler.observe(url, dates, error=error is not None)
+        return entry
+
+    def _refresh_url(self, url):
+        with self._lock_for(url):
+            # Flux hors catalogue oublié entre-temps : il n'est plus suivi
+            if url in self._sources:
+                self._refresh(url, self._entries.get(url))
+
+    def refresh_due(self, limit=None):
+        """Rafraîchit les flux arrivés à échéance ; retourne leur nombre"""
+        urls = self.scheduler.due(limit=limit)
+        for _ in self.executor.map(self._refresh_url, urls):
+            pass
+        return len(urls)
+
+    def start_refresher(self, tick=30):
+        """Tick de fond : seuls les flux à échéance sont téléchargés, l'état est sauvegardé"""
+        def run():
+            while not self._stop.wait(tick):
+                try:
+                    if self.refresh_due():
+                        self.scheduler.save()
+                except OSError as exc:
+                    print(f"⚠️ Rafraîchissement planifié : {exc}")
+
+        self._refresher = threading.Thread(target=run, name="feed-refresher", daemon=True)
+        self._refresher.start()
+
+    @staticmethod
+    def _tag(articles, source):
+        # Le cache est partagé entre catégories : la source et la catégorie
+        # demandées sont appliquées à la sortie
+        category = source.get("category") or 'general'
+        return [{**article, "source": source["name"], "category": category} for article in articles]
+
+    def merged_articles(self, sources, recent_days=RECENT_DAYS, limit=None, dedup=True):
+        """
+        Articles récents de plusieurs sources, triés du plus récent au plus
+        ancien. Avec `dedup`, une même dépêche reprise par plusieurs flux
+        n'apparaît qu'une fois, avec la liste `alsoCoveredBy` des autres.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=recent_days)).isoformat()
+        articles, signatures = [], []
+        for source, entry in zip(sources, self.executor.map(self._safe_entry, sources)):
+            for article, bins in zip(self._tag(entry["articles"], source), entry["signatures"]):
+                if article["date"] >= cutoff:
+                    articles.append(article)
+                    signatures.append(bins)
+        order = sorted(range(len(articles)), key=lambda position: articles[position]["date"], reverse=True)
+        articles = [articles[position] for position in order]
+        if dedup:
+            articles = deduplicate_articles(articles, signatures=[signatures[position] for position in order])
+        return articles[:limit] if limit else articles
+
+    def category_sources(self, category_key):
+        """Sources d'une catégorie du catalogue, au format des sources du client"""
+        category = self.catalog["categories"].get(category_key)
+        if category is None:
+            return None
+        return [
+            {"name": source["name"], "url": source["url"], "category": category_key}
+            for source in category["sources"]
+        ]
+
+    def stats(self):
+        """État du service : flux en mémoire et compteurs du cache disque"""
+        return {
+            "feeds": len(self._entries),
+            "client_feeds": len(self._client_feeds),
+            "feeds_in_error": sum(1 for entry in self._entries.values() if entry["error"]),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "scheduler": self.scheduler.stats() if self.scheduler is not None else None,
+            "index": self.index.stats() if self.index is not None else None,
+            "images": self.images.stats() if self.images is not None else None,
+            "metrics": self.metrics.totals() if self.metrics is not None else None,
+            "redirects": self.redirects.stats() if self.redirects is not None else None,
+        }
+
+    def search(self, query, limit=20, category=None):
+        """Recherche plein texte dans les articles récents indexés"""
+        if self.index is None:
+            return None
+        return self.index.search(query, limit, category)
+
+    def close(self):
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+        if self.scheduler is not None:
+            self.scheduler.save()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.pool.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.index is not None:
+            self.index.close()
+        if self.images is not None:
+            self.images.close()
+        if self.redirects is not None:
+            self.redirects.close()
+
+class AggregatorHandler(BaseHTTPRequestHandler):
+    """
+    GET  /api/categories                 catégories du catalogue et leurs effectifs
+    GET  /api/articles?category=KEY[&dedup=0]  articles récents fusionnés d'une catégorie
+    GET  /api/feed?url=URL[&name=&category=]  articles d'un flux
+    GET  /api/search?q=TEXTE[&category=KEY&limit=]  recherche plein texte (BM25)
+    GET  /api/stream?categories=A,B[&dedup=0&limit=&format=msgpack]  flux NDJSON, catégorie par catégorie
+    GET  /api/stats                      état du service, du cache et du planificateur
+    GET  /api/metrics[?top=20]           résumé des mesures, hôtes et flux les plus lents
+    GET  /metrics                        mesures au format texte de Prometheus
+    POST /api/articles  {"sources": [{name, url, category}], "dedup": true}  sources du client
+
+    Les routes d'articles acceptent format=json (défaut), compact, ndjson ou
+    msgpack (paramètre, ou champ "format" du POST) : voir article_wire.
+    """
+
+    server_version = "NewsAgregator/1.0"
+    aggregator = None  # injecté par make_server()
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        compress = 'gzip' in self.headers.get('Accept-Encoding', '') and len(body) > 1024
+        if compress:
+            body = gzip.compress(body, compresslevel=5)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", f"public, max-age={min(self.aggregator.interval, 300)}")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def unsupported_format(self, fmt, streams_only=False):
+        """Répond par une erreur si le format demandé ne peut pas être servi"""
+        formats = ("ndjson", "msgpack") if streams_only else FORMATS
+        if fmt not in formats:
+            self.send_json(400, {"error": f"format inconnu, attendu : {', '.join(formats)}"})
+            return True
+        if fmt == "msgpack":
+            try:
+                require_msgpack()
+            except ImportError as exc:
+                self.send_json(406, {"error": str(exc)})
+                return True
+        return False
+
+    def send_articles(self, articles, fmt="json", group=None):
+        if fmt == "json":
+            return self.send_json(200, {"articles": articles})
+        if fmt == "compact":
+            return self.send_json(200, encode_compact(articles))
+        self.send_stream([(group, articles)], fmt)
+
+    def send_stream(self, groups, fmt):
+        """
+        Flux NDJSON / MessagePack sans Content-Length (fin du corps à la
+        fermeture), envoyé et vidé groupe par groupe ; en gzip, chaque groupe
+        se termine par un Z_SYNC_FLUSH pour être décompressable aussitôt.
+        """
+        compress = 'gzip' in self.headers.get('Accept-Encoding', '')
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[fmt])
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", f"public, max-age={min(self.aggregator.interval, 300)}")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        compressor = zlib.compressobj(5, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+        try:
+            for chunk in iter_stream(groups, fmt):
+                if compressor is not None:
+                    chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                self.wfile.write(chunk)
+                self.wfile.flush()
+            if compressor is not None:
+                self.wfile.write(compressor.flush())
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client parti avant la fin du flux
+
+    def send_text(self, status, text, content_type="text/plain; version=0.0.4; charset=utf-8"):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.end_headers()
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        limit = int(query["limit"]) if query.get("limit", "").isdigit() else None
+        fmt = query.get("format", "json")
+        if parts.path in ("/api/articles", "/api/search", "/api/feed") and self.unsupported_format(fmt):
+            return
+
+        if parts.path == "/api/categories":
+            categories = {
+                key: {"name": category["name"], "count": len(category["sources"])}
+                for key, category in self.aggregator.catalog["categories"].items()
+            }
+            return self.send_json(200, {"categories": categories})
+
+        if parts.path == "/api/stats":
+            return self.send_json(200, self.aggregator.stats())
+
+        if parts.path in ("/metrics", "/api/metrics"):
+            metrics = self.aggregator.metrics
+            if metrics is None:
+                return self.send_json(404, {"error": "mesures désactivées"})
+            if parts.path == "/metrics":
+                return self.send_text(200, metrics.prometheus())
+            top = int(query["top"]) if query.get("top", "").isdigit() else 20
+            return self.send_json(200, metrics.summary(top=min(top, 500)))
+
+        if parts.path == "/api/articles":
+            sources = self.aggregator.category_sources(query.get("category", ""))
+            if sources is None:
+                return self.send_json(404, {"error": "catégorie inconnue"})
+            articles = self.aggregator.merged_articles(sources, limit=limit, dedup=query.get("dedup") != "0")
+            return self.send_articles(articles, fmt, query["category"])
+
+        if parts.path == "/api/stream":
+            fmt = query.get("format", "ndjson")
+            if self.unsupported_format(fmt, streams_only=True):
+                return
+            keys = [key for key in query.get("categories", "").split(",") if key]
+            if not keys:
+                return self.send_json(400, {"error": "paramètre categories manquant"})
+            unknown = [key for key in keys if key not in self.aggregator.catalog["categories"]]
+            if unknown:
+                return self.send_json(404, {"error": f"catégories inconnues : {', '.join(unknown)}"})
+            dedup = query.get("dedup") != "0"
+            # Chaque catégorie n'est fusionnée qu'une fois la précédente envoyée
+            groups = [
+                (key, lambda key=key: self.aggregator.merged_articles(
+                    self.aggregator.category_sources(key), limit=limit, dedup=dedup))
+                for key in dict.fromkeys(keys)
+            ]
+            return self.send_stream(groups, fmt)
+
+        if parts.path == "/api/search":
+            if not query.get("q", "").strip():
+                return self.send_json(400, {"error": "paramètre q manquant"})
+            articles = self.aggregator.search(query["q"], min(limit or 20, 100), query.get("category"))
+            if articles is None:
+                return self.send_json(404, {"error": "index désactivé"})
+            return self.send_articles(articles, fmt, query.get("category"))
+
+        if parts.path == "/api/feed":
+            url = query.get("url", "")
+            if urlsplit(url).scheme not in ("http", "https"):
+                return self.send_json(400, {"error": "paramètre url invalide"})
+            source = {"name": query.get("name", url), "url": url, "category": query.get("category")}
+            return self.send_articles(self.aggregator.feed_articles(source), fmt, source["category"])
+
+        self.send_json(404, {"error": "route inconnue"})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/api/articles":
+            return self.send_json(404, {"error": "route inconnue"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(min(length, 1024 * 1024)))
+            sources = [
+                {"name": str(s["name"]), "url": str(s["url"]), "category": s.get("category")}
+                for s in payload["sources"]
+                if urlsplit(str(s["url"])).scheme in ("http", "https")
+            ]
+            dedup = bool(payload.get("dedup", True))
+            fmt = str(payload.get("format", "json"))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return self.send_json(400, {"error": "corps attendu : {\"sources\": [{name, url, category}]}"})
+        if self.unsupported_format(fmt):
+            return
+        self.send_articles(self.aggregator.merged_articles(sources, dedup=dedup), fmt)
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+def make_server(aggregator, host="127.0.0.1", port=8080):
+    """Crée le serveur HTTP multi-thread lié à un agrégateur"""
+    handler = type("BoundAggregatorHandler", (AggregatorHandler,), {"aggregator": aggregator})
+    return ThreadingHTTPServer((host, port), handler)
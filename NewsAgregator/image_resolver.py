@@ -0,0 +1,194 @@
+"""
+Validation côté serveur des images d'articles, à la place de la chaîne de
+reprises de handleImageError() (rechargement, puis proxy wsrv.nl) que chaque
+navigateur rejoue pour chaque image cassée.
+
+À chaque téléchargement d'un flux, l'image retenue pour chaque article
+(même ordre de candidats que parseArticle()) est vérifiée par un HEAD. Les
+HEAD d'un même flux partent en un lot, sur une boucle asyncio partagée par
+tous les flux : la concurrence est bornée globalement et par hôte, comme
+pour la vérification des flux (feed_checker). Une image morte, qui n'est
+pas une image ou qui est un pixel de suivi est mémorisée avec une durée de
+validité dans un cache SQLite ; le flux est alors réanalysé pour passer au
+candidat suivant. Chaque analyse coûte une seule requête au cache (IN (...)
+sur les images retenues), jamais une par candidat. L'article part avec un
+`imageUrl` déjà vérifié (après redirections) ou vide.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+from catalog_core import SCRIPT_DIR
+from feed_checker import CheckError, FeedChecker
+from feed_parser import parse_feed
+
+CACHE_FILE = SCRIPT_DIR / "image_cache.db"
+IMAGE_ACCEPT = "image/avif, image/webp, image/*;q=0.9, */*;q=0.5"
+MIN_IMAGE_BYTES = 200     # en dessous : pixel de suivi ou image vide
+MAX_ROUNDS = 3            # analyses successives d'un flux pour remplacer les images rejetées
+PURGE_EVERY = 3600        # secondes entre deux purges des entrées expirées
+
+HOUR = 3600
+DAY = 24 * HOUR
+# Durée de validité d'un verdict : une image valide est revérifiée chaque
+# jour, une erreur passagère est retentée au bout d'une heure
+TTL = {
+    "ok": DAY,
+    "pixel": 30 * DAY,
+    "not_image": 7 * DAY,
+    "dead": 7 * DAY,
+    "forbidden": DAY,
+    "unreachable": HOUR,
+}
+GENERIC_TYPES = {"", "application/octet-stream", "binary/octet-stream"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    url        TEXT PRIMARY KEY,
+    verdict    TEXT NOT NULL,
+    final_url  TEXT,            -- après redirections, pour un verdict "ok"
+    checked_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_expires_at ON images(expires_at);
+"""
+
+def classify(status, headers):
+    """Verdict d'une réponse à un HEAD sur une image"""
+    if status in (405, 501):
+        return "ok"          # HEAD non pris en charge : l'image n'est pas mise en cause
+    if status in (404, 410):
+        return "dead"
+    if status in (401, 403):
+        return "forbidden"   # souvent une protection contre le hotlinking
+    if status >= 500 or status == 429:
+        return "unreachable"
+    if status >= 400:
+        return "dead"
+    content_type = headers.get("content-type", "").split(';')[0].strip().lower()
+    if not content_type.startswith("image/") and content_type not in GENERIC_TYPES:
+        return "not_image"
+    length = headers.get("content-length", "")
+    if length.isdigit() and int(length) < MIN_IMAGE_BYTES:
+        return "pixel"
+    return "ok"
+
+class ImageResolver:
+    """Vérifie les images des articles et garde les verdicts en cache"""
+
+    def __init__(self, db_file=CACHE_FILE, concurrency=32, per_host=4, timeout=5.0, allow_host=None):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_file, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._last_purge = 0.0
+        self.checker = FeedChecker(
+            concurrency=concurrency, per_host=per_host, timeout=timeout, max_redirects=3,
+            method="HEAD", accept=IMAGE_ACCEPT, allow_host=allow_host,
+        )
+        # Une seule boucle pour tous les flux : les sémaphores par hôte
+        # valent pour l'ensemble des lots en cours
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="image-resolver", daemon=True)
+        self._thread.start()
+        self.counters = {"checked": 0, "cache_hits": 0, "rejected": 0, "reparsed": 0}
+
+    def _verdicts(self, urls):
+        """Verdicts encore valides en cache : URL → (verdict, URL finale)"""
+        now = time.time()
+        found = {}
+        urls = list(urls)
+        with self._lock:
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                for url, verdict, final_url in self._db.execute(
+                    f"SELECT url, verdict, final_url FROM images "
+                    f"WHERE expires_at > ? AND url IN ({','.join('?' * len(chunk))})",
+                    (now, *chunk),
+                ):
+                    found[url] = (verdict, final_url)
+        return found
+
+    async def _check_batch(self, urls):
+        async def check(url):
+            try:
+                status, headers, final_url = await self.checker.follow(url)
+            except CheckError as error:
+                return url, ("dead" if error.cause in ("dns", "hote", "url") else "unreachable"), None
+            verdict = classify(status, headers)
+            # Une redirection vers http:// n'est pas reprise (contenu mixte)
+            redirected = final_url != url and (final_url.startswith("https:") or url.startswith("http:"))
+            return url, verdict, final_url if verdict == "ok" and redirected else None
+
+        return await asyncio.gather(*(check(url) for url in urls))
+
+    def check(self, urls):
+        """
+        Vérifie les URLs sans verdict valide en cache (un lot de HEAD) ;
+        retourne URL → (verdict, URL finale) pour toutes les URLs.
+        """
+        urls = set(urls)
+        verdicts = self._verdicts(urls)
+        self.counters["cache_hits"] += len(verdicts)
+        unknown = urls - verdicts.keys()
+        if not unknown:
+            return verdicts
+        results = asyncio.run_coroutine_threadsafe(self._check_batch(sorted(unknown)), self._loop).result()
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO images(url, verdict, final_url, checked_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(url, verdict, final_url, now, now + TTL[verdict]) for url, verdict, final_url in results],
+            )
+            if time.monotonic() - self._last_purge > PURGE_EVERY:
+                self._db.execute("DELETE FROM images WHERE expires_at <= ?", (now,))
+                self._last_purge = time.monotonic()
+        self.counters["checked"] += len(results)
+        self.counters["rejected"] += sum(1 for _, verdict, _ in results if verdict != "ok")
+        verdicts.update((url, (verdict, final_url)) for url, verdict, final_url in results)
+        return verdicts
+
+    def parse(self, xml_bytes, source):
+        """
+        parse_feed() avec des images vérifiées : tant que des images sont
+        rejetées, le flux est réanalysé pour qu'elles cèdent la place au
+        candidat suivant (au plus MAX_ROUNDS analyses). Les verdicts d'une
+        analyse (cache compris) sont lus en un lot par check().
+        """
+        failed = set()
+        for round_number in range(MAX_ROUNDS):
+            if round_number:
+                self.counters["reparsed"] += 1
+            articles = parse_feed(xml_bytes, source, failed_images=failed)
+            verdicts = self.check(article["imageUrl"] for article in articles if article["imageUrl"])
+            rejected = {url for url, (verdict, _) in verdicts.items() if verdict != "ok"}
+            if not rejected:
+                break
+            failed |= rejected
+        resolved = []
+        for article in articles:
+            verdict, final_url = verdicts.get(article["imageUrl"], ("ok", None))
+            if verdict != "ok":
+                article = {**article, "imageUrl": ''}
+            elif final_url:
+                article = {**article, "imageUrl": final_url}
+            resolved.append(article)
+        return resolved
+
+    def stats(self):
+        """Compteurs de session et verdicts en cache"""
+        with self._lock:
+            verdicts = dict(self._db.execute(
+                "SELECT verdict, COUNT(*) FROM images WHERE expires_at > ? GROUP BY verdict", (time.time(),)
+            ).fetchall())
+        return {**self.counters, "verdicts": verdicts}
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        with self._lock:
+            self._db.close()
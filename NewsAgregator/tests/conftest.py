@@ -0,0 +1,6 @@
+"""Configuration des tests : les modules du projet sont importés par leur nom, comme dans le script"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
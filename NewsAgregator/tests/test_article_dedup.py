@@ -0,0 +1,55 @@
+"""Regroupement des articles quasi identiques (article_dedup)"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+from article_dedup import normalize_text
+
+# hash() est salé par processus : le regroupement tourne avec une graine fixe
+CLUSTER_SCRIPT = """
+import json, sys
+from article_dedup import cluster_articles, deduplicate_articles
+articles = json.load(sys.stdin)
+json.dump({"groups": cluster_articles(articles),
+           "kept": [article["link"] for article in deduplicate_articles(articles)]}, sys.stdout)
+"""
+
+def run_clustering(articles, seed="0"):
+    result = subprocess.run(
+        [sys.executable, "-c", CLUSTER_SCRIPT], input=json.dumps(articles), capture_output=True, text=True,
+        cwd=Path(__file__).resolve().parent.parent, env={**os.environ, "PYTHONHASHSEED": seed}, check=True,
+    )
+    return json.loads(result.stdout)
+
+def synthetic_articles():
+    rng = random.Random(42)
+    vocabulary = [''.join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+                  for _ in range(400)]
+    articles = []
+    for story in range(6):
+        words = rng.sample(vocabulary, 20)
+        articles.append({"title": ' '.join(words[:8]).capitalize(), "excerpt": ' '.join(words[8:]),
+                         "link": f"https://a.org/{story}", "source": "A", "imageUrl": ""})
+    # Reprises : casse, ponctuation et dernier mot de l'extrait changés
+    for story in (1, 4):
+        original = articles[story]
+        articles.append({"title": original["title"].upper() + " !",
+                         "excerpt": original["excerpt"].rsplit(' ', 1)[0] + " " + rng.choice(vocabulary),
+                         "link": f"https://b.org/{story}", "source": "B", "imageUrl": "https://b.org/i.jpg"})
+    return articles
+
+def test_normalize_text_folds_case_and_accents():
+    assert normalize_text("Élections : l'Été   CHAUD") == "elections l ete chaud"
+
+def test_near_duplicates_cluster_and_others_stay_apart():
+    articles = synthetic_articles()
+    for seed in ("0", "1"):
+        result = run_clustering(articles, seed)
+        assert sorted(result["groups"]) == [[0], [1, 6], [2], [3], [4, 7], [5]]
+        # Le représentant est le premier membre avec une image
+        assert result["kept"] == ["https://a.org/0", "https://b.org/1", "https://a.org/2", "https://a.org/3",
+                                  "https://b.org/4", "https://a.org/5"]
@@ -0,0 +1,25 @@
+"""Index plein texte des articles (article_index)"""
+
+from datetime import datetime, timezone
+
+import article_index
+from article_index import ArticleIndex
+
+def article(link, title):
+    return {"title": title, "link": link, "excerpt": "", "date": datetime.now(timezone.utc).isoformat()}
+
+def test_category_filter_applies_before_the_candidate_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(article_index, "MAX_CANDIDATES", 5)
+    index = ArticleIndex(tmp_path / "articles.db")
+    try:
+        # Les correspondances de la catégorie sont plus anciennes que les 5 dernières d'une autre
+        index.add_articles("https://c.org/rss", [article("https://c.org/1", "Recette de la tarte aux pommes"),
+                                                 article("https://c.org/2", "Tarte fine aux poires")],
+                           "Cuisine", "cuisine")
+        index.add_articles("https://t.org/rss", [article(f"https://t.org/{number}", f"Tarte numéro {number}")
+                                                 for number in range(10)], "Tech", "tech")
+        results = index.search("tarte", category="cuisine")
+        assert {result["link"] for result in results} == {"https://c.org/1", "https://c.org/2"}
+        assert len(index.search("tarte")) == 5
+    finally:
+        index.close()
@@ -0,0 +1,65 @@
+"""Instantanés d'articles récents (article_snapshots) et articles sans date"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from article_snapshots import update_snapshots
+from feed_parser import parse_feed
+from feed_server import stamp_undated
+
+CATALOG = {"categories": {"tech": {"name": "Tech", "sources": []}}}
+START = datetime(2026, 10, 18, 9, 30, tzinfo=timezone.utc)
+
+def article(link, date, **fields):
+    return {"title": link, "link": link, "excerpt": "", "date": date, "source": "S", "category": "tech",
+            "imageUrl": "", **fields}
+
+def snapshot(out_dir):
+    return json.loads((out_dir / "tech.json").read_text(encoding='utf-8'))["articles"]
+
+def test_undated_items_have_no_publication_date():
+    xml = b"""<rss><channel><item><title>Sans date</title><link>https://x.org/a</link></item>
+    <item><title>Date illisible</title><link>https://x.org/b</link><pubDate>hier</pubDate></item></channel></rss>"""
+    assert [item["date"] for item in parse_feed(xml, {"name": "X"})] == [None, None]
+
+def test_stamp_undated_keeps_first_seen_time():
+    first = stamp_undated([article("https://x.org/a", None)])
+    seen_at = first[0]["seenAt"]
+    assert first[0]["date"] == seen_at
+    again = stamp_undated([article("https://x.org/a", None), article("https://x.org/b", None),
+                           article("https://x.org/c", "2026-10-18T08:00:00+00:00")], first)
+    assert again[0]["date"] == again[0]["seenAt"] == seen_at
+    assert "seenAt" in again[1]
+    assert "seenAt" not in again[2]
+
+def test_undated_article_appears_once_across_runs(tmp_path):
+    for hours in range(5):
+        now = START + timedelta(hours=hours)
+        seen = (now - timedelta(minutes=1)).isoformat()
+        update_snapshots({"tech": [article("https://x.org/a", seen, seenAt=seen)]}, CATALOG, tmp_path, now)
+    articles = snapshot(tmp_path)
+    assert [item["link"] for item in articles] == ["https://x.org/a"]
+    assert articles[0]["date"] == (START - timedelta(minutes=1)).isoformat()
+
+def test_redated_article_moves_to_its_new_bucket(tmp_path):
+    update_snapshots({"tech": [article("https://x.org/a", "2026-10-18T07:10:00+00:00"),
+                               article("https://x.org/b", "2026-10-18T07:20:00+00:00")]}, CATALOG, tmp_path, START)
+    manifest, _ = update_snapshots({"tech": [article("https://x.org/a", "2026-10-18T09:05:00+00:00")]},
+                                   CATALOG, tmp_path, START + timedelta(minutes=20))
+    assert [(item["link"], item["date"][11:16]) for item in snapshot(tmp_path)] == [
+        ("https://x.org/a", "09:05"), ("https://x.org/b", "07:20")
+    ]
+    assert manifest["categories"]["tech"]["count"] == 2
+
+def test_unsafe_category_keys_stay_in_the_directory(tmp_path):
+    out_dir = tmp_path / "snapshots"
+    catalog = {"categories": {"../evasion": {"name": "Évasion"}, "manifest": {"name": "Manifeste"}}}
+    articles = [article("https://x.org/a", "2026-10-18T09:00:00+00:00")]
+    manifest, _ = update_snapshots({"../evasion": articles, "manifest": articles}, catalog, out_dir, START)
+    assert not list(tmp_path.glob("evasion*"))
+    assert not (out_dir / "buckets" / ".." / "evasion").exists()
+    assert set(manifest["categories"]) == {"../evasion", "manifest"}
+    for key, entry in manifest["categories"].items():
+        assert "/" not in entry["file"] and entry["file"] != "manifest.json"
+        assert json.loads((out_dir / entry["file"]).read_text(encoding='utf-8'))["key"] == key
+    assert json.loads((out_dir / "manifest.json").read_text(encoding='utf-8')) == manifest
@@ -0,0 +1,36 @@
+"""Format compact des articles (article_wire) : aller-retour NDJSON et MessagePack"""
+
+import pytest
+
+from article_wire import decode_compact, decode_msgpack, decode_ndjson, encode_compact, iter_stream
+
+def article(number, category, **fields):
+    return {"title": f"Titre {number} é", "link": f"https://x.org/{number}", "excerpt": "Extrait",
+            "date": f"2026-10-18T0{number}:00:00+00:00", "source": "Le Monde", "category": category,
+            "imageUrl": "", **fields}
+
+GROUPS = [
+    ("culture", [article(1, "culture"), article(2, "culture", imageUrl="https://x.org/i.jpg", alsoCoveredBy=[
+        {"source": "RFI", "title": "Reprise", "link": "https://rfi.fr/2"}])]),
+    ("tech", [article(3, "tech", score=1.5), {**article(4, "tech"), "date": None, "source": None}]),
+]
+EXPECTED = [(key, item) for key, articles in GROUPS for item in articles]
+
+def test_ndjson_round_trip():
+    chunks = list(iter_stream(GROUPS, "ndjson"))
+    # L'en-tête, puis un morceau par groupe
+    assert len(chunks) == 3
+    lines = b''.join(chunks).decode('utf-8').splitlines()
+    assert list(decode_ndjson(lines)) == EXPECTED
+
+def test_msgpack_round_trip():
+    pytest.importorskip("msgpack")
+    assert list(decode_msgpack(b''.join(iter_stream(GROUPS, "msgpack")))) == EXPECTED
+
+def test_lazy_groups_and_compact_document():
+    stream = b''.join(iter_stream([("culture", lambda: GROUPS[0][1])], "ndjson"))
+    assert [item for _, item in decode_ndjson(stream.decode('utf-8').splitlines())] == GROUPS[0][1]
+    articles = [item for _, item in EXPECTED]
+    document = encode_compact(articles)
+    assert document["strings"] == ["Le Monde", "culture", "RFI", "tech"]
+    assert decode_compact(document) == articles
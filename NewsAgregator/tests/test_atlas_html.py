@@ -0,0 +1,25 @@
+"""Pages HTML sauvegardées de l'Atlas (atlas_html)"""
+
+from pathlib import Path
+
+from atlas_html import iter_html_batches
+
+FIXTURE = Path(__file__).parent / "fixtures" / "flux_cuisine.html"
+
+def test_page_title_maps_to_existing_category():
+    data = {"categories": {"cuisine": {"name": "Cuisine", "description": "", "sources": []}}}
+    [(category_key, category_name, sources)] = iter_html_batches([FIXTURE], workers=1, data=data)
+    assert (category_key, category_name) == ("cuisine", "Cuisine")
+    assert sources == [
+        {"name": "Marmiton", "url": "https://www.marmiton.org/rss/recettes.xml"},
+        {"name": "Cuisine exemple", "url": "https://cuisine.exemple.fr/feed/"},
+    ]
+
+def test_page_title_matches_category_name():
+    data = {"categories": {"gastronomie": {"name": "Cuisine", "description": "", "sources": []}}}
+    [(category_key, _, _)] = iter_html_batches([FIXTURE], workers=1, data=data)
+    assert category_key == "gastronomie"
+
+def test_new_category_without_feed_prefix():
+    [(category_key, _, _)] = iter_html_batches([FIXTURE], workers=1)
+    assert category_key == "cuisine"
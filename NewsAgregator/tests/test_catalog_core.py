@@ -0,0 +1,43 @@
+"""Index des doublons et fusion de sources (catalog_core)"""
+
+from catalog_core import UrlIndex, merge_sources
+from catalog_model import Catalog
+
+def catalog():
+    return {"categories": {
+        "culture": {"name": "Culture", "description": "", "sources": [
+            {"name": "A", "url": "https://a.org/rss"},
+            {"name": "B", "url": "https://b.org/rss"},
+        ]},
+        "tech": {"name": "Tech", "description": "", "sources": [
+            {"name": "B (tech)", "url": "http://b.org/rss/"},
+        ]},
+    }}
+
+def test_rejected_source_is_not_recorded():
+    data = catalog()
+    url_index = UrlIndex.from_catalog(data)
+    assert url_index.cross_category_duplicates() == {"//b.org/rss": ["culture", "tech"]}
+    added = merge_sources(data, "sport", "Sport", [
+        {"name": "A (sport)", "url": "http://a.org/rss"},
+        {"name": "C", "url": "https://c.org/rss"},
+        {"name": "C bis", "url": "https://c.org/rss/"},
+    ], url_index)
+    assert added == 1
+    # Les refus ne sont pas des doublons du catalogue
+    assert url_index.categories_for("https://a.org/rss") == ["culture"]
+    assert url_index.categories_for("https://c.org/rss") == ["sport"]
+    assert url_index.cross_category_duplicates() == {"//b.org/rss": ["culture", "tech"]}
+
+def test_import_into_empty_catalog_reports_no_duplicates():
+    data = {"categories": {}}
+    url_index = UrlIndex.from_catalog(data)
+    merge_sources(data, "culture", "Culture", [{"name": "A", "url": "https://a.org/rss"}], url_index)
+    merge_sources(data, "tech", "Tech", [{"name": "A", "url": "http://a.org/rss"}], url_index)
+    assert url_index.cross_category_duplicates() == {}
+    assert url_index.duplicates() == {}
+
+def test_column_model_ignores_rejected_sources():
+    model = Catalog.from_json(catalog())
+    assert not model.add("sport", "Sport", {"name": "A (sport)", "url": "http://a.org/rss"})
+    assert model.cross_category_duplicates() == {"//b.org/rss": ["culture", "tech"]}
@@ -0,0 +1,84 @@
+"""Base SQLite parallèle au catalogue (catalog_db)"""
+
+import json
+import sqlite3
+
+import catalog_db
+
+def sample_catalog():
+    return {
+        "metadata": {"title": "Catalogue", "source": "tests", "description": "Essai"},
+        "categories": {
+            "culture": {
+                "name": "Culture",
+                "description": "Sources culture",
+                "sources": [
+                    {"name": "Le Monde culture", "url": "https://www.lemonde.fr/culture/rss_full.xml"},
+                    {"name": "Vérifiée", "url": "https://x.org/feed",
+                     "check": {"status": 200, "latency_ms": 12}, "aliases": ["http://x.org/feed"]},
+                    # Doublons dans la catégorie, comme dans le vrai catalogue
+                    {"name": "Copie", "url": "https://y.org/rss"},
+                    {"name": "Copie", "url": "https://y.org/rss"},
+                    {"name": "Variante", "url": "http://y.org/rss/"},
+                ],
+            },
+            "technologie": {
+                "name": "Technologie",
+                "description": "",
+                "sources": [
+                    # Même flux que dans culture
+                    {"name": "Le Monde (tech)", "url": "https://www.lemonde.fr/culture/rss_full.xml"},
+                    {"name": "Erreur", "url": "https://z.org/feed", "check": {"error": "timeout"}},
+                ],
+            },
+        },
+    }
+
+def test_sync_export_round_trip(tmp_path):
+    data = sample_catalog()
+    conn = catalog_db.connect(tmp_path / "catalog.db")
+    results = catalog_db.sync_from_catalog(conn, data)
+    assert results == [("Culture", 5, 5), ("Technologie", 2, 2)]
+    exported = catalog_db.export_catalog(conn)
+    assert exported == data
+    # Même texte JSON : ordre des clés et des sources conservé
+    assert json.dumps(exported, ensure_ascii=False) == json.dumps(data, ensure_ascii=False)
+
+def test_sync_replaces_previous_content(tmp_path):
+    conn = catalog_db.connect(tmp_path / "catalog.db")
+    catalog_db.sync_from_catalog(conn, sample_catalog())
+    data = sample_catalog()
+    del data["categories"]["technologie"]
+    data["categories"]["culture"]["sources"].append({"name": "Nouveau", "url": "https://n.org/rss"})
+    results = catalog_db.sync_from_catalog(conn, data)
+    assert results == [("Culture", 6, 1)]
+    assert catalog_db.export_catalog(conn) == data
+    assert catalog_db.search(conn, name="monde") == [{
+        "name": "Le Monde culture", "url": "https://www.lemonde.fr/culture/rss_full.xml",
+        "category": "culture", "host": "www.lemonde.fr",
+    }]
+
+def test_upsert_skips_urls_known_in_any_category(tmp_path):
+    conn = catalog_db.connect(tmp_path / "catalog.db")
+    catalog_db.sync_from_catalog(conn, sample_catalog())
+    results = catalog_db.upsert_batches(conn, [("sport", "Sport", [
+        {"name": "Déjà en culture", "url": "http://www.lemonde.fr/culture/rss_full.xml/"},
+        {"name": "Nouveau", "url": "https://sport.org/rss"},
+        {"name": "Nouveau bis", "url": "https://sport.org/rss"},
+    ])])
+    assert results == [("Sport", 3, 1)]
+    assert catalog_db.export_catalog(conn)["categories"]["sport"]["sources"] == [
+        {"name": "Nouveau bis", "url": "https://sport.org/rss"}
+    ]
+
+def test_old_schema_is_rebuilt(tmp_path):
+    db_file = tmp_path / "catalog.db"
+    old = sqlite3.connect(db_file)
+    old.executescript("""
+        CREATE TABLE sources (id INTEGER PRIMARY KEY, category_id INTEGER, host_id INTEGER,
+                              name TEXT, url TEXT, url_key TEXT NOT NULL UNIQUE);
+    """)
+    old.close()
+    conn = catalog_db.connect(db_file)
+    catalog_db.sync_from_catalog(conn, sample_catalog())
+    assert catalog_db.export_catalog(conn) == sample_catalog()
@@ -0,0 +1,88 @@
+"""Journal du catalogue : reprise après un arrêt brutal et écrivains concurrents"""
+
+import json
+import multiprocessing
+
+import catalog_journal
+from catalog_journal import CatalogJournal
+from extract_rss_from_pages import ingest_batch, load_catalog, save_catalog
+
+def make_catalog(tmp_path, *urls):
+    json_file = tmp_path / "catalogue.json"
+    save_catalog({
+        "metadata": {"title": "Essai"},
+        "categories": {"tech": {"name": "Tech", "description": "", "sources": [
+            {"name": url, "url": url} for url in urls
+        ]}},
+    }, json_file)
+    return json_file
+
+def urls(data, category_key="tech"):
+    return [source["url"] for source in data["categories"][category_key]["sources"]]
+
+def add(url, category_key="tech"):
+    return {"op": "add", "category": category_key, "name": category_key.capitalize(),
+            "source": {"name": url, "url": url}}
+
+def test_torn_last_line_is_ignored_then_truncated(tmp_path):
+    journal = CatalogJournal(make_catalog(tmp_path, "https://a.org/rss"))
+    journal.append([add("https://b.org/rss"), add("https://c.org/rss")])
+    # Écriture interrompue au milieu d'une ligne
+    with open(journal.path, 'ab') as f:
+        f.write(b'{"op": "add", "category": "tech", "na')
+    assert len(journal.records()) == 2
+    assert urls(journal.load()) == ["https://a.org/rss", "https://b.org/rss", "https://c.org/rss"]
+
+    journal.append([add("https://d.org/rss")])
+    lines = journal.path.read_bytes().split(b'\n')
+    assert lines[-1] == b''
+    assert [json.loads(line)["source"]["url"] for line in lines[:-1]] == [
+        "https://b.org/rss", "https://c.org/rss", "https://d.org/rss"
+    ]
+
+def test_crash_before_compaction_keeps_appended_records(tmp_path):
+    json_file = make_catalog(tmp_path, "https://a.org/rss")
+    CatalogJournal(json_file).append([add("https://b.org/rss")])
+    # Arrêt après l'ajout : l'instantané n'a pas bougé, le rejeu apporte la modification
+    assert urls(load_catalog(json_file)) == ["https://a.org/rss", "https://b.org/rss"]
+
+def test_crash_between_snapshot_and_truncation_is_harmless(tmp_path):
+    json_file = make_catalog(tmp_path, "https://a.org/rss", "https://b.org/rss")
+    journal = CatalogJournal(json_file)
+    journal.append([
+        add("https://c.org/rss"),
+        {"op": "remove", "url": "https://a.org/rss"},
+        {"op": "update", "url": "https://b.org/rss", "fields": {"check": {"status": 200}}},
+        add("https://a.org/rss", "culture"),
+    ])
+    expected = journal.load()
+    # Compactage interrompu : instantané réécrit, journal pas encore vidé
+    save_catalog(expected, json_file)
+    assert journal.size()
+    assert journal.load() == expected
+    journal.compact()
+    assert journal.size() == 0
+    assert json.loads(json_file.read_text(encoding='utf-8')) == expected
+
+def _writer(json_file, prefix, count):
+    for number in range(count):
+        url = f"https://{prefix}{number}.org/rss"
+        ingest_batch([("tech", "Tech", [{"name": url, "url": url}])], json_file)
+
+def test_concurrent_writers_lose_nothing(tmp_path, monkeypatch):
+    json_file = make_catalog(tmp_path, "https://a.org/rss")
+    # Compactages fréquents pendant que l'autre écrivain ajoute
+    monkeypatch.setattr(catalog_journal, "COMPACT_BYTES", 1024)
+    context = multiprocessing.get_context("fork")
+    writers = [context.Process(target=_writer, args=(json_file, prefix, 40)) for prefix in ("x", "y")]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(60)
+        assert writer.exitcode == 0
+    data = load_catalog(json_file)
+    assert sorted(urls(data)) == sorted(
+        ["https://a.org/rss"] + [f"https://{prefix}{number}.org/rss" for prefix in "xy" for number in range(40)]
+    )
+    for line in CatalogJournal(json_file).path.read_bytes().splitlines():
+        json.loads(line)
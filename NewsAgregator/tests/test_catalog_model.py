@@ -0,0 +1,44 @@
+"""Modèle compact du catalogue (catalog_model)"""
+
+from catalog_journal import CatalogJournal
+from catalog_model import Catalog
+from extract_rss_from_pages import load_catalog, save_catalog
+
+def make_catalog(tmp_path):
+    json_file = tmp_path / "catalogue.json"
+    save_catalog({
+        "metadata": {"title": "Essai", "version": 3},
+        "categories": {
+            "tech": {"name": "Tech", "description": "Numérique", "sources": [
+                {"name": "Été", "url": "https://www.exemple.fr/flux.xml"},
+                {"name": "Vérifié", "url": "https://b.org/rss", "check": {"status": 200}},
+            ]},
+            "culture": {"name": "Culture", "description": "", "sources": []},
+        },
+    }, json_file)
+    return json_file
+
+def test_round_trip_matches_load_catalog(tmp_path):
+    json_file = make_catalog(tmp_path)
+    original = json_file.read_bytes()
+    catalog = Catalog.load(json_file)
+    assert catalog.to_json() == load_catalog(json_file)
+    catalog.save(json_file)
+    assert json_file.read_bytes() == original
+    assert catalog.add("culture", "Culture", {"name": "C", "url": "https://c.org/rss"})
+    catalog.save(json_file)
+    assert load_catalog(json_file) == Catalog.load(json_file).to_json() == catalog.to_json()
+
+def test_save_folds_in_pending_journal(tmp_path):
+    json_file = make_catalog(tmp_path)
+    catalog = Catalog.load(json_file)
+    # Un autre écrivain passe par le journal après le chargement
+    journal = CatalogJournal(json_file)
+    journal.append([{"op": "add", "category": "tech", "name": "Tech",
+                     "source": {"name": "D", "url": "https://d.org/rss"}}])
+    catalog.add("culture", "Culture", {"name": "C", "url": "https://c.org/rss"})
+    catalog.save(json_file)
+    assert journal.size() == 0
+    data = load_catalog(json_file)
+    assert [source["url"] for source in data["categories"]["tech"]["sources"]][-1] == "https://d.org/rss"
+    assert [source["url"] for source in data["categories"]["culture"]["sources"]] == ["https://c.org/rss"]
@@ -0,0 +1,50 @@
+"""Import et export OPML du catalogue (catalog_opml)"""
+
+import io
+from pathlib import Path
+
+from catalog_opml import iter_opml, iter_opml_batches
+from extract_rss_from_pages import ingest_batch, load_catalog, save_catalog
+
+FIXTURE = Path(__file__).parent / "fixtures" / "nested.opml"
+
+def batches_by_category(batches):
+    categories = {}
+    for category_key, category_name, sources in batches:
+        categories.setdefault((category_key, category_name), []).extend(source["url"] for source in sources)
+    return categories
+
+def test_nested_outlines_map_to_innermost_named_folder():
+    assert batches_by_category(iter_opml_batches(FIXTURE)) == {
+        ("actualites", "Actualités"): ["https://journal.fr/rss", "https://anonyme.fr/rss", "https://apres.fr/rss"],
+        ("sport", "Sport"): ["https://stade.fr/feed"],
+        ("cuisine_vins", "Cuisine & vins"): ["https://recettes.fr/rss?a=1&b=2"],
+        ("opml", "Import OPML"): ["https://racine.org/rss"],
+    }
+
+def test_folders_join_existing_categories_by_key_or_name():
+    data = {"categories": {
+        "news": {"name": "Actualités", "description": "", "sources": []},
+        "sport": {"name": "Sports", "description": "", "sources": []},
+    }}
+    keys = {key for key, _ in batches_by_category(iter_opml_batches(FIXTURE, data))}
+    assert keys == {"news", "sport", "cuisine_vins", "opml"}
+
+def empty_catalog(path):
+    save_catalog({"metadata": {"title": "Essai"}, "categories": {}}, path)
+    return path
+
+def test_import_export_import_round_trip(tmp_path):
+    first = empty_catalog(tmp_path / "premier.json")
+    ingest_batch(iter_opml_batches(FIXTURE, load_catalog(first)), first)
+    imported = load_catalog(first)
+    assert imported["categories"]["sport"]["sources"] == [{"name": "Le Stade", "url": "https://stade.fr/feed"}]
+    assert imported["categories"]["cuisine_vins"]["sources"][0]["name"] == "Recettes <b>"
+
+    exported = ''.join(iter_opml(imported)).encode('utf-8')
+    second = empty_catalog(tmp_path / "second.json")
+    ingest_batch(iter_opml_batches(io.BytesIO(exported), load_catalog(second)), second)
+    assert load_catalog(second)["categories"] == imported["categories"]
+    # Réimport dans le même catalogue : rien de nouveau
+    results, _ = ingest_batch(iter_opml_batches(io.BytesIO(exported), imported), first)
+    assert sum(added for _, _, added in results) == 0
@@ -0,0 +1,80 @@
+"""Fragments par catégorie, manifeste et correctifs (catalog_shards)"""
+
+import copy
+import json
+
+from catalog_shards import MANIFEST_NAME, build_shards
+
+def catalog():
+    return {"metadata": {"title": "Essai"}, "categories": {
+        "culture": {"name": "Culture", "description": "", "sources": [
+            {"name": "A", "url": "https://a.org/rss"},
+            {"name": "B", "url": "https://b.org/rss"},
+        ]},
+        "tech": {"name": "Tech", "description": "", "sources": [{"name": "T", "url": "https://t.org/rss"}]},
+    }}
+
+def read(path):
+    return json.loads(path.read_bytes())
+
+def test_shards_are_content_addressed(tmp_path):
+    manifest, rewritten = build_shards(catalog(), tmp_path)
+    assert rewritten == ["culture", "tech"]
+    entry = manifest["categories"]["culture"]
+    assert entry["file"] == f"culture.{entry['sha256'][:16]}.json"
+    assert read(tmp_path / entry["file"])["sources"] == catalog()["categories"]["culture"]["sources"]
+    # Rien n'a changé : ni réécriture ni nouvelle version
+    again, rewritten = build_shards(catalog(), tmp_path)
+    assert rewritten == [] and again["version"] == 1
+
+def test_delta_and_old_shard_cleanup(tmp_path):
+    first, _ = build_shards(catalog(), tmp_path)
+    data = catalog()
+    data["categories"]["culture"]["sources"][1] = {"name": "B2", "url": "https://b.org/rss"}
+    data["categories"]["culture"]["sources"].append({"name": "C", "url": "https://c.org/rss"})
+    del data["categories"]["tech"]
+    manifest, rewritten = build_shards(data, tmp_path)
+    assert rewritten == ["culture"] and manifest["version"] == 2
+    delta = read(tmp_path / manifest["deltas"]["1"]["file"])
+    assert delta["removed_categories"] == ["tech"]
+    assert delta["categories"]["culture"]["added"] == [{"name": "C", "url": "https://c.org/rss"}]
+    assert delta["categories"]["culture"]["changed"] == [
+        {"url": "https://b.org/rss", "source": {"name": "B2", "url": "https://b.org/rss"}}
+    ]
+    # Anciens fragments supprimés après l'écriture du manifeste
+    for entry in first["categories"].values():
+        assert not (tmp_path / entry["file"]).exists()
+    assert (tmp_path / manifest["categories"]["culture"]["file"]).exists()
+
+def test_missing_old_shard_asks_for_reload(tmp_path):
+    first, _ = build_shards(catalog(), tmp_path)
+    (tmp_path / first["categories"]["culture"]["file"]).unlink()
+    data = catalog()
+    data["categories"]["culture"]["sources"].append({"name": "C", "url": "https://c.org/rss"})
+    manifest, _ = build_shards(data, tmp_path)
+    change = read(tmp_path / manifest["deltas"]["1"]["file"])["categories"]["culture"]
+    assert change == {"name": "Culture", "description": "", "count": 3, "reload": True}
+
+def test_category_named_manifest_keeps_the_manifest(tmp_path):
+    data = catalog()
+    data["categories"]["manifest"] = copy.deepcopy(data["categories"]["tech"])
+    data["categories"]["deltas"] = copy.deepcopy(data["categories"]["tech"])
+    build_shards(data, tmp_path)
+    data["categories"]["manifest"]["sources"].append({"name": "M", "url": "https://m.org/rss"})
+    manifest, _ = build_shards(data, tmp_path)
+    assert read(tmp_path / MANIFEST_NAME) == manifest
+    assert manifest["version"] == 2
+    assert read(tmp_path / manifest["categories"]["manifest"]["file"])["key"] == "manifest"
+    assert (tmp_path / manifest["deltas"]["1"]["file"]).exists()
+
+def test_unsafe_category_keys_stay_in_the_directory(tmp_path):
+    out_dir = tmp_path / "sources"
+    data = catalog()
+    data["categories"]["../evasion"] = copy.deepcopy(data["categories"]["tech"])
+    data["categories"]["a/b"] = copy.deepcopy(data["categories"]["tech"])
+    manifest, _ = build_shards(data, out_dir)
+    assert not list(tmp_path.glob("evasion*"))
+    for key in ("../evasion", "a/b"):
+        entry = manifest["categories"][key]
+        assert "/" not in entry["file"]
+        assert read(out_dir / entry["file"])["key"] == key
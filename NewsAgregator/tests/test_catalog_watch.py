@@ -0,0 +1,42 @@
+"""Surveillance des pages de flux (catalog_watch) : ajouts et retraits"""
+
+import json
+
+from catalog_journal import CatalogJournal
+from catalog_watch import CatalogWatcher
+from extract_rss_from_pages import load_catalog, save_catalog
+
+def write_page(path, *urls):
+    lines = ["# category: tech", "# name: Tech", ""]
+    for url in urls:
+        lines += [url.split("/")[2], url, ""]
+    path.write_text("\n".join(lines), encoding='utf-8')
+
+def urls(json_file):
+    return [source["url"] for source in load_catalog(json_file)["categories"]["tech"]["sources"]]
+
+def test_only_sources_added_by_the_watcher_are_removed(tmp_path):
+    json_file = tmp_path / "catalogue.json"
+    save_catalog({"metadata": {"title": "Essai"}, "categories": {"tech": {"name": "Tech", "description": "", "sources": [
+        {"name": "À la main", "url": "https://main.org/rss"},
+    ]}}}, json_file)
+    pages = tmp_path / "pages"
+    pages.mkdir()
+    page = pages / "tech.txt"
+    write_page(page, "https://main.org/rss", "https://dump.org/rss")
+
+    def watcher():
+        return CatalogWatcher([pages], json_file=json_file, state_file=tmp_path / "state.json")
+
+    report = watcher().sync()
+    assert report["added"] == 1
+    assert urls(json_file) == ["https://main.org/rss", "https://dump.org/rss"]
+    # Le JSON seul (lu par le navigateur) est à jour après le passage
+    assert CatalogJournal(json_file).size() == 0
+    assert len(json.loads(json_file.read_text(encoding='utf-8'))["categories"]["tech"]["sources"]) == 2
+    # Les deux sources disparaissent de la page : seule celle de la surveillance est retirée,
+    # y compris après un redémarrage
+    write_page(page)
+    report = watcher().sync()
+    assert report["removed"] == 1
+    assert urls(json_file) == ["https://main.org/rss"]
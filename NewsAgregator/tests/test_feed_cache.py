@@ -0,0 +1,71 @@
+"""Cache disque des flux (feed_cache) : requêtes conditionnelles et éviction"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from feed_cache import FeedCache
+from feed_server import FeedAggregator
+
+BODY = b"<rss><channel><item><title>A</title><link>https://x.org/a</link></item></channel></rss>"
+LAST_MODIFIED = "Sun, 18 Oct 2026 08:00:00 GMT"
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        validators = (self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since"))
+        self.requests.append((self.path, validators))
+        self.send_response(304 if validators in (('"v1"', None), (None, LAST_MODIFIED)) else 200)
+        if self.path == "/etag":
+            self.send_header("ETag", '"v1"')
+        else:
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", "0" if validators[0] or validators[1] else str(len(BODY)))
+        self.end_headers()
+        if not (validators[0] or validators[1]):
+            self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ConditionalHandler)
+    ConditionalHandler.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.parametrize("path, sent", [("/etag", ('"v1"', None)), ("/date", (None, LAST_MODIFIED))])
+def test_conditional_get_serves_304_from_disk(tmp_path, base_url, path, sent):
+    cache = FeedCache(tmp_path / "cache")
+    service = FeedAggregator({"categories": {}}, allow_private=True, cache=cache)
+    try:
+        assert service.fetch(base_url + path) == (BODY, False)
+        assert service.fetch(base_url + path) == (BODY, True)
+        stats = cache.stats()
+    finally:
+        service.close()
+    assert ConditionalHandler.requests == [(path, (None, None)), (path, sent)]
+    assert (stats["hits"], stats["misses"], stats["bytes_saved"]) == (1, 1, len(BODY))
+
+def test_least_recently_used_urls_are_evicted(tmp_path):
+    cache = FeedCache(tmp_path / "cache", max_bytes=250)
+    headers = {"etag": '"v1"'}
+    cache.store("https://a.org/rss", headers, b"a" * 100)
+    cache.store("https://b.org/rss", headers, b"b" * 100)
+    # Même contenu : un seul fichier, compté une fois
+    cache.store("https://b2.org/rss", headers, b"b" * 100)
+    assert cache.stats()["stored_bytes"] == 200
+    assert cache.not_modified("https://a.org/rss") == b"a" * 100  # a devient le plus récent
+    cache.store("https://c.org/rss", headers, b"c" * 100)
+    stats = cache.stats()
+    assert stats["stored_bytes"] <= 250 and stats["evictions"] == 2
+    assert cache.validators("https://b.org/rss") == {} and cache.validators("https://b2.org/rss") == {}
+    assert cache.not_modified("https://a.org/rss") == b"a" * 100
+    assert len([path for path in (tmp_path / "cache" / "blobs").rglob("*") if path.is_file()]) == 2
+    cache.close()
@@ -0,0 +1,57 @@
+"""Vérification des flux (feed_checker) face à un serveur asyncio local"""
+
+import asyncio
+
+from feed_checker import FeedChecker, check_sources
+
+async def serve(routes, requests):
+    """Serveur HTTP minimal : chemin → (statut, en-têtes) ; note chaque ligne de requête"""
+    async def handle(reader, writer):
+        head = await reader.readuntil(b'\r\n\r\n')
+        request_line = head.split(b'\r\n', 1)[0].decode('ascii')
+        requests.append(request_line)
+        status, headers = routes.get(request_line.split(' ')[1], (404, {}))
+        lines = [f"HTTP/1.1 {status} OK", "Content-Length: 0", *(f"{k}: {v}" for k, v in headers.items())]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('ascii'))
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+def run_checks(routes, urls_for):
+    requests = []
+
+    async def main():
+        server = await serve(routes, requests)
+        base = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        async with server:
+            sources = [{"name": url, "url": url} for url in urls_for(base)]
+            await check_sources(sources, FeedChecker(concurrency=4, timeout=5))
+        return base, sources
+
+    base, sources = asyncio.run(main())
+    return base, [source["check"] for source in sources], requests
+
+def test_non_ascii_path_is_percent_encoded():
+    routes = {"/actualit%C3%A9s/flux%20rss.xml?th%C3%A8me=%C3%A9t%C3%A9": (200, {"Content-Type": "application/rss+xml"})}
+    _, (result,), requests = run_checks(routes, lambda base: [f"{base}/actualités/flux rss.xml?thème=été"])
+    assert requests == ["GET /actualit%C3%A9s/flux%20rss.xml?th%C3%A8me=%C3%A9t%C3%A9 HTTP/1.1"]
+    assert result["status"] == 200
+    assert result["content_type"] == "application/rss+xml"
+
+def test_redirect_is_followed():
+    routes = {
+        "/ancien": (301, {"Location": "/nouveau"}),
+        "/nouveau": (200, {"Content-Type": "text/xml; charset=utf-8"}),
+    }
+    base, (result,), requests = run_checks(routes, lambda base: [f"{base}/ancien"])
+    assert result["status"] == 200
+    assert result["final_url"] == f"{base}/nouveau"
+    assert result["content_type"] == "text/xml"
+    assert [line.split(' ')[1] for line in requests] == ["/ancien", "/nouveau"]
+
+def test_invalid_url_is_reported():
+    _, results, _ = run_checks({}, lambda base: ["http://127.0.0.1:99999/rss", f"{base}/absent"])
+    assert results[0]["error"] == "url"
+    assert results[1]["status"] == 404
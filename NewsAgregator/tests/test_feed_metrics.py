@@ -0,0 +1,42 @@
+"""Mesures des rafraîchissements (feed_metrics) : quantiles et export Prometheus"""
+
+from feed_metrics import PREFIX, FeedMetrics, Histogram
+
+def test_histogram_quantile_interpolates_within_bucket():
+    histogram = Histogram((1, 2, 4))
+    assert histogram.quantile(0.5) == 0.0
+    for value in (0.5, 1.5, 1.5, 3):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.quantile(0.25) == 1.0
+    assert histogram.quantile(0.5) == 1.5
+    assert histogram.quantile(1.0) == 4.0
+    # Au-delà de la dernière borne : la borne elle-même
+    histogram.observe(100)
+    assert histogram.quantile(1.0) == 4
+    assert histogram.mean() == (0.5 + 1.5 + 1.5 + 3 + 100) / 5
+
+def test_prometheus_export():
+    metrics = FeedMetrics()
+    metrics.observe("https://a.org/rss", "a.org", ttfb_seconds=0.02, items=3)
+    metrics.observe("https://a.org/rss", "a.org", ttfb_seconds=0.3)
+    metrics.observe("https://b.org/rss", 'b"\\\n.org', ttfb_seconds=20.0)
+    metrics.failure("https://b.org/rss", 'b"\\\n.org', "timeout")
+    lines = metrics.prometheus().splitlines()
+    metric = PREFIX + "ttfb_seconds"
+    assert f"# TYPE {metric} histogram" in lines
+    total_buckets = [line for line in lines if line.startswith(metric + '_bucket{le=')]
+    # Compteurs cumulés, +Inf en dernier (= _count)
+    assert total_buckets[:4] == [f'{metric}_bucket{{le="0.005"}} 0', f'{metric}_bucket{{le="0.01"}} 0',
+                                 f'{metric}_bucket{{le="0.025"}} 1', f'{metric}_bucket{{le="0.05"}} 1']
+    assert total_buckets[-2:] == [f'{metric}_bucket{{le="10.0"}} 2', f'{metric}_bucket{{le="+Inf"}} 3']
+    assert f"{metric}_count 3" in lines
+    assert f"{metric}_sum {0.02 + 0.3 + 20.0!r}" in lines
+    assert f'{metric}_bucket{{host="a.org",le="0.5"}} 2' in lines
+    assert f'{metric}_count{{host="a.org"}} 2' in lines
+    # Guillemet, antislash et fin de ligne échappés dans les labels
+    assert f'{metric}_count{{host="b\\"\\\\\\n.org"}} 1' in lines
+    assert f'{PREFIX}failures_total{{host="b\\"\\\\\\n.org",cause="timeout"}} 1' in lines
+    assert f'{PREFIX}failures_total{{cause="timeout"}} 1' in lines
+    # Une série sans relevé pour une mesure n'exporte rien pour elle
+    assert not [line for line in lines if line.startswith(PREFIX + 'items_bucket{host="b')]
@@ -0,0 +1,47 @@
+"""Analyse des flux RSS 2.0 / Atom (feed_parser) sur des flux d'exemple"""
+
+from pathlib import Path
+
+from feed_parser import parse_feed
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SOURCE = {"name": "Exemple", "category": "tech"}
+
+def parse(name, failed_images=()):
+    return parse_feed((FIXTURES / name).read_bytes(), SOURCE, failed_images)
+
+def test_rss_items():
+    articles = parse("rss.xml")
+    # L'item sans lien est ignoré
+    assert [article["link"] for article in articles] == [
+        "https://exemple.fr/articles/premier", "https://exemple.fr/articles/second",
+        "https://exemple.fr/articles/troisieme",
+    ]
+    first = articles[0]
+    assert first["title"] == "Premier article & suite"
+    assert first["excerpt"] == "Un résumé court."
+    assert first["date"] == "2026-10-18T08:30:00+00:00"
+    assert (first["source"], first["category"]) == ("Exemple", "tech")
+    assert articles[2]["date"] is None
+
+def test_atom_entry():
+    [entry] = parse("atom.xml")
+    assert entry["title"] == "Entrée Atom"
+    assert entry["link"] == "https://atom.exemple.org/2026/entree"
+    assert entry["excerpt"] == "Résumé Atom"
+    assert entry["date"] == "2026-10-18T07:15:00+00:00"
+    assert entry["imageUrl"] == "https://atom.exemple.org/media/vignette.jpg"
+
+def test_images_from_media_enclosure_and_description():
+    images = [article["imageUrl"] for article in parse("rss.xml")]
+    assert images == [
+        "https://cdn.exemple.fr/images/premier.jpg",
+        # Enclosure audio écartée, chemin relatif résolu sur le domaine de l'article
+        "https://exemple.fr/images/second.png",
+        # Pixel de suivi écarté
+        "https://static.exemple.fr/photo/troisieme.webp",
+    ]
+
+def test_failed_image_is_skipped():
+    articles = parse("rss.xml", failed_images={"https://static.exemple.fr/photo/troisieme.webp"})
+    assert articles[2]["imageUrl"] == ""
@@ -0,0 +1,66 @@
+"""Regroupement des sources qui aboutissent au même flux (feed_redirects)"""
+
+from catalog_journal import replay_records
+from feed_redirects import collapse_records
+
+def catalog(*urls):
+    return {"categories": {"tech": {"name": "Tech", "sources": [{"name": url, "url": url} for url in urls]}}}
+
+def collapse(data, resolved):
+    records, groups = collapse_records(data, resolved)
+    replay_records(data, records)
+    return groups, data["categories"]["tech"]["sources"]
+
+def test_scheme_variants_keep_the_keeper():
+    data = catalog("http://x.org/feed", "https://x.org/feed", "https://z.org/rss")
+    resolved = {
+        "http://x.org/feed": ("https://x.org/feed", "permanent"),
+        "https://x.org/feed": ("https://x.org/feed", "direct"),
+        "https://z.org/rss": ("https://x.org/feed", "permanent"),
+    }
+    groups, sources = collapse(data, resolved)
+    assert groups == 1
+    assert [source["url"] for source in sources] == ["https://x.org/feed"]
+    assert sorted(sources[0]["aliases"]) == ["http://x.org/feed", "https://z.org/rss"]
+
+def test_trailing_slash_variants_without_redirect():
+    data = catalog("https://x.org/feed/", "https://x.org/feed", "https://y.org/feed")
+    resolved = {url: (url, "direct") for category in data["categories"].values() for url in
+                (source["url"] for source in category["sources"])}
+    groups, sources = collapse(data, resolved)
+    assert groups == 1
+    assert [source["url"] for source in sources] == ["https://x.org/feed/", "https://y.org/feed"]
+    assert sources[0]["aliases"] == ["https://x.org/feed"]
+
+def test_collapse_is_idempotent():
+    data = catalog("http://x.org/feed", "https://x.org/feed")
+    resolved = {
+        "http://x.org/feed": ("https://x.org/feed", "permanent"),
+        "https://x.org/feed": ("https://x.org/feed", "direct"),
+    }
+    collapse(data, resolved)
+    records, groups = collapse_records(data, resolved)
+    assert (records, groups) == ([], 0)
+
+def test_identical_copy_never_removes_the_keeper():
+    data = catalog("https://x.org/feed", "https://x.org/feed", "http://x.org/feed")
+    resolved = {
+        "https://x.org/feed": ("https://x.org/feed", "direct"),
+        "http://x.org/feed": ("https://x.org/feed", "permanent"),
+    }
+    collapse(data, resolved)
+    _, sources = collapse(data, resolved)
+    assert [source["url"] for source in sources] == ["https://x.org/feed", "https://x.org/feed"]
+
+def test_temporary_redirects_to_the_same_page_stay_apart():
+    data = catalog("https://a.org/rss", "https://b.org/rss", "https://c.org/rss", "http://a.org/rss")
+    resolved = {
+        "https://a.org/rss": ("https://login.exemple/consent", "temporary"),
+        "https://b.org/rss": ("https://login.exemple/consent", "temporary"),
+        "https://c.org/rss": (None, "error"),
+        "http://a.org/rss": ("https://a.org/rss", "temporary"),
+    }
+    groups, sources = collapse(data, resolved)
+    # Seule la variante http de la même URL rejoint sa source
+    assert groups == 1
+    assert [source["url"] for source in sources] == ["https://a.org/rss", "https://b.org/rss", "https://c.org/rss"]
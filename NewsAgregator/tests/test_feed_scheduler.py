@@ -0,0 +1,46 @@
+"""Planification adaptative (feed_scheduler)"""
+
+from feed_scheduler import IDLE_BACKOFF, FeedScheduler
+
+def test_unchanged_feed_backs_off():
+    scheduler = FeedScheduler(min_interval=60, max_interval=3600)
+    dates = ["2026-10-18T08:00:00+00:00", "2026-10-18T09:00:00+00:00"]
+    scheduler.observe("https://x.org/rss", dates, now=1000)
+    first = scheduler._feeds["https://x.org/rss"]["interval"]
+    assert first == 1800
+    scheduler.observe("https://x.org/rss", dates, now=2000)
+    assert scheduler._feeds["https://x.org/rss"]["interval"] == first * IDLE_BACKOFF
+
+def test_feed_without_dates_backs_off():
+    scheduler = FeedScheduler(min_interval=60, max_interval=3600)
+    intervals = []
+    for tick in range(3):
+        scheduler.observe("https://x.org/rss", [], now=1000 + tick)
+        intervals.append(scheduler._feeds["https://x.org/rss"]["interval"])
+    assert intervals == [60 * IDLE_BACKOFF, 60 * IDLE_BACKOFF ** 2, 60 * IDLE_BACKOFF ** 3]
+
+def test_new_articles_speed_up_and_errors_back_off():
+    scheduler = FeedScheduler(min_interval=60, max_interval=3600)
+    url = "https://x.org/rss"
+    scheduler.observe(url, [], now=1000)
+    scheduler.observe(url, [], now=1100)
+    assert scheduler._feeds[url]["interval"] == 60 * IDLE_BACKOFF ** 2
+    # Un article toutes les 10 minutes : deux passages par écart
+    scheduler.observe(url, ["2026-10-18T08:00:00+00:00", "2026-10-18T08:10:00+00:00",
+                            "2026-10-18T08:20:00+00:00"], now=1200)
+    assert scheduler._feeds[url]["interval"] == 300
+    for failures in range(1, 8):
+        scheduler.observe(url, error=True, now=1300)
+        assert scheduler._feeds[url]["interval"] == min(3600, 60 * 2 ** failures)
+    assert scheduler.stats() == {"feeds": 1, "median_interval": 3600, "failing": 1}
+    scheduler.observe(url, ["2026-10-18T08:30:00+00:00"], now=1400)
+    assert scheduler.stats()["failing"] == 0
+
+def test_due_returns_feeds_in_deadline_order():
+    scheduler = FeedScheduler(min_interval=60, max_interval=3600)
+    scheduler.observe("https://lent.org/rss", [], now=1000)
+    scheduler.observe("https://rapide.org/rss", ["2026-10-18T08:00:00+00:00", "2026-10-18T08:01:00+00:00"],
+                      now=900)
+    assert not scheduler.due(now=950)
+    assert scheduler.due(now=2000) == ["https://rapide.org/rss", "https://lent.org/rss"]
+    assert scheduler.is_fresh("https://lent.org/rss", now=2000)
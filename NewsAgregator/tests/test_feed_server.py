@@ -0,0 +1,102 @@
+"""Service d'agrégation (feed_server) face à un serveur de flux local"""
+
+import gzip
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import feed_server
+from feed_server import FeedAggregator, FetchError, decode_body
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Local</title>
+<item><title>Article {path}</title><link>https://exemple.fr{path}</link><pubDate>{date}</pubDate></item>
+</channel></rss>"""
+
+class FeedHandler(BaseHTTPRequestHandler):
+    paths = []
+
+    def do_GET(self):
+        self.paths.append(self.path)
+        body = RSS.format(path=self.path, date=format_datetime(datetime.now(timezone.utc))).encode('utf-8')
+        if self.path.startswith("/gros"):
+            # Petit corps compressé, énorme une fois décompressé
+            body = gzip.compress(body + b' ' * 1024 * 1024)
+        self.send_response(200)
+        if self.path.startswith("/gros"):
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    FeedHandler.paths = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def aggregator(**options):
+    return FeedAggregator({"categories": {}}, allow_private=True, workers=4, **options)
+
+def test_non_ascii_path_is_percent_encoded(base_url):
+    service = aggregator()
+    try:
+        articles = service.feed_articles({"name": "Local", "url": f"{base_url}/actualités/flux rss.xml?thème=été"})
+    finally:
+        service.close()
+    assert FeedHandler.paths == ["/actualit%C3%A9s/flux%20rss.xml?th%C3%A8me=%C3%A9t%C3%A9"]
+    assert len(articles) == 1
+
+def test_failing_feed_does_not_break_the_others(base_url):
+    service = aggregator()
+    sources = [
+        {"name": "Port invalide", "url": "http://127.0.0.1:99999/rss"},
+        {"name": "Hôte invalide", "url": "http://" + "a" * 70 + ".exemple/rss"},
+        {"name": "Local", "url": f"{base_url}/rss"},
+    ]
+    try:
+        articles = service.merged_articles(sources, dedup=False)
+        stats = service.stats()
+    finally:
+        service.close()
+    assert [article["source"] for article in articles] == ["Local"]
+    assert stats["feeds_in_error"] == 2
+
+def test_client_feeds_are_capped(base_url):
+    service = aggregator(max_client_feeds=2)
+    try:
+        for number in range(5):
+            service.feed_articles({"name": "Local", "url": f"{base_url}/rss{number}"})
+        stats = service.stats()
+        remembered = set(service._entries)
+    finally:
+        service.close()
+    assert stats["client_feeds"] == 2
+    assert remembered == {f"{base_url}/rss3", f"{base_url}/rss4"}
+
+def test_decompressed_size_is_capped(base_url, monkeypatch):
+    monkeypatch.setattr(feed_server, "MAX_FEED_BYTES", 64 * 1024)
+    with pytest.raises(FetchError) as error:
+        decode_body({"content-encoding": "gzip"}, gzip.compress(b' ' * 1024 * 1024))
+    assert error.value.cause == "too_large"
+    assert decode_body({"content-encoding": "gzip"}, gzip.compress(b'<rss/>')) == b'<rss/>'
+    service = aggregator()
+    try:
+        articles = service.merged_articles([{"name": "Gros", "url": f"{base_url}/gros"},
+                                            {"name": "Local", "url": f"{base_url}/rss"}], dedup=False)
+        stats = service.stats()
+    finally:
+        service.close()
+    assert [article["source"] for article in articles] == ["Local"]
+    assert stats["feeds_in_error"] == 1
@@ -0,0 +1,77 @@
+"""Validation des images d'articles (image_resolver) face à un serveur local"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import image_resolver
+from image_resolver import ImageResolver
+
+# Chemin → (statut, type, taille)
+IMAGES = {
+    "/morte.jpg": (404, "text/html", 10),
+    "/mini.gif": (200, "image/gif", 43),
+    "/bonne.jpg": (200, "image/jpeg", 5000),
+}
+
+class ImageHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_HEAD(self):
+        self.requests.append(self.path)
+        status, content_type, length = IMAGES.get(self.path, (404, "text/html", 0))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    ImageHandler.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def feed(base_url):
+    # Un article, trois images candidates dans l'ordre de parseArticle()
+    return f"""<rss xmlns:media="http://search.yahoo.com/mrss/"><channel><item>
+    <title>Article</title><link>{base_url}/article</link>
+    <media:content url="{base_url}/morte.jpg"/><media:thumbnail url="{base_url}/mini.gif"/>
+    <enclosure url="{base_url}/bonne.jpg" type="image/jpeg"/>
+    </item><item><title>Sans image valide</title><link>{base_url}/autre</link>
+    <media:content url="{base_url}/morte.jpg"/></item></channel></rss>""".encode('utf-8')
+
+def test_dead_images_give_way_then_are_blanked(tmp_path, base_url):
+    resolver = ImageResolver(tmp_path / "images.db")
+    try:
+        articles = resolver.parse(feed(base_url), {"name": "Local"})
+        stats = resolver.stats()
+    finally:
+        resolver.close()
+    assert [article["imageUrl"] for article in articles] == [f"{base_url}/bonne.jpg", ""]
+    assert stats["verdicts"] == {"dead": 1, "pixel": 1, "ok": 1}
+    assert stats["reparsed"] == 2
+    assert sorted(ImageHandler.requests) == ["/bonne.jpg", "/mini.gif", "/morte.jpg"]
+
+def test_verdicts_expire_after_their_ttl(tmp_path, base_url, monkeypatch):
+    resolver = ImageResolver(tmp_path / "images.db")
+    try:
+        url = f"{base_url}/morte.jpg"
+        assert resolver.check([url]) == {url: ("dead", None)}
+        assert resolver.check([url]) == {url: ("dead", None)}
+        assert ImageHandler.requests == ["/morte.jpg"]
+        # Sept jours plus tard, le verdict a expiré : nouveau HEAD
+        now = time.time() + image_resolver.TTL["dead"] + 1
+        monkeypatch.setattr(image_resolver.time, "time", lambda: now)
+        resolver.check([url])
+        assert ImageHandler.requests == ["/morte.jpg", "/morte.jpg"]
+    finally:
+        resolver.close()
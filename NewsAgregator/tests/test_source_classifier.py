@@ -0,0 +1,52 @@
+"""Catégorisation automatique des sources (source_classifier) sur un petit catalogue"""
+
+import random
+
+import pytest
+
+import source_classifier
+from source_classifier import SourceClassifier
+
+THEMES = {
+    "sport": ("Sport", ["foot", "rugby", "tennis", "velo", "stade", "match", "ligue"]),
+    "cuisine": ("Cuisine", ["recette", "gateau", "chef", "cuisine", "saveur", "gourmand", "patisserie"]),
+    "tech": ("Tech", ["linux", "code", "python", "geek", "robot", "numerique", "logiciel"]),
+}
+
+def synthetic_catalog(seed=0, per_category=60):
+    rng = random.Random(seed)
+    categories = {}
+    for key, (name, words) in THEMES.items():
+        sources = []
+        for number in range(per_category):
+            first, second = rng.sample(words, 2)
+            sources.append({"name": f"{first.capitalize()} {second} {number}",
+                            "url": f"https://www.{first}-{second}{number}.fr/{second}/rss"})
+        categories[key] = {"name": name, "description": "", "sources": sources}
+    return {"categories": categories}
+
+def test_train_and_classify():
+    pytest.importorskip("numpy")
+    classifier = SourceClassifier.train(synthetic_catalog(), seed=0)
+    assert classifier.category_keys == ["sport", "cuisine", "tech"]
+    results = classifier.classify([
+        {"name": "Le match de rugby", "url": "https://www.rugby-ligue.fr/match/feed"},
+        {"name": "Recettes du chef", "url": "https://gateau-chef.fr/recette.xml"},
+        {"name": "Actus Linux", "url": "https://www.linux-python.org/code/rss"},
+    ])
+    assert [result["category"] for result in results] == ["sport", "cuisine", "tech"]
+    for result in results:
+        assert 0 < result["confidence"] <= 1
+        assert len(result["alternatives"]) == 2
+        assert result["category"] not in dict(result["alternatives"])
+    assert classifier.classify([]) == []
+    report = source_classifier.evaluate(synthetic_catalog(), seed=0)
+    assert (report["train"], report["test"]) == (144, 36)
+    assert report["accuracy"] >= 0.9
+
+def test_numpy_is_required(monkeypatch):
+    monkeypatch.setattr(source_classifier, "np", None)
+    with pytest.raises(ImportError, match="NumPy"):
+        SourceClassifier.train(synthetic_catalog())
+    with pytest.raises(ImportError):
+        source_classifier.evaluate(synthetic_catalog())